@@ -3,17 +3,34 @@ Module used to:
 1. Collect the latencies from the provided logs,
 2. generates a graph for the top N latencies against time
 
-The input file is a modified file, which contains  latencies are grepped from ceph OSD log for faster run.
+The input files are either ceph OSD logs, or files which contain only the
+latencies grepped from them for a faster run.
 -> grep -a dequeue_op.*latency ceph-osd.log > latencies.log
-( Performed to reduce run time, since lots of logging would be generated )
+
+Logs are read line by line, one process per log, so logs of any size can be
+analysed: only the N longest ops are kept, in a bounded heap, and the
+latencies of every time bucket go to a log scale histogram from which the
+p50/p99 are computed, with the max kept exactly.
+
+Output, with <prefix> the --output option or the name of the first log:
+    <prefix>.xlsx               top N latencies and per bucket p50/p99/max charts
+    <prefix>_buckets.csv        per bucket count, p50, p99 and max
+    <prefix>_summary.json       totals, overall percentiles and the top N ops
 
 NOTE : The debug levels for the OSD for the latencies to be captured,
         the Param: debug_osd needs to be set to 20 globally
 """
 
+import csv
+import heapq
+import json
+import math
+import os
 import re
-import sys
-from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 
 import openpyxl
 from docopt import docopt
@@ -21,59 +38,277 @@ from openpyxl.chart import LineChart, Reference
 
 doc = """
 Usage:
-  generate_latency_graph.py --latencies-log <file_name> [--num-ops <ops>]
+  generate_latency_graph.py --latencies-log <file_name>... [--num-ops <ops>] [--bucket-secs <secs>] [--workers <num>] [--output <prefix>]
 
 Options:
   --latencies-log <name>                Name of the file, where the latencies are grepped from ceph OSD log
                                         -> grep -a dequeue_op.*latency ceph-osd.log > latencies.log
-  ----num-ops <num>                     Top N latencies to be collected for the graph
+                                        or the OSD log itself, can be given once per OSD
+  --num-ops <num>                       Top N latencies to be collected for the graph [default: 10000]
+  --bucket-secs <secs>                  Width of the time buckets of the p50/p99/max [default: 60]
+  --workers <num>                       Logs parsed in parallel [default: 4]
+  --output <prefix>                     Prefix of the xlsx, csv and json files
 """
 
+LATENCY_REGEX = re.compile(rb"latency (\d+\.\d+)")
+# fraction of second and utc offset following the seconds of a log timestamp
+STAMP_TAIL_REGEX = re.compile(rb"(\.\d+)?([+-]\d{4})?")
+# histogram bins per doubling of the latency, ~2% resolution of the percentiles
+HIST_BINS_PER_DOUBLING = 32
+# lowest latency told apart by the histogram, in seconds
+HIST_MIN_LATENCY = 1e-6
 
-class Op(object):
-    def __init__(self, line):
-        self.lat = float(re.search(r"latency (\d+.\\d+)", line).group(1))
-        self.line = line
-        time_format = "%Y-%m-%d %H:%M:%S.%f"
-        self.time = datetime.strptime(line[:23], time_format)
 
+def latency_bin(lat):
+    if lat <= HIST_MIN_LATENCY:
+        return 0
+    return int(math.log2(lat / HIST_MIN_LATENCY) * HIST_BINS_PER_DOUBLING) + 1
 
-def run(args):
-    logfile = args["--latencies-log"]
-    num_ops = int(args.get("--num-ops", 10000))
-    ops = []
-    top_ops = []
-
-    with open(logfile) as f:
-        for line in f.readlines():
-            ops.append(Op(line))
-    ops.sort(key=lambda x: x.time)
-    print(f"{num_ops} longest requests:")
-    for i in range(min(num_ops, len(ops))):
-        top_ops.append((ops[i].lat, ops[i].time, ops[i].line))
-    top_ops.sort(key=lambda x: x[1])
-    # Creating workbook and adding data to it
-    wb = openpyxl.Workbook()
-    sheet = wb.active
-    text = f"Operations from Timestamp :{ops[0].time} - {ops[-1].time}"
-    sheet.append([text])
-    for val in top_ops:
-        sheet.append([val[0], val[1]])
 
-    max_row = sheet.max_row  # if sheet.max_row < 100 else 100
-    values = Reference(sheet, min_col=1, min_row=2, max_col=1, max_row=max_row)
-    # Create object of LineChart class
+def bin_latency(index):
+    """
+    This function returns the upper bound of a histogram bin, in seconds
+    """
+    if index == 0:
+        return HIST_MIN_LATENCY
+    return HIST_MIN_LATENCY * 2 ** (index / HIST_BINS_PER_DOUBLING)
+
+
+def percentile(hist, pct, max_latency=None):
+    """
+    This function returns the pct percentile of a latency histogram
+
+    The value is the upper bound of the bin the percentile falls in, capped
+    at max_latency, the exact max of the histogram, when it is given.
+    """
+    total = sum(hist.values())
+    if not total:
+        return None
+    rank = math.ceil(total * pct / 100)
+    seen = 0
+    for index in sorted(hist):
+        seen += hist[index]
+        if seen >= rank:
+            if max_latency is None:
+                return bin_latency(index)
+            return min(bin_latency(index), max_latency)
+
+
+@lru_cache(maxsize=4096)
+def epoch_seconds(stamp, utc_offset=None):
+    """
+    This function parses the seconds part of a log timestamp, cached since consecutive lines share it
+
+    Timestamps without a utc offset are taken as local time.
+    """
+    parsed = datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S")
+    if utc_offset is None:
+        return parsed.timestamp()
+    return parsed.replace(tzinfo=timezone.utc).timestamp() - utc_offset
+
+
+def line_time(line):
+    """
+    This function returns the time of a log line as epoch seconds
+
+    Both '2023-01-10 10:11:12.345' and '2023-01-10T10:11:12.345+0000'
+    timestamps are understood, the latter with its utc offset.
+    """
+    stamp = line[:19].decode().replace("T", " ")
+    fraction, offset = STAMP_TAIL_REGEX.match(line, 19).groups()
+    utc_offset = None
+    if offset is not None:
+        sign = -1 if offset[:1] == b"-" else 1
+        utc_offset = sign * (int(offset[1:3]) * 3600 + int(offset[3:5]) * 60)
+    return epoch_seconds(stamp, utc_offset) + (float(fraction) if fraction else 0.0)
+
+
+def scan_log(logfile, num_ops, bucket_secs):
+    """
+    This function streams one log and summarises its op latencies
+
+    Returns:
+        dict with the top ops as (latency, time, line), the histogram and
+        max latency per time bucket, the number of ops and the time range
+    """
+    top = []
+    hists = {}
+    maxes = {}
+    ops = 0
+    first = last = None
+    with open(logfile, "rb", buffering=1024 * 1024) as f:
+        for line in f:
+            if b"latency " not in line:
+                continue
+            match = LATENCY_REGEX.search(line)
+            if match is None:
+                continue
+            try:
+                when = line_time(line)
+            except ValueError:
+                continue
+            lat = float(match.group(1))
+            ops += 1
+            if first is None:
+                first = when
+            last = when
+            bucket = int(when // bucket_secs * bucket_secs)
+            hists.setdefault(bucket, Counter())[latency_bin(lat)] += 1
+            if lat > maxes.get(bucket, -1):
+                maxes[bucket] = lat
+            if len(top) < num_ops:
+                heapq.heappush(top, (lat, when, line))
+            elif lat > top[0][0]:
+                heapq.heapreplace(top, (lat, when, line))
+    top = [
+        (lat, when, line.decode(errors="replace").rstrip()) for lat, when, line in top
+    ]
+    print(f"{logfile}: {ops} ops")
+    return {
+        "top": top,
+        "hists": hists,
+        "maxes": maxes,
+        "ops": ops,
+        "first": first,
+        "last": last,
+    }
+
+
+def merge_scans(scans, num_ops):
+    """
+    This function merges the summaries of several logs into one
+    """
+    hists = {}
+    maxes = {}
+    for scan in scans:
+        for bucket, hist in scan["hists"].items():
+            hists.setdefault(bucket, Counter()).update(hist)
+        for bucket, lat in scan["maxes"].items():
+            maxes[bucket] = max(lat, maxes.get(bucket, lat))
+    firsts = [scan["first"] for scan in scans if scan["first"] is not None]
+    lasts = [scan["last"] for scan in scans if scan["last"] is not None]
+    return {
+        "top": heapq.nlargest(
+            num_ops, (op for scan in scans for op in scan["top"]), key=lambda x: x[0]
+        ),
+        "hists": hists,
+        "maxes": maxes,
+        "ops": sum(scan["ops"] for scan in scans),
+        "first": min(firsts) if firsts else None,
+        "last": max(lasts) if lasts else None,
+    }
+
+
+def bucket_rows(merged):
+    rows = []
+    for bucket in sorted(merged["hists"]):
+        hist = merged["hists"][bucket]
+        rows.append(
+            [
+                datetime.fromtimestamp(bucket),
+                sum(hist.values()),
+                percentile(hist, 50, merged["maxes"][bucket]),
+                percentile(hist, 99, merged["maxes"][bucket]),
+                merged["maxes"][bucket],
+            ]
+        )
+    return rows
+
+
+def add_line_chart(sheet, title, min_col, max_col, max_row, anchor):
+    # several series take their names from the header row
+    titles = min_col != max_col
+    values = Reference(
+        sheet,
+        min_col=min_col,
+        min_row=1 if titles else 2,
+        max_col=max_col,
+        max_row=max_row,
+    )
     chart = LineChart()
-    chart.add_data(values)
-    # set the title of the chart
-    chart.title = f" Latencies {text}"
+    chart.add_data(values, titles_from_data=titles)
+    chart.title = title
     chart.x_axis.title = " Time progression ----> "
     chart.y_axis.title = " Time in sec "
-    sheet.add_chart(chart, "E2")
+    sheet.add_chart(chart, anchor)
+
+
+def write_workbook(fname, text, top_ops, rows):
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.title = "top latencies"
+    sheet.append([text])
+    for lat, when, _ in top_ops:
+        sheet.append([lat, datetime.fromtimestamp(when)])
+    add_line_chart(sheet, f" Latencies {text}", 1, 1, sheet.max_row, "E2")
 
-    # save the file
-    fname = f"{sys.argv[1]}.xlsx"
+    sheet = wb.create_sheet("buckets")
+    sheet.append(["time", "ops", "p50", "p99", "max"])
+    for row in rows:
+        sheet.append(row)
+    add_line_chart(sheet, f" p50/p99/max {text}", 3, 5, sheet.max_row, "G2")
     wb.save(fname)
+
+
+def run(args):
+    logfiles = args["--latencies-log"]
+    num_ops = int(args["--num-ops"])
+    bucket_secs = int(args["--bucket-secs"])
+    workers = int(args["--workers"])
+    prefix = args["--output"] or os.path.basename(logfiles[0])
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(logfiles)))) as pool:
+        scans = list(
+            pool.map(
+                scan_log,
+                logfiles,
+                [num_ops] * len(logfiles),
+                [bucket_secs] * len(logfiles),
+            )
+        )
+    merged = merge_scans(scans, num_ops)
+    if not merged["ops"]:
+        raise Exception("no op latencies found in the logs")
+
+    top_ops = sorted(merged["top"], key=lambda x: x[1])
+    print(f"{len(top_ops)} longest requests:")
+    for lat, _, line in merged["top"][:10]:
+        print(f"{lat} {line}")
+    rows = bucket_rows(merged)
+    first = datetime.fromtimestamp(merged["first"])
+    last = datetime.fromtimestamp(merged["last"])
+    text = f"Operations from Timestamp :{first} - {last}"
+
+    write_workbook(f"{prefix}.xlsx", text, top_ops, rows)
+    with open(f"{prefix}_buckets.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["time", "ops", "p50", "p99", "max"])
+        writer.writerows(rows)
+    overall = Counter()
+    for hist in merged["hists"].values():
+        overall.update(hist)
+    overall_max = max(merged["maxes"].values())
+    summary = {
+        "logs": logfiles,
+        "ops": merged["ops"],
+        "first": str(first),
+        "last": str(last),
+        "bucket_secs": bucket_secs,
+        "p50": percentile(overall, 50, overall_max),
+        "p99": percentile(overall, 99, overall_max),
+        "max": overall_max,
+        "top_ops": [
+            {"latency": lat, "time": str(datetime.fromtimestamp(when)), "line": line}
+            for lat, when, line in merged["top"]
+        ],
+    }
+    with open(f"{prefix}_summary.json", "w") as f:
+        json.dump(summary, f, indent=2)
+    print(
+        f"{merged['ops']} ops, p50 {summary['p50']:.6f}s, p99 {summary['p99']:.6f}s, "
+        f"max {summary['max']}s; written {prefix}.xlsx, {prefix}_buckets.csv, "
+        f"{prefix}_summary.json"
+    )
     print("Done!")
 
 
@@ -1,53 +1,114 @@
 #!/usr/bin/env python3
+# Summarises the cpu and memory of the osd, rgw and haproxy daemons sampled by
+# cpu_util.py: avg, max and percentiles per daemon group, or per daemon with
+# --per-daemon. Text logs of the old cpu_util.py are still understood.
+#
+# Usage: calc_osd_rgw_stats.py <file> [--per-daemon]
+
+import argparse
+import math
 import re
-import sys
 from collections import defaultdict
 
-if len(sys.argv) != 2:
-    print(f"Usage: {sys.argv[0]} <logfile>")
-    sys.exit(1)
-
-logfile = sys.argv[1]
+from cpu_util import MAGIC, read_samples
 
-# Match daemon name, cpu, memory
+# Match daemon name, cpu, memory of the old text logs
 pattern = re.compile(
     r"Daemon:\s*(\S+).*?cpu utilisation:\s*([\d.]+)\s*Memory:\s*([\d.]+)",
     re.IGNORECASE,
 )
+PERCENTILES = (50, 95, 99)
 
-stats = defaultdict(lambda: {"cpu": [], "mem": []})
 
-with open(logfile) as f:
-    for line in f:
-        m = pattern.search(line)
-        if not m:
-            continue
-        daemon_name, cpu, mem = m.group(1), float(m.group(2)), float(m.group(3))
-        name = daemon_name.lower()
-
-        # ---- Updated grouping rules ----
-        if name.startswith("osd."):
-            group = "osd"
-        elif "rgw" in name:  # catches client.rgw.rgw.* etc.
-            group = "rgw"
-        else:
+def read_text_log(logfile):
+    samples = []
+    with open(logfile) as f:
+        for line in f:
+            m = pattern.search(line)
+            if m:
+                samples.append(
+                    {
+                        "daemon": m.group(1),
+                        "cpu": float(m.group(2)),
+                        "mem": float(m.group(3)),
+                    }
+                )
+    return samples
+
+
+def daemon_group(name):
+    name = name.lower()
+    if name.startswith("osd."):
+        return "osd"
+    if "rgw" in name:  # catches client.rgw.rgw.* etc.
+        return "rgw"
+    if name.startswith("haproxy"):
+        return "haproxy"
+    return None
+
+
+def percentile(values, pct):
+    """
+    This function returns the nearest rank percentile of sorted values
+    """
+    return values[max(0, math.ceil(len(values) * pct / 100) - 1)]
+
+
+def summarise(samples, per_daemon=False):
+    """
+    This function aggregates the samples per daemon group, or per daemon
+
+    Returns:
+        dict of group to {"samples", "cpu", "mem"}, cpu and mem being dicts of avg, max and pNN
+    """
+    values = defaultdict(lambda: {"cpu": [], "mem": []})
+    for sample in samples:
+        group = sample["daemon"] if per_daemon else daemon_group(sample["daemon"])
+        if group is None:
             continue
+        values[group]["cpu"].append(sample["cpu"])
+        values[group]["mem"].append(sample["mem"])
+    stats = {}
+    for group, each in values.items():
+        stats[group] = {"samples": len(each["cpu"])}
+        for metric in ("cpu", "mem"):
+            ordered = sorted(each[metric])
+            stats[group][metric] = {
+                "avg": sum(ordered) / len(ordered),
+                "max": ordered[-1],
+            }
+            for pct in PERCENTILES:
+                stats[group][metric][f"p{pct}"] = percentile(ordered, pct)
+    return stats
 
-        stats[group]["cpu"].append(cpu)
-        stats[group]["mem"].append(mem)
 
-if not stats:
-    print("No matching osd or rgw entries found.")
-    sys.exit(0)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="osd/rgw cpu and memory summary")
+    parser.add_argument("logfile", help="cpu_util.py sample file or old text log")
+    parser.add_argument(
+        "--per-daemon", action="store_true", help="one row per daemon, not per group"
+    )
+    args = parser.parse_args()
 
-print(
-    f"{'Daemon':<8} {'Avg CPU%':>8} {'Max CPU%':>8} {'Avg Mem(MB)':>12} {'Max Mem(MB)':>12}"
-)
-print("-" * 55)
-for group in ["osd", "rgw"]:
-    if group in stats:
-        c = stats[group]["cpu"]
-        m = stats[group]["mem"]
-        print(
-            f"{group:<8} {sum(c)/len(c):8.2f} {max(c):8.2f} {sum(m)/len(m):12.2f} {max(m):12.2f}"
-        )
+    with open(args.logfile, "rb") as f:
+        binary = f.read(len(MAGIC)) == MAGIC
+    samples = read_samples(args.logfile) if binary else read_text_log(args.logfile)
+    stats = summarise(samples, args.per_daemon)
+    if not stats:
+        print("No matching osd or rgw entries found.")
+        raise SystemExit(0)
+
+    width = max(8, *(len(group) for group in stats))
+    header = f"{'Daemon':<{width}} {'Samples':>8}"
+    for metric in ("CPU%", "Mem(MB)"):
+        header += f" {'Avg ' + metric:>12} {'Max ' + metric:>12}"
+        header += "".join(f" {f'p{pct} ' + metric:>12}" for pct in PERCENTILES)
+    print(header)
+    print("-" * len(header))
+    for group in sorted(stats):
+        row = f"{group:<{width}} {stats[group]['samples']:>8}"
+        for metric in ("cpu", "mem"):
+            each = stats[group][metric]
+            row += f" {each['avg']:12.2f} {each['max']:12.2f}"
+            row += "".join(f" {each[f'p{pct}']:12.2f}" for pct in PERCENTILES)
+        print(row)
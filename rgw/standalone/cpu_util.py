@@ -1,56 +1,243 @@
-# This is RAW script which dumps bucket stats into file for every  5 seconds until bucket syncs completely on both sites
-# Please change bucket name with actual bucket name
+#!/usr/bin/env python3
+# Samples cpu, memory and io of the ceph-osd, radosgw and haproxy daemons of this node
+# from /proc, every --interval seconds, into a compact binary file.
+# Daemons are tracked by name (osd.3, client.rgw.foo, haproxy), so a restarted
+# daemon keeps its history under its new pid.
+# Summarise the file with: calc_osd_rgw_stats.py <file>
+#
+# Usage: cpu_util.py [--output cpu_util.bin] [--interval 0.5] [--duration 3600]
 
-import json
-import subprocess
+import argparse
+import os
+import struct
 import time
 
-cmd = "netstat -nltp | egrep 'ceph-osd|radosgw|haproxy' | awk '{print $7}'"
-p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-out, err = p.communicate()
-# convert bytes -> str
-out = out.decode().strip()
-lines = out.split("\n")
-
-result = {}
-for line in lines:
-    pid, proc = line.split("/")
-    result[pid] = proc  # duplicates automatically removed
-
-print(result)
-
-while True:
-    for pid, comp in result.items():
-        p = subprocess.Popen("date", stdout=subprocess.PIPE, shell=True)
-        dt, err = p.communicate()
-        cmd = f"ps -u -p {pid} | awk '{{print $13, $2, $3, $6/1024}}' | tail -n 1"
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-        out, err = p.communicate()
-        # convert bytes -> str and split into columns
-        out = out.decode().strip().split()
-
-        name = out[0]  # process name
-        pid = out[1]  # PID
-        cpu = out[2]  # %CPU
-        memMB = out[3]  # memory in MB
-        current_data = (
-            "DATE: "
-            + str(dt)
-            + "\t"
-            + " Daemon: "
-            + str(name)
-            + "\t"
-            + " pid: "
-            + str(pid)
-            + "\t"
-            + " cpu utilisation: "
-            + str(cpu)
-            + "\t"
-            + " Memory: "
-            + str(memMB)
-            + "\t"
-        )
-
-        cmd = f"echo {current_data} >> upgrade-bkt-1_cpu_util_folio11"
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-    time.sleep(600)
+DAEMON_COMMS = ("ceph-osd", "radosgw", "haproxy")
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+# seconds between two scans of /proc for new or restarted daemons
+RESCAN_SECS = 5
+
+# file layout: MAGIC, then records, each starting with its type byte
+#   b"D" daemon:  index (H), name length (B), name
+#   b"S" sample:  time (d), daemon index (H), pid (I), cpu % (f), rss MB (f),
+#                 threads (H), read bytes (q), write bytes (q)
+# io counters are -1 when /proc/<pid>/io is not readable
+MAGIC = b"CEPHPROC1\n"
+DAEMON_RECORD = struct.Struct("<HB")
+SAMPLE_RECORD = struct.Struct("<dHIffHqq")
+SAMPLE_FIELDS = ("time", "daemon", "pid", "cpu", "mem", "threads", "read", "write")
+
+
+def daemon_name(comm, cmdline):
+    """
+    This function returns the ceph name of a daemon from its command line, e.g. osd.3
+    """
+    if comm == "haproxy":
+        return "haproxy"
+    kind = "osd" if comm == "ceph-osd" else "client"
+    for i, arg in enumerate(cmdline[:-1]):
+        if arg in ("-n", "--name"):
+            return cmdline[i + 1]
+        if arg in ("-i", "--id"):
+            return f"{kind}.{cmdline[i + 1]}"
+    return comm
+
+
+def find_daemons():
+    """
+    This function scans /proc for the daemons
+
+    Returns:
+        dict of daemon name to pid
+    """
+    daemons = {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                comm = f.read().strip()
+            if comm not in DAEMON_COMMS:
+                continue
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                cmdline = f.read().decode(errors="replace").split("\0")
+        except OSError:
+            continue
+        name = daemon_name(comm, cmdline)
+        if comm == "haproxy" and name in daemons:
+            # haproxy workers, the master has the lowest pid
+            continue
+        daemons[name] = int(pid)
+    return daemons
+
+
+def read_proc(pid):
+    """
+    This function reads the counters of a process
+
+    Returns:
+        (cpu ticks, rss bytes, threads, read bytes, write bytes), None when the process is gone
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            stat = f.read()
+        with open(f"/proc/{pid}/statm") as f:
+            rss = int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+    # the comm field may contain spaces, the fields after it do not
+    fields = stat[stat.rindex(")") + 2 :].split()
+    ticks = int(fields[11]) + int(fields[12])
+    threads = int(fields[17])
+    read = write = -1
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            for line in f:
+                key, value = line.split(":")
+                if key == "read_bytes":
+                    read = int(value)
+                elif key == "write_bytes":
+                    write = int(value)
+    except OSError:
+        pass
+    return ticks, rss, threads, read, write
+
+
+class Sampler(object):
+    def __init__(self, fp):
+        self.fp = fp
+        self.index = {}
+        self.pids = {}
+        self.last = {}
+        self.next_scan = 0
+
+    def register(self, name):
+        index = self.index[name] = len(self.index)
+        encoded = name.encode()[:255]
+        self.fp.write(b"D" + DAEMON_RECORD.pack(index, len(encoded)) + encoded)
+
+    def rescan(self, now):
+        daemons = find_daemons()
+        for name, pid in daemons.items():
+            old = self.pids.get(name)
+            if old == pid:
+                continue
+            if name not in self.index:
+                self.register(name)
+                print(f"tracking {name} pid {pid}")
+            elif old is None:
+                print(f"{name} back, pid {pid}")
+            else:
+                print(f"{name} restarted, pid {old} -> {pid}")
+            self.pids[name] = pid
+            self.last.pop(name, None)
+        # stopped daemons are dropped until a later rescan finds them again
+        for name in [name for name in self.pids if name not in daemons]:
+            print(f"{name} stopped, pid {self.pids.pop(name)}")
+            self.last.pop(name, None)
+        self.next_scan = now + RESCAN_SECS
+
+    def sample(self):
+        now = time.time()
+        if now >= self.next_scan:
+            self.rescan(now)
+        gone = False
+        for name, pid in self.pids.items():
+            counters = read_proc(pid)
+            if counters is None:
+                gone = True
+                continue
+            ticks, rss, threads, read, write = counters
+            last = self.last.get(name)
+            self.last[name] = (now, ticks)
+            if last is None:
+                # cpu % needs two samples of the same pid
+                continue
+            elapsed = now - last[0]
+            cpu = (ticks - last[1]) / CLK_TCK / elapsed * 100 if elapsed > 0 else 0
+            self.fp.write(
+                b"S"
+                + SAMPLE_RECORD.pack(
+                    now,
+                    self.index[name],
+                    pid,
+                    cpu,
+                    rss / 1024 / 1024,
+                    min(threads, 0xFFFF),
+                    read,
+                    write,
+                )
+            )
+        if gone:
+            # look for the restarted daemon right away
+            self.next_scan = 0
+        self.fp.flush()
+
+
+def read_samples(fname):
+    """
+    This function reads a file written by the sampler
+
+    Returns:
+        list of sample dicts with the fields of SAMPLE_FIELDS, daemon being its name
+    """
+    names = {}
+    samples = []
+    with open(fname, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{fname} is not a cpu_util.py sample file")
+    pos = len(MAGIC)
+    while pos < len(data):
+        kind = data[pos : pos + 1]
+        pos += 1
+        if kind == b"D":
+            if pos + DAEMON_RECORD.size > len(data):
+                break
+            index, length = DAEMON_RECORD.unpack_from(data, pos)
+            pos += DAEMON_RECORD.size
+            names[index] = data[pos : pos + length].decode()
+            pos += length
+        elif kind == b"S":
+            if pos + SAMPLE_RECORD.size > len(data):
+                # sampler killed mid record
+                break
+            sample = dict(zip(SAMPLE_FIELDS, SAMPLE_RECORD.unpack_from(data, pos)))
+            pos += SAMPLE_RECORD.size
+            sample["daemon"] = names[sample["daemon"]]
+            samples.append(sample)
+        else:
+            raise ValueError(f"{fname}: bad record at offset {pos - 1}")
+    return samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ceph daemon resource sampler")
+    parser.add_argument("--output", default="cpu_util.bin", help="sample file")
+    parser.add_argument(
+        "--interval", type=float, default=0.5, help="seconds between samples"
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=None,
+        help="seconds to sample, forever by default",
+    )
+    args = parser.parse_args()
+
+    if os.path.exists(args.output) and os.path.getsize(args.output):
+        # daemon indexes are per run, a new run needs a new file
+        raise SystemExit(f"{args.output} exists, choose another --output")
+    end = time.time() + args.duration if args.duration else None
+    with open(args.output, "wb") as fp:
+        fp.write(MAGIC)
+        sampler = Sampler(fp)
+        try:
+            while end is None or time.time() < end:
+                started = time.time()
+                sampler.sample()
+                time.sleep(max(0, args.interval - (time.time() - started)))
+        except KeyboardInterrupt:
+            pass
+    print(f"samples written to {args.output}")
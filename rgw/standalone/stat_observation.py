@@ -1,49 +1,50 @@
-# This is RAW script which dumps bucket stats into file for every  5 seconds until bucket syncs completely on both sites
-# Please change bucket name with actual bucket name
+# Records the bucket stats of the given buckets every --interval seconds until the
+# bucket sync is caught up on this site, then writes the num_objects, size_actual and
+# num_shards series with the objects/sec rates to --output.
+# All buckets are fetched with one radosgw-admin call per cycle.
+#
+# Usage: stat_observation.py <bucket_name>... [--interval 5] [--output observation.json]
 
-import json
+import argparse
+import os
 import subprocess
+import sys
 import time
 
-bucket_name = "<bucket_name>"
-while True:
-    p = subprocess.Popen(
-        "cephadm shell -- radosgw-admin sync status", stdout=subprocess.PIPE, shell=True
-    )
-    check_sync_status, err = p.communicate()
-    check_sync_status = str(check_sync_status)
-
-    p = subprocess.Popen("cephadm shell -- date", stdout=subprocess.PIPE, shell=True)
-    dt, err = p.communicate()
+sys.path.append(os.path.abspath(os.path.join(__file__, "../..")))
+import logging
 
-    cmd = f"cephadm shell -- radosgw-admin bucket stats --bucket {bucket_name} --format json"
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-    out, err = p.communicate()
+from v2.lib.bucket_stats_recorder import BucketStatsRecorder
 
-    op = json.loads(out)
-    num_object = op["usage"]["rgw.main"]["num_objects"]
-    num_shards = op["num_shards"]
-    bucket = op["bucket"]
-    bucket_id = op["id"]
-    actual_size = op["usage"]["rgw.main"]["size_actual"]
-    current_data = (
-        "DATE: "
-        + str(dt)
-        + "\t"
-        + "Bucket: "
-        + str(bucket)
-        + " Bucket_ID: "
-        + str(bucket_id)
-        + " OBJECT_COUNT: "
-        + str(num_object)
-        + " NUM_SHARDS: "
-        + str(num_shards)
-        + " Actual_size: "
-        + str(actual_size)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bucket stats recorder")
+    parser.add_argument("buckets", nargs="+", help="buckets to record")
+    parser.add_argument("--interval", type=float, default=5)
+    parser.add_argument("--output", default="observation.json")
+    parser.add_argument(
+        "--primary",
+        action="store_true",
+        help="this site takes the writes, its rate is ingest rather than sync",
     )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
 
-    cmd = f"echo {current_data} >> observation_{bucket_name}"
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, shell=True)
-    time.sleep(5)
-    if "data is caught up with source" in check_sync_status:
-        break
+    recorder = BucketStatsRecorder(
+        args.buckets, {"local": None}, reference="local" if args.primary else None
+    )
+    try:
+        while True:
+            recorder.record()
+            sync_status = subprocess.run(
+                "sudo radosgw-admin sync status",
+                shell=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            if "data is caught up with source" in sync_status:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    recorder.save(args.output)
+    recorder.log_summary()
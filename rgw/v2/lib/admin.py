@@ -6,12 +6,16 @@ import json
 import logging
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import v2.utils.utils as utils
 from v2.lib.s3.write_io_info import AddUserInfo, BasicIOInfoStructure, TenantInfo
 
 log = logging.getLogger()
 
+# radosgw-admin processes run at a time by create_admin_users
+USER_CREATE_WORKERS = 8
+
 
 class UserMgmt(object):
     def __init__(self):
@@ -75,6 +79,74 @@ class UserMgmt(object):
             # traceback.print_exc(e)
             return False
 
+    def create_admin_users(
+        self, users, cluster_name="ceph", workers=USER_CREATE_WORKERS
+    ):
+        """
+        Function to create many S3-interface/admin users concurrently
+
+        The existing users are listed once, then the users are created by a pool of
+        radosgw-admin processes, users which already exist are fetched with 'user info'.
+        All the users are added to io_info in one update.
+
+        Parameters:
+            users (list): (user_id, displayname) tuples of the users
+            cluster_name (char): Name of the ceph cluster. defaults to 'ceph'
+            workers (int): radosgw-admin commands run at a time
+
+        Returns:
+            user details of each user in the order of users, as returned by create_admin_user
+        """
+        log.info("cluster name: %s" % cluster_name)
+        existing = set(
+            json.loads(
+                utils.exec_shell_cmd(
+                    f"radosgw-admin user list --cluster {cluster_name}"
+                )
+                or "[]"
+            )
+        )
+        log.info(f"creating {len(users)} users with {workers} workers")
+
+        def create(user):
+            user_id, displayname = user
+            if user_id in existing:
+                cmd = f"radosgw-admin user info --uid='{user_id}' --cluster {cluster_name}"
+            else:
+                cmd = f"radosgw-admin user create --uid='{user_id}' --display-name='{displayname}' --cluster {cluster_name}"
+            out = utils.exec_shell_cmd(cmd)
+            if out is False:
+                raise Exception(f"creation of user {user_id} failed")
+            v_as_json = json.loads(out)
+            return {
+                "user_id": v_as_json["user_id"],
+                "display_name": v_as_json["display_name"],
+                "access_key": v_as_json["keys"][0]["access_key"],
+                "secret_key": v_as_json["keys"][0]["secret_key"],
+            }
+
+        started = time.perf_counter()
+        # a user given twice is created once
+        unique_users = list(dict.fromkeys(users))
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            created = dict(zip(unique_users, executor.map(create, unique_users)))
+        all_users_details = [created[user] for user in users]
+        log.info(f"{len(users)} users created in {time.perf_counter() - started:.1f}s")
+        basic_io_structure = BasicIOInfoStructure()
+        AddUserInfo().add_users_info(
+            [
+                basic_io_structure.user(
+                    **{
+                        "user_id": each["user_id"],
+                        "access_key": each["access_key"],
+                        "secret_key": each["secret_key"],
+                    }
+                )
+                for each in created.values()
+            ]
+        )
+        return all_users_details
+
     def create_rest_admin_user(self, user_id, displayname, cluster_name="ceph"):
         """
         Function to create an user with administrative capabilities
@@ -0,0 +1,226 @@
+"""
+Bucket stats time-series recorder
+
+Records num_objects, size_actual and num_shards of a set of buckets on
+several zones at once: every cycle runs one 'radosgw-admin bucket stats' per
+zone, the zones in parallel. The series are kept per zone as columns, one
+value per cycle, from which the objects/sec ingest rate of the reference
+zone and the sync rate of the other zones are computed. The recorder can
+poll on its own in a background thread, e.g. while a workload runs, or be
+handed to a SyncConvergenceTracker which then records every round it polls.
+
+usage:
+
+    recorder = BucketStatsRecorder(buckets, {"primary": None, "secondary": ssh_con})
+    recorder.start()
+    ... workload ...
+    recorder.stop()
+    recorder.save("sync_stats.json")
+    recorder.log_summary()
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import json
+import logging
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from v2.lib.sync_tracker import bucket_key, fetch_bucket_stats
+
+log = logging.getLogger(__name__)
+
+RECORDED_FIELDS = ("num_objects", "size_actual", "num_shards")
+
+
+class BucketStatsRecorder(object):
+    """
+    This class records bucket stats of a set of buckets on a set of zones
+    """
+
+    def __init__(self, bucket_names, zones, reference="primary", interval=30):
+        """
+        Parameters:
+            bucket_names(list): buckets to record
+            zones(dict): zone name to ssh connection, None for the local zone
+            reference(str): zone the objects are written to, its rate is the
+                ingest rate, the rate of the other zones the sync rate
+            interval(int): seconds between cycles of the background thread
+        """
+        self.bucket_names = list(bucket_names)
+        self.zones = zones
+        self.reference = reference
+        self.interval = interval
+        self.series = {
+            zone: {
+                "time": array("d"),
+                "buckets": {
+                    name: {field: array("q") for field in RECORDED_FIELDS}
+                    for name in self.bucket_names
+                },
+            }
+            for zone in zones
+        }
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def fetch(self, zone):
+        # a single bucket is cheaper to fetch on its own
+        bucket_name = self.bucket_names[0] if len(self.bucket_names) == 1 else None
+        return fetch_bucket_stats(self.zones[zone], bucket_name)
+
+    def record(self):
+        """
+        This function runs one cycle: fetch the stats of all zones and append them
+
+        Returns:
+            dict of zone name to its raw bucket stats entries
+        """
+        with ThreadPoolExecutor(max_workers=len(self.zones)) as executor:
+            futures = {zone: executor.submit(self.fetch, zone) for zone in self.zones}
+            snapshot = {zone: future.result() for zone, future in futures.items()}
+        now = time.time()
+        with self.lock:
+            for zone, stats in snapshot.items():
+                by_name = {bucket_key(each): each for each in stats}
+                series = self.series[zone]
+                series["time"].append(now)
+                for name, columns in series["buckets"].items():
+                    each = by_name.get(name, {})
+                    main = each.get("usage", {}).get("rgw.main", {})
+                    columns["num_objects"].append(main.get("num_objects", 0))
+                    columns["size_actual"].append(main.get("size_actual", 0))
+                    columns["num_shards"].append(each.get("num_shards", 0))
+        return snapshot
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.record()
+            except Exception as e:
+                # a failed cycle leaves a gap, the recording goes on
+                log.warning(f"bucket stats cycle failed: {e}")
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        """
+        This function starts recording in a background thread
+        """
+        log.info(
+            f"recording bucket stats of {len(self.bucket_names)} bucket(s) on "
+            f"{', '.join(self.zones)} every {self.interval}s"
+        )
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def totals(self, zone, field="num_objects"):
+        """
+        This function returns (time, total of field over the buckets) per cycle of a zone
+        """
+        with self.lock:
+            series = self.series[zone]
+            columns = [each[field] for each in series["buckets"].values()]
+            return list(series["time"]), [sum(values) for values in zip(*columns)]
+
+    def rates(self, zone, bucket_name=None):
+        """
+        This function returns the objects/sec between consecutive cycles
+
+        Parameters:
+            zone(str): zone name
+            bucket_name(str): one bucket, all recorded buckets by default
+
+        Returns:
+            list of (time, objects/sec), the time being the end of the interval
+        """
+        if bucket_name is None:
+            times, counts = self.totals(zone)
+        else:
+            with self.lock:
+                times = list(self.series[zone]["time"])
+                counts = list(self.series[zone]["buckets"][bucket_name]["num_objects"])
+        rates = []
+        for i in range(1, len(times)):
+            elapsed = times[i] - times[i - 1]
+            if elapsed > 0:
+                rates.append((times[i], (counts[i] - counts[i - 1]) / elapsed))
+        return rates
+
+    def summary(self):
+        """
+        This function summarises the recording per zone
+
+        Returns:
+            dict of zone name to {"kind", "cycles", "objects", "avg_rate", "peak_rate"},
+            kind being 'ingest' for the reference zone and 'sync' for the others
+        """
+        summary = {}
+        for zone in self.zones:
+            times, counts = self.totals(zone)
+            rates = [rate for _, rate in self.rates(zone)]
+            # from the first to the last change, idle cycles do not lower the rate
+            changes = [i for i in range(1, len(counts)) if counts[i] != counts[i - 1]]
+            avg_rate = 0
+            if changes:
+                start, end = changes[0] - 1, changes[-1]
+                avg_rate = (counts[end] - counts[start]) / (times[end] - times[start])
+            summary[zone] = {
+                "kind": "ingest" if zone == self.reference else "sync",
+                "cycles": len(times),
+                "objects": counts[-1] if counts else None,
+                "avg_rate": avg_rate,
+                "peak_rate": max(rates) if rates else 0,
+            }
+        return summary
+
+    def log_summary(self):
+        for zone, each in self.summary().items():
+            log.info(
+                f"{zone}: {each['kind']} {each['avg_rate']:.1f} objects/s avg, "
+                f"{each['peak_rate']:.1f} peak, {each['objects']} objects after "
+                f"{each['cycles']} cycle(s)"
+            )
+
+    def save(self, fname):
+        """
+        This function writes the series as columns, with the summary, to a json file
+        """
+        with self.lock:
+            doc = {
+                "reference": self.reference,
+                "zones": {
+                    zone: {
+                        "time": list(series["time"]),
+                        "buckets": {
+                            name: {
+                                field: list(values) for field, values in columns.items()
+                            }
+                            for name, columns in series["buckets"].items()
+                        },
+                    }
+                    for zone, series in self.series.items()
+                },
+            }
+        doc["summary"] = self.summary()
+        with open(fname, "w") as fp:
+            json.dump(doc, fp, separators=(",", ":"))
+        log.info(f"bucket stats series written to {fname}")
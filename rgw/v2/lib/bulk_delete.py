@@ -0,0 +1,385 @@
+"""
+Bulk deletion engine
+
+Empties buckets with DeleteObjects instead of one request per key: the
+listing pages (up to 1000 keys, the DeleteObjects limit) are streamed into
+a thread pool which deletes them concurrently while the next pages are
+listed, with a bounded number of batches in flight. Throttled and 5xx
+batches, and keys failing with a retriable error, are retried with
+exponential backoff. Objects, object versions and delete markers, and
+incomplete multipart uploads are handled, the keys deleted are returned so
+that callers can record them in io_info with a single update.
+
+Based on the producer/consumer design of
+rgw/standalone/rgw_bulk_delete_versioned_olh.py.
+
+usage:
+
+    deleter = BulkDeleter(bucket.meta.client, bucket.name)
+    result = deleter.purge()
+    KeyIoInfo().set_keys_deleted(bucket.name, result.deleted_keys)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+log = logging.getLogger()
+
+# DeleteObjects takes at most 1000 keys
+BULK_DELETE_BATCH_SIZE = 1000
+BULK_DELETE_CONCURRENCY = 16
+BULK_DELETE_MAX_RETRIES = 8
+RETRIABLE_ERROR_CODES = (
+    "SlowDown",
+    "Throttling",
+    "RequestTimeout",
+    "InternalError",
+    "ServiceUnavailable",
+)
+
+
+def backoff(attempt):
+    """
+    This function returns the seconds to sleep before the given retry, with jitter
+    """
+    return min(60, 0.5 * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+
+class BulkDeleteResult(object):
+    """
+    Outcome of a bulk deletion
+    """
+
+    def __init__(self):
+        self.deleted = []
+        self.errors = []
+        self.batches = 0
+        self.attempts = 0
+        self.bytes = 0
+        self.min_size = None
+        self.elapsed = 0
+
+    @property
+    def deleted_keys(self):
+        """
+        names of the deleted keys, once per key even when several of its versions were deleted
+        """
+        return list(dict.fromkeys(key for key, _ in self.deleted))
+
+    def merge(self, other):
+        self.deleted.extend(other.deleted)
+        self.errors.extend(other.errors)
+        self.batches += other.batches
+        self.attempts += other.attempts
+        self.bytes += other.bytes
+        if other.min_size is not None:
+            self.min_size = (
+                other.min_size
+                if self.min_size is None
+                else min(self.min_size, other.min_size)
+            )
+        self.elapsed += other.elapsed
+        return self
+
+    def __repr__(self):
+        rate = len(self.deleted) / self.elapsed if self.elapsed else 0
+        return (
+            f"{len(self.deleted)} deleted, {len(self.errors)} failed, in "
+            f"{self.batches} batches and {self.elapsed:.1f}s ({rate:.0f}/s)"
+        )
+
+
+class BulkDeleter(object):
+    """
+    This class deletes the contents of a bucket in concurrent DeleteObjects batches
+    """
+
+    def __init__(
+        self,
+        s3_client,
+        bucket_name,
+        batch_size=BULK_DELETE_BATCH_SIZE,
+        concurrency=BULK_DELETE_CONCURRENCY,
+        max_retries=BULK_DELETE_MAX_RETRIES,
+    ):
+        """
+        Parameters:
+            s3_client: boto3 s3 client, e.g. bucket.meta.client
+            bucket_name(str): bucket to delete from
+            batch_size(int): keys per DeleteObjects request, at most 1000
+            concurrency(int): batches deleted at a time
+            max_retries(int): attempts per batch before its keys count as failed
+        """
+        self.client = s3_client
+        self.bucket_name = bucket_name
+        self.batch_size = min(batch_size, BULK_DELETE_BATCH_SIZE)
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+
+    def call_with_retries(self, func, **kwargs):
+        """
+        This function calls an s3 api, retrying throttling, 5xx and connection errors
+
+        Returns:
+            (response, attempts)
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return func(**kwargs), attempt
+            except ClientError as e:
+                code = e.response.get("Error", {}).get("Code", "")
+                status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+                retriable = code in RETRIABLE_ERROR_CODES or 500 <= int(status) < 600
+                if not retriable or attempt >= self.max_retries:
+                    raise
+                log.info(
+                    f"{func.__name__} retry {attempt} (code={code} status={status})"
+                )
+            except EndpointConnectionError as e:
+                if attempt >= self.max_retries:
+                    raise
+                log.info(f"{func.__name__} retry {attempt}: {e}")
+            time.sleep(backoff(attempt))
+
+    def delete_batch(self, batch):
+        """
+        This function deletes a batch of (key, version_id) with DeleteObjects
+
+        Keys failing with a retriable error are retried on their own, the
+        others count as failed.
+
+        Returns:
+            BulkDeleteResult of the batch
+        """
+        result = BulkDeleteResult()
+        pending = batch
+        for attempt in range(1, self.max_retries + 1):
+            objects = [
+                {"Key": key, "VersionId": version_id}
+                if version_id is not None
+                else {"Key": key}
+                for key, version_id in pending
+            ]
+            try:
+                resp, attempts = self.call_with_retries(
+                    self.client.delete_objects,
+                    Bucket=self.bucket_name,
+                    Delete={"Objects": objects, "Quiet": True},
+                )
+            except (ClientError, EndpointConnectionError) as e:
+                log.error(f"DeleteObjects of {len(pending)} keys failed: {e}")
+                result.errors.extend((key, vid, str(e)) for key, vid in pending)
+                result.attempts += attempt
+                return result
+            result.batches += 1
+            result.attempts += attempts
+            failed = {}
+            for error in resp.get("Errors", []):
+                failed[(error["Key"], error.get("VersionId"))] = error
+            retry = []
+            # errors are matched back to the requested (key, version_id), so a
+            # retry keeps the version even when the error does not name it
+            for key, version_id in pending:
+                error = failed.get((key, version_id)) or failed.get((key, None))
+                if error is None:
+                    result.deleted.append((key, version_id))
+                elif (
+                    error.get("Code") in RETRIABLE_ERROR_CODES
+                    and attempt < self.max_retries
+                ):
+                    retry.append((key, version_id))
+                else:
+                    result.errors.append(
+                        (
+                            key,
+                            version_id,
+                            f"{error.get('Code')}: {error.get('Message')}",
+                        )
+                    )
+            if not retry:
+                break
+            pending = retry
+            time.sleep(backoff(attempt))
+        return result
+
+    def run(self, pages, describe):
+        """
+        This function deletes the batches of pages concurrently, listing and deleting overlap
+
+        Parameters:
+            pages: iterable of lists of (key, version_id, size)
+            describe(str): what is deleted, for the log
+
+        Returns:
+            BulkDeleteResult
+        """
+        started = time.perf_counter()
+        result = BulkDeleteResult()
+        lock = threading.Lock()
+        # bounds the batches listed but not deleted yet
+        slots = threading.BoundedSemaphore(self.concurrency * 2)
+
+        def consume(batch):
+            try:
+                batch_result = self.delete_batch(batch)
+                with lock:
+                    result.merge(batch_result)
+            finally:
+                slots.release()
+
+        # sizes are tallied here, result is shared with the delete threads
+        listed_bytes, min_size = 0, None
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = []
+            batch = []
+            for page in pages:
+                for key, version_id, size in page:
+                    batch.append((key, version_id))
+                    if size is not None:
+                        listed_bytes += size
+                        min_size = size if min_size is None else min(min_size, size)
+                    if len(batch) == self.batch_size:
+                        slots.acquire()
+                        futures.append(executor.submit(consume, batch))
+                        batch = []
+            if batch:
+                slots.acquire()
+                futures.append(executor.submit(consume, batch))
+            for future in futures:
+                future.result()
+        result.elapsed = time.perf_counter() - started
+        result.bytes, result.min_size = listed_bytes, min_size
+        log.info(f"bulk delete of {describe} in {self.bucket_name}: {result}")
+        for key, version_id, error in result.errors[:10]:
+            log.error(f"  not deleted {key} {version_id or ''}: {error}")
+        return result
+
+    def list_objects(self, prefix=None):
+        kwargs = {"Bucket": self.bucket_name, "MaxKeys": self.batch_size}
+        if prefix:
+            kwargs["Prefix"] = prefix
+        while True:
+            resp, _ = self.call_with_retries(self.client.list_objects_v2, **kwargs)
+            yield [
+                (each["Key"], None, each.get("Size"))
+                for each in resp.get("Contents", [])
+            ]
+            if not resp.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = resp["NextContinuationToken"]
+
+    def list_versions(self, prefix=None, key=None):
+        kwargs = {"Bucket": self.bucket_name, "MaxKeys": self.batch_size}
+        if prefix or key:
+            kwargs["Prefix"] = key or prefix
+        while True:
+            resp, _ = self.call_with_retries(self.client.list_object_versions, **kwargs)
+            page = [
+                (each["Key"], each["VersionId"], each.get("Size"))
+                for each in resp.get("Versions", []) + resp.get("DeleteMarkers", [])
+                if key is None or each["Key"] == key
+            ]
+            yield page
+            if not resp.get("IsTruncated"):
+                return
+            kwargs["KeyMarker"] = resp.get("NextKeyMarker")
+            kwargs["VersionIdMarker"] = resp.get("NextVersionIdMarker")
+
+    def delete_objects(self, prefix=None):
+        """
+        This function deletes the current objects, on a versioned bucket this adds delete markers
+
+        Returns:
+            BulkDeleteResult
+        """
+        return self.run(self.list_objects(prefix), "objects")
+
+    def delete_versions(self, prefix=None, key=None):
+        """
+        This function deletes all object versions and delete markers
+
+        Parameters:
+            prefix(str): only of the keys with this prefix
+            key(str): only of this key
+
+        Returns:
+            BulkDeleteResult
+        """
+        return self.run(self.list_versions(prefix, key), "versions")
+
+    def abort_multipart_uploads(self, prefix=None):
+        """
+        This function aborts the incomplete multipart uploads, concurrently
+
+        Returns:
+            BulkDeleteResult, deleted holding (key, upload_id)
+        """
+        started = time.perf_counter()
+        result = BulkDeleteResult()
+        kwargs = {"Bucket": self.bucket_name}
+        if prefix:
+            kwargs["Prefix"] = prefix
+        uploads = []
+        while True:
+            resp, _ = self.call_with_retries(
+                self.client.list_multipart_uploads, **kwargs
+            )
+            uploads.extend(
+                (each["Key"], each["UploadId"]) for each in resp.get("Uploads", [])
+            )
+            if not resp.get("IsTruncated"):
+                break
+            kwargs["KeyMarker"] = resp.get("NextKeyMarker")
+            kwargs["UploadIdMarker"] = resp.get("NextUploadIdMarker")
+
+        def abort(upload):
+            key, upload_id = upload
+            try:
+                self.call_with_retries(
+                    self.client.abort_multipart_upload,
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+                return upload, None
+            except (ClientError, EndpointConnectionError) as e:
+                return upload, str(e)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for (key, upload_id), error in executor.map(abort, uploads):
+                if error is None:
+                    result.deleted.append((key, upload_id))
+                else:
+                    result.errors.append((key, upload_id, error))
+        result.batches = len(uploads)
+        result.elapsed = time.perf_counter() - started
+        if uploads:
+            log.info(f"abort of multipart uploads in {self.bucket_name}: {result}")
+        return result
+
+    def purge(self, prefix=None):
+        """
+        This function removes everything from the bucket: versions, delete markers and multipart uploads
+
+        On an unversioned bucket the versions listing returns the objects
+        with a 'null' version id, so this also empties unversioned buckets.
+
+        Returns:
+            BulkDeleteResult
+        """
+        result = self.delete_versions(prefix)
+        uploads = self.abort_multipart_uploads(prefix)
+        result.errors.extend(uploads.errors)
+        result.elapsed += uploads.elapsed
+        return result
@@ -2,20 +2,26 @@
 Performs rgw operations using curl
 """
 
+import hashlib
 import logging
 
+import v2.utils.utils as utils
+from v2.lib.curl import signed_http
 from v2.tests.aws import reusable as aws_reusable
 
 log = logging.getLogger()
 
 
 class CURL:
-    def __init__(self, user_info, ssh_con, curl_silent=True, ssl=None):
+    def __init__(self, user_info, ssh_con, curl_silent=True, ssl=None, use_curl=False):
         """
         Constructor for curl class
         user_info(dict) : user details
         ssh_con(str) : rgw ip address
+        use_curl(bool) : execute runs the curl binary instead of sending the requests in-process
         """
+        self.use_curl = use_curl
+        self.ssl = ssl
         self.username = user_info["access_key"]
         self.password = user_info["secret_key"]
         self.endpoint_url = aws_reusable.get_endpoint(ssh_con, ssl)
@@ -80,3 +86,88 @@ class CURL:
         cmd = f"{cmd} '{url}'"
         log.info(f"CURL command created: {cmd}")
         return cmd
+
+    def execute(self, debug_info=False, **kwargs):
+        """
+        Sends the request described by the arguments of command, and returns what
+        utils.exec_shell_cmd returns for the curl command line
+
+        The request is signed in-process and sent over a pooled keep-alive connection,
+        unless use_curl is set. The equivalent curl command is logged either way.
+        Args:
+            debug_info(bool): also return the verbose output, request and response headers
+            kwargs: arguments of command
+        Returns: response body, False for a http error or failed connection, the
+            status line and headers for a head request
+        """
+        cmd = self.command(**kwargs)
+        if self.use_curl:
+            return utils.exec_shell_cmd(cmd, debug_info=debug_info)
+        method = kwargs.get("http_method")
+        headers = dict(kwargs.get("headers") or {})
+        data = None
+        payload_hash = signed_http.UNSIGNED_PAYLOAD
+        if kwargs.get("raw_data_list"):
+            data = "&".join(kwargs["raw_data_list"]).encode("utf-8")
+            payload_hash = hashlib.sha256(data).hexdigest()
+            method = method or "POST"
+            if not any(name.lower() == "content-type" for name in headers):
+                headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if kwargs.get("head_request"):
+            method = "HEAD"
+        method = method or ("PUT" if kwargs.get("input_file") else "GET")
+        if kwargs.get("presigned_url"):
+            url = kwargs["presigned_url"]
+        else:
+            url = self.endpoint_url
+            if kwargs.get("url_suffix"):
+                url = f"{url}/{kwargs['url_suffix']}"
+            url = signed_http.encode_url(url)
+            headers = signed_http.sigv4_headers(
+                method, url, headers, self.username, self.password, payload_hash
+            )
+        input_file = None
+        try:
+            if kwargs.get("input_file"):
+                input_file = open(kwargs["input_file"], "rb")
+                data = input_file
+                if any(
+                    name.lower() == "transfer-encoding" and val == "chunked"
+                    for name, val in headers.items()
+                ):
+                    headers = {
+                        name: val
+                        for name, val in headers.items()
+                        if name.lower() not in ("transfer-encoding", "content-length")
+                    }
+                    data = iter(lambda: input_file.read(1024 * 1024), b"")
+            response = signed_http.send(
+                method,
+                url,
+                headers,
+                data,
+                output_file=kwargs.get("output_file"),
+                verify=False,
+            )
+        except Exception as e:
+            log.error(f"request failed: {e}")
+            return False
+        finally:
+            if input_file is not None:
+                input_file.close()
+        verbose = signed_http.verbose_output(response)
+        log.info(f"{method} {url}: {response.status_code} {response.reason}")
+        if response.status_code >= 400:
+            # as curl --fail-with-body
+            log.error(f"{verbose}\n{response.text}")
+            return False
+        if kwargs.get("head_request"):
+            out = signed_http.head_output(response)
+        elif kwargs.get("output_file"):
+            out = ""
+        else:
+            out = response.text
+        log.info(out)
+        if debug_info:
+            return out, verbose
+        return out
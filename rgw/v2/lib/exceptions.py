@@ -204,3 +204,13 @@ class EventRecordDataError(Exception):
     ):
         super().__init__(message)
         self.message = message
+
+
+class WaitTimeoutError(TestExecError):
+    # exception raised when a waited condition is not met within its timeout
+    def __init__(
+        self,
+        message=None,
+    ):
+        super().__init__(message)
+        self.message = message
@@ -3,7 +3,6 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
 import logging
-import time
 import traceback
 from json import loads
 
@@ -130,7 +129,6 @@ class Frontend(RGWSectionOptions):
             )
 
             srv_restarted = self._rgw_service.restart(ssh_con)
-            time.sleep(10)
             if srv_restarted is False:
                 raise RGWBaseException("RGW service restart failed")
             else:
@@ -2,13 +2,147 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import hashlib
+import io
 import logging
+import random
+import string
 
 import v2.utils.utils as utils
 from v2.lib.exceptions import RGWIOGenException
 
 log = logging.getLogger()
 
+DATA_CHUNK_SIZE = 1024 * 1024
+# maps random bytes onto the base64 alphabet, so generated data stays printable
+# like the output of the 'base64 /dev/urandom' pipeline it replaces
+PRINTABLE_TABLE = bytes.maketrans(
+    bytes(range(256)),
+    (
+        (string.ascii_uppercase + string.ascii_lowercase + string.digits + "+/") * 4
+    ).encode(),
+)
+
+
+def new_seed():
+    """
+    Returns a random seed to generate object data from
+    """
+    return random.getrandbits(63)
+
+
+def generate_chunk(seed, index, size=DATA_CHUNK_SIZE):
+    """
+    Function to generate one chunk of object data
+
+    Each chunk is derived from (seed, index) only, so any part of an object
+    can be regenerated without producing the bytes before it.
+
+    Parameters:
+        seed(int): seed of the object
+        index(int): chunk number within the object
+        size(int): bytes to generate, DATA_CHUNK_SIZE except for the last chunk
+
+    Returns:
+        bytes
+    """
+    return random.Random(f"{seed}:{index}").randbytes(size).translate(PRINTABLE_TABLE)
+
+
+def iter_data(seed, size):
+    """
+    Function to yield the data of an object chunk by chunk
+    """
+    for index, offset in enumerate(range(0, size, DATA_CHUNK_SIZE)):
+        yield generate_chunk(seed, index, min(DATA_CHUNK_SIZE, size - offset))
+
+
+def get_data_md5(seed, size):
+    """
+    Function to compute the md5 of generated data without storing it
+    """
+    md5 = hashlib.md5()
+    for chunk in iter_data(seed, size):
+        md5.update(chunk)
+    return md5.hexdigest()
+
+
+class VirtualObject(io.RawIOBase):
+    """
+    Read-only, seekable file object over generated data.
+
+    It can be passed as an upload body without the data touching disk, and
+    the same bytes are produced again from the seed to verify a download.
+    """
+
+    def __init__(self, size, seed=None):
+        self.size = int(size)
+        self.seed = new_seed() if seed is None else seed
+        self.pos = 0
+        self._chunk_index = None
+        self._chunk = b""
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"<VirtualObject size={self.size} seed={self.seed}>"
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        end = self.size if size is None or size < 0 else min(self.size, self.pos + size)
+        out = []
+        while self.pos < end:
+            index, offset = divmod(self.pos, DATA_CHUNK_SIZE)
+            if index != self._chunk_index:
+                self._chunk = generate_chunk(
+                    self.seed,
+                    index,
+                    min(DATA_CHUNK_SIZE, self.size - index * DATA_CHUNK_SIZE),
+                )
+                self._chunk_index = index
+            piece = self._chunk[offset : offset + end - self.pos]
+            out.append(piece)
+            self.pos += len(piece)
+        return b"".join(out)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(0, min(offset, self.size))
+        return self.pos
+
+    def tell(self):
+        return self.pos
+
+
+def virtual_io_generator(size, seed=None):
+    """
+    Function to generate an object that is streamed into the upload body
+
+    Parameters:
+        size(int): object size in bytes
+        seed(int): seed to generate the data from, random if None
+
+    Returns:
+        finfo : object information, 'body' is a VirtualObject to upload
+    """
+    body = VirtualObject(size, seed=seed)
+    return {
+        "name": None,
+        "size": body.size,
+        "md5": get_data_md5(body.seed, body.size),
+        "seed": body.seed,
+        "body": body,
+    }
+
 
 def io_generator(fname, size, type="txt", op="create", **kwargs):
     """
@@ -18,6 +152,8 @@ def io_generator(fname, size, type="txt", op="create", **kwargs):
 
     Parameters:
         op(char): create or append.
+        seed(int): for create, seed to generate the data from, random if not given.
+            The same seed and size always give the same data.
 
     Returns:
         finfo : file information is returned.
@@ -29,12 +165,18 @@ def io_generator(fname, size, type="txt", op="create", **kwargs):
         if op == "create":
             log.info("in create")
             if type == "txt":
-                fcreate = "base64 /dev/urandom | head -c %s > %s" % (size, fname)
-                created = utils.exec_shell_cmd(fcreate)
-                finfo["md5"] = utils.get_md5(fname)
+                seed = kwargs.get("seed")
+                finfo["seed"] = new_seed() if seed is None else seed
+                md5 = hashlib.md5()
+                try:
+                    with open(fname, "wb") as fp:
+                        for chunk in iter_data(finfo["seed"], int(size)):
+                            md5.update(chunk)
+                            fp.write(chunk)
+                except OSError as e:
+                    raise RGWIOGenException("file %s creation error: %s" % (fname, e))
+                finfo["md5"] = md5.hexdigest()
                 finfo["size"] = os.stat(fname).st_size
-                if created is False:
-                    raise RGWIOGenException("file %s creation error" % fname)
             return finfo
         if op == "append":
             log.info("in modify or append")
@@ -0,0 +1,327 @@
+"""
+Open-loop rate limit probe
+
+Measures the RGW rate limiter from within the test process: requests are
+fired on a fixed schedule at a target ops/sec over a pool of connections,
+whatever the responses take, so the request rate is set by the probe and
+not by how fast the client turns around. Every request records its
+scheduled time, start, end and HTTP status, from which the probe reports
+the admitted rate, when the first 503 came and how many requests were
+admitted before it (the burst the limiter allowed), and the rate at which
+requests are admitted again after it (the token refill).
+
+The same probe serves the per-user, per-bucket and global limits, the scope
+only decides which limit the results are checked against.
+
+usage:
+
+    probe = RateLimitProbe.from_s3cfg(bucket_name, ssl)
+    result = probe.run("read", count=max_read_ops + 1)
+    result.log_report()
+    assert result.throttled, "Rate limit slowdown not observed, failing!"
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from configparser import RawConfigParser
+from pathlib import Path
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+log = logging.getLogger()
+
+RATE_PROBE_OPS_PER_SEC = 50
+RATE_PROBE_CONCURRENCY = 16
+# rgw_ratelimit_interval, the limits are per minute by default
+RATE_LIMIT_INTERVAL = 60
+THROTTLED_STATUS = 503
+OPS = ("read", "write", "list", "delete")
+
+
+class RateProbeResult(object):
+    """
+    Requests of a probe run, times in seconds from the start of the run
+    """
+
+    def __init__(self, op, rate, count):
+        self.op = op
+        self.rate = rate
+        self.scheduled = [None] * count
+        self.started = [None] * count
+        self.ended = [None] * count
+        self.status = [None] * count
+
+    @property
+    def total(self):
+        return len(self.status)
+
+    @property
+    def admitted_times(self):
+        return [
+            self.ended[i]
+            for i in range(self.total)
+            if self.status[i] not in (THROTTLED_STATUS, 0)
+        ]
+
+    @property
+    def throttled(self):
+        return self.status.count(THROTTLED_STATUS)
+
+    @property
+    def errors(self):
+        return self.status.count(0)
+
+    @property
+    def first_throttle(self):
+        """
+        end time of the first 503, None when nothing was throttled
+        """
+        times = [
+            self.ended[i]
+            for i in range(self.total)
+            if self.status[i] == THROTTLED_STATUS
+        ]
+        return min(times) if times else None
+
+    def report(self):
+        """
+        This function summarises the run
+
+        Returns:
+            dict with the offered and admitted rates, the first 503, the requests admitted
+            before it and the refill rate after it
+        """
+        duration = max(self.ended) if self.total else 0
+        admitted = self.admitted_times
+        first_throttle = self.first_throttle
+        report = {
+            "op": self.op,
+            "target_rate": self.rate,
+            "requests": self.total,
+            "admitted": len(admitted),
+            "throttled": self.throttled,
+            "errors": self.errors,
+            "duration": duration,
+            "offered_rate": 0,
+            # how late the requests went out, a large lag means the client
+            # and not the limiter set the rate
+            "max_lag": max(s - t for s, t in zip(self.started, self.scheduled)),
+            "admitted_rate": len(admitted) / duration if duration else 0,
+            "first_throttle": first_throttle,
+            "admitted_before_throttle": len(admitted),
+            "refill_rate": None,
+        }
+        if self.total > 1 and self.started[-1] > self.started[0]:
+            report["offered_rate"] = (self.total - 1) / (
+                self.started[-1] - self.started[0]
+            )
+        if first_throttle is not None:
+            report["admitted_before_throttle"] = sum(
+                1 for t in admitted if t < first_throttle
+            )
+            after = sorted(t for t in admitted if t > first_throttle)
+            if len(after) > 1 and after[-1] > after[0]:
+                report["refill_rate"] = (len(after) - 1) / (after[-1] - after[0])
+        return report
+
+    def log_report(self, scope=None):
+        report = self.report()
+        log.info(
+            f"{scope + ' ' if scope else ''}{report['op']} probe: "
+            f"{report['requests']} requests at {report['offered_rate']:.1f}/s "
+            f"(target {report['target_rate']}/s, max lag {report['max_lag']:.3f}s), "
+            f"{report['admitted']} admitted, {report['throttled']} throttled, "
+            f"{report['errors']} failed"
+        )
+        if report["first_throttle"] is not None:
+            refill = report["refill_rate"]
+            log.info(
+                f"first 503 after {report['first_throttle']:.3f}s and "
+                f"{report['admitted_before_throttle']} admitted requests, refill "
+                + (f"{refill * RATE_LIMIT_INTERVAL:.1f} ops/min" if refill else "n/a")
+            )
+        return report
+
+    def save(self, fname):
+        """
+        This function writes one json line per request: scheduled, started, ended, status
+        """
+        with open(fname, "w") as fp:
+            for each in zip(self.scheduled, self.started, self.ended, self.status):
+                fp.write(json.dumps(each) + "\n")
+
+
+class RateLimitProbe(object):
+    """
+    This class fires s3 requests at a bucket on an open-loop schedule
+    """
+
+    def __init__(self, s3_client, bucket_name, concurrency=RATE_PROBE_CONCURRENCY):
+        """
+        Parameters:
+            s3_client: boto3 s3 client, without retries
+            bucket_name(str): bucket to send the requests to
+            concurrency(int): requests in flight at most
+        """
+        self.client = s3_client
+        self.bucket_name = bucket_name
+        self.concurrency = concurrency
+
+    @classmethod
+    def from_s3cfg(cls, bucket_name, ssl=None, concurrency=RATE_PROBE_CONCURRENCY):
+        """
+        This function creates a probe with the user and endpoint s3cmd is configured with
+
+        Parameters:
+            bucket_name(str): bucket, a 'tenant/bucket' name is reduced to the bucket
+            ssl(bool): use https, otherwise as set in the s3cmd config
+        """
+        parser = RawConfigParser()
+        parser.read(str(Path.home()) + "/.s3cfg")
+        ssl = ssl or parser.get("default", "use_https", fallback="False") == "True"
+        endpoint = parser.get("default", "host_base")
+        client = boto3.client(
+            "s3",
+            aws_access_key_id=parser.get("default", "access_key"),
+            aws_secret_access_key=parser.get("default", "secret_key"),
+            endpoint_url=f"{'https' if ssl else 'http'}://{endpoint}",
+            verify=False,
+            config=Config(
+                max_pool_connections=concurrency,
+                # a retried 503 would hide the throttling
+                retries={"total_max_attempts": 1},
+            ),
+        )
+        return cls(client, bucket_name.split("/")[-1], concurrency)
+
+    def request(self, op, i, key=None, body=b""):
+        """
+        This function sends one request and returns its http status, 0 when it got no response
+        """
+        try:
+            if op == "read":
+                resp = self.client.get_object(
+                    Bucket=self.bucket_name, Key=key or "rate_probe_object"
+                )
+                resp["Body"].read()
+            elif op == "write":
+                resp = self.client.put_object(
+                    Bucket=self.bucket_name, Key=f"{key or 'rate_probe_'}{i}", Body=body
+                )
+            elif op == "list":
+                resp = self.client.list_objects_v2(Bucket=self.bucket_name)
+            else:
+                resp = self.client.delete_object(
+                    Bucket=self.bucket_name, Key=f"{key or 'rate_probe_'}{i}"
+                )
+            return resp["ResponseMetadata"]["HTTPStatusCode"]
+        except ClientError as e:
+            # a 404 on a read is an admitted request all the same
+            return int(e.response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0))
+        except Exception as e:
+            log.error(f"{op} request {i} failed: {e}")
+            return 0
+
+    def prepare_objects(self, count, object_size=1024, key=None):
+        """
+        This function uploads the objects the delete requests of a run remove
+        """
+        body = b"r" * object_size
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            statuses = list(
+                executor.map(
+                    lambda i: self.request("write", i, key, body), range(count)
+                )
+            )
+        created = sum(1 for status in statuses if status == 200)
+        log.info(f"{created} of {count} objects uploaded to {self.bucket_name}")
+        return created
+
+    def run(
+        self,
+        op,
+        count=None,
+        rate=RATE_PROBE_OPS_PER_SEC,
+        duration=None,
+        object_size=1024,
+        key=None,
+    ):
+        """
+        This function fires requests at the target rate and records each of them
+
+        The requests go out at fixed times, start + i / rate, whether or not the
+        earlier ones have completed.
+
+        Parameters:
+            op(str): read, write, list or delete
+            count(int): requests to send
+            rate(float): target ops/sec
+            duration(float): seconds to send for, when count is not given
+            object_size(int): bytes per write
+            key(str): object read, or key prefix of the writes and deletes
+
+        Returns:
+            RateProbeResult
+        """
+        if op not in OPS:
+            raise ValueError(f"unknown op {op}, expected one of {OPS}")
+        if count is None:
+            count = max(1, int(duration * rate))
+        result = RateProbeResult(op, rate, count)
+        body = b"r" * object_size if op == "write" else b""
+        log.info(
+            f"probing {op} on {self.bucket_name}: {count} requests at {rate}/s "
+            f"over {self.concurrency} connections"
+        )
+        start = time.perf_counter()
+
+        def fire(i):
+            result.started[i] = time.perf_counter() - start
+            result.status[i] = self.request(op, i, key, body)
+            result.ended[i] = time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for i in range(count):
+                result.scheduled[i] = i / rate
+                delay = start + result.scheduled[i] - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(fire, i)
+        return result
+
+
+def check_limit(result, limit, scope=None):
+    """
+    This function checks a run against an ops limit of the scope
+
+    The requests admitted before the first 503 must not exceed the limit, and
+    when the run went on long enough the refill must not exceed limit per
+    interval.
+
+    Returns:
+        list of the violations found, empty when the limit held
+    """
+    report = result.log_report(scope)
+    violations = []
+    if report["first_throttle"] is None:
+        violations.append(f"no 503 in {report['requests']} {result.op} requests")
+    elif report["admitted_before_throttle"] > limit:
+        violations.append(
+            f"{report['admitted_before_throttle']} {result.op} requests admitted "
+            f"before the first 503, limit is {limit}"
+        )
+    refill = report["refill_rate"]
+    if refill is not None and refill * RATE_LIMIT_INTERVAL > limit * 1.1:
+        violations.append(
+            f"{result.op} refill {refill * RATE_LIMIT_INTERVAL:.1f} ops/min "
+            f"above the limit {limit}"
+        )
+    return violations
@@ -3,12 +3,18 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
 import argparse
+import hashlib
 import logging
 import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import boto3
 import botocore
+import botocore.config
 from v2.lib.exceptions import SyncFailedError, TestExecError
+from v2.lib.manage_data import VirtualObject
 from v2.utils import utils
 from v2.utils.io_info_config import IoInfoConfig
 from v2.utils.log import configure_logging
@@ -18,6 +24,9 @@ log = logging.getLogger()
 
 
 IO_INFO_FNAME = "io_info.yaml"
+# objects verified in parallel by ReadIOInfo.verify_io
+VERIFY_WORKERS = 16
+STREAM_CHUNK_SIZE = 1024 * 1024
 
 
 def check_object_exists(obj, bucket):
@@ -36,82 +45,188 @@ def check_object_exists(obj, bucket):
             raise SyncFailedError("object not synced! data sync failure")
 
 
-def verify_key(each_key, bucket):
+def stream_md5(body, chunk_size=STREAM_CHUNK_SIZE):
     """
-    This function verifies data of each key in the bucket
+    This function computes the md5 of an object body while reading it
 
     Parameters:
-        key(char): key to be verified
-        bucket(char): bucket name
+        body: StreamingBody of a get_object response
+        chunk_size(int): bytes read per chunk
+
+    Returns:
+        md5 hexdigest and the number of bytes read
     """
-    log.info(f"verifying data for key: {os.path.basename(each_key['name'])}")
-    check_object_exists(os.path.basename(each_key["name"]), bucket)
-    key_from_s3 = bucket.Object(os.path.basename(each_key["name"]))
-    log.info("verifying size")
-    log.info(f"size from yaml: {each_key['size']}")
-    log.info(f"size from s3: {key_from_s3.content_length}")
-    if int(each_key["size"]) != int(key_from_s3.content_length):
-        raise TestExecError("Size not matched")
-    log.info("verifying md5")
-    log.info(f"md5_local: {each_key['md5_local']}")
-    key_from_s3.download_file("download.temp")
-    downloaded_md5 = utils.get_md5("download.temp")
-    log.info(f"md5_from_s3: {downloaded_md5}")
-    if each_key["md5_local"] != downloaded_md5:
-        raise TestExecError("Md5 not matched")
-    utils.exec_shell_cmd("sudo rm -rf download.temp")
-    log.info(f"verification complete for the key: {key_from_s3.key}")
-
-
-def verify_key_with_version(each_key, bucket):
+    md5 = hashlib.md5()
+    size = 0
+    for chunk in body.iter_chunks(chunk_size):
+        md5.update(chunk)
+        size += len(chunk)
+    body.close()
+    return md5.hexdigest(), size
+
+
+def stream_compare(body, seed, size, chunk_size=STREAM_CHUNK_SIZE):
     """
-    This function verifies data of each key in a versioned bucket
+    This function computes the md5 of an object body and compares it with the
+    data generated again from its seed, see manage_data.io_generator
 
     Parameters:
-        key(char): key to be verified
-        bucket(char): name of the versoiined bucket
+        body: StreamingBody of a get_object response
+        seed(int): seed the object data was generated from
+        size(int): size of the uploaded object
 
     Returns:
+        md5 hexdigest, the number of bytes read and the offset of the first
+        byte differing from the generated data, None if there is none
+    """
+    expected = VirtualObject(size, seed=seed)
+    md5 = hashlib.md5()
+    read = 0
+    mismatch_at = None
+    for chunk in body.iter_chunks(chunk_size):
+        md5.update(chunk)
+        if mismatch_at is None:
+            generated = expected.read(len(chunk))
+            if chunk != generated:
+                mismatch_at = read + next(
+                    (i for i, (a, b) in enumerate(zip(chunk, generated)) if a != b),
+                    min(len(chunk), len(generated)),
+                )
+        read += len(chunk)
+    body.close()
+    return md5.hexdigest(), read, mismatch_at
+
 
+def verify_object(client, bucket_name, key_name, expected, version_id=None):
     """
-    log.info(f"verifying data for key: {os.path.basename(each_key['name'])}")
-    check_object_exists(os.path.basename(each_key["name"]), bucket)
-    key_from_s3 = bucket.Object(os.path.basename(each_key["name"]))
-    no_of_versions = len(each_key["versioning_info"])
-    log.info(f"no of versions: {no_of_versions}")
-    for each_version in each_key["versioning_info"]:
-        log.info(f"version_id: {each_version['version_id']}")
-        key_from_s3_with_version = key_from_s3.get(VersionId=each_version["version_id"])
-        log.info("verifying size")
-        log.info(f"size from yaml: {each_version['size']}")
-        log.info(f"size from s3 {key_from_s3_with_version['ContentLength']}")
-        if int(each_version["size"] != int(key_from_s3_with_version["ContentLength"])):
-            raise TestExecError("Size not matched")
-        log.info("verifying md5")
-        log.info(f"md5_local: {each_version['md5_local']}")
-        key_from_s3.download_file(
-            "download.temp", ExtraArgs={"VersionId": each_version["version_id"]}
+    This function streams an object into an md5 hasher and verifies its size and md5
+
+    Parameters:
+        client: boto3 s3 client
+        bucket_name(char): name of the bucket
+        key_name(char): name of the object
+        expected(dict): key or version info from io_info with size and md5_local,
+            and the seed of generated data when it was recorded
+        version_id(char): version to verify, latest if None
+
+    Returns:
+        number of bytes verified
+    """
+    get_kwargs = {"Bucket": bucket_name, "Key": key_name}
+    if version_id:
+        get_kwargs["VersionId"] = version_id
+    try:
+        resp = client.get_object(**get_kwargs)
+    except botocore.exceptions.ClientError as ex:
+        if ex.response["Error"]["Code"] == "NoSuchKey":
+            raise SyncFailedError("object not synced! data sync failure")
+        raise
+    if int(expected["size"]) != int(resp["ContentLength"]):
+        raise TestExecError(
+            f"Size not matched for {bucket_name}/{key_name}: "
+            f"yaml {expected['size']}, s3 {resp['ContentLength']}"
+        )
+    seed = expected.get("seed")
+    if seed is None:
+        downloaded_md5, size = stream_md5(resp["Body"])
+    else:
+        downloaded_md5, size, mismatch_at = stream_compare(
+            resp["Body"], seed, int(expected["size"])
+        )
+    if expected["md5_local"] != downloaded_md5:
+        detail = ""
+        if seed is not None and mismatch_at is not None:
+            detail = (
+                f", first byte differing from the data of seed {seed} "
+                f"at offset {mismatch_at}"
+            )
+        raise TestExecError(
+            f"Md5 not matched for {bucket_name}/{key_name}: "
+            f"md5_local {expected['md5_local']}, md5_from_s3 {downloaded_md5}{detail}"
         )
-        downloaded_md5 = utils.get_md5("download.temp")
-        log.info(f"md5_from_s3: {downloaded_md5}")
-        if each_version["md5_local"] != downloaded_md5:
-            raise TestExecError("Md5 not matched")
-        utils.exec_shell_cmd("sudo rm -rf download.temp")
+    return size
+
+
+def verify_deleted_object(client, bucket_name, key_name):
+    """
+    This function verifies that a key marked as deleted in io_info is not readable
+    """
+    try:
+        client.head_object(Bucket=bucket_name, Key=key_name)
+    except botocore.exceptions.ClientError:
+        return 0
+    raise AssertionError(f"Verification of deleted object '{key_name}' failed")
+
+
+def verify_deleted_bucket(client, bucket_name):
+    """
+    This function verifies that a bucket marked as deleted in io_info does not exist
+    """
+    log.info(f"Verification of deleted bucket '{bucket_name}' starts")
+    try:
+        client.head_bucket(Bucket=bucket_name)
+    except botocore.exceptions.ClientError as e:
+        if int(e.response["Error"]["Code"]) == 404:
+            log.info(f"Verification of deleted bucket '{bucket_name}' successful")
+            return 0
+    raise AssertionError(f"Verification of deleted bucket '{bucket_name}' failed")
+
+
+class VerificationSummary(object):
+    """
+    This class collects pass/fail counts and bytes verified per user and bucket
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}
+        self.failures = []
+
+    def record(self, user_id, bucket_name, nbytes=0, error=None):
+        with self.lock:
+            stats = self.buckets.setdefault(
+                (user_id, bucket_name), {"passed": 0, "failed": 0, "bytes": 0}
+            )
+            if error is None:
+                stats["passed"] += 1
+                stats["bytes"] += nbytes
+            else:
+                stats["failed"] += 1
+                self.failures.append(f"{user_id}/{bucket_name}: {error}")
+
+    def report(self, elapsed):
+        log.info("verification summary:")
+        log.info(
+            f"{'user':<30} {'bucket':<40} {'passed':>8} {'failed':>8} {'MiB':>10} {'MiB/s':>8}"
+        )
+        total_bytes = 0
+        for (user_id, bucket_name), stats in sorted(self.buckets.items()):
+            mib = stats["bytes"] / (1024 * 1024)
+            total_bytes += stats["bytes"]
+            log.info(
+                f"{user_id:<30} {bucket_name:<40} {stats['passed']:>8} "
+                f"{stats['failed']:>8} {mib:>10.2f} {mib / max(elapsed, 1e-6):>8.2f}"
+            )
+        total_mib = total_bytes / (1024 * 1024)
         log.info(
-            f"verification complete for the key: {key_from_s3.key} ---> version_id: {each_version['version_id']}"
+            f"verified {total_mib:.2f} MiB in {elapsed:.2f}s "
+            f"({total_mib / max(elapsed, 1e-6):.2f} MiB/s), "
+            f"{len(self.failures)} failure(s)"
         )
 
 
 class ReadIOInfo(object):
-    def __init__(self, yaml_fname=IO_INFO_FNAME):
+    def __init__(self, yaml_fname=IO_INFO_FNAME, max_workers=VERIFY_WORKERS):
         self.yaml_fname = yaml_fname
         self.file_op = FileOps(self.yaml_fname, type="yaml")
+        self.max_workers = max_workers
 
     def verify_io(self):
         """
         This function to verify the data of buckets owned by a user
 
-        Data verification happens to all the buckets of a particular user for both versioned and normal buckets
+        Data verification happens to all the buckets of a particular user for both versioned and normal buckets.
+        Objects are streamed into an md5 hasher over a bounded thread pool, with one s3 client per user.
         Parameters:
 
         Returns:
@@ -122,93 +237,106 @@ class ReadIOInfo(object):
         users = data["users"]
         endpoint_url = utils.get_rgw_endpoint_url()
         is_secure = True if endpoint_url.startswith("https") else False
+        summary = VerificationSummary()
+        # bounds the verifications queued ahead of the workers
+        in_flight = threading.BoundedSemaphore(self.max_workers * 4)
+        started = time.time()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
 
-        for each_user in users:
-            if each_user["deleted"] is False:
-                log.info("verifying data for the user: \n")
-                log.info(f"user_id: {each_user['user_id']}")
-                log.info(f"access_key: {each_user['access_key']}")
-                log.info(f"secret_key: {each_user['secret_key']}")
-                conn = boto3.resource(
+            def submit(user_id, bucket_name, fn, *args, **kwargs):
+                def done(future):
+                    try:
+                        summary.record(user_id, bucket_name, nbytes=future.result())
+                    except Exception as e:
+                        log.error(f"verification failed: {e}")
+                        summary.record(user_id, bucket_name, error=e)
+                    in_flight.release()
+
+                in_flight.acquire()
+                executor.submit(fn, *args, **kwargs).add_done_callback(done)
+
+            for each_user in users:
+                user_id = each_user["user_id"]
+                if each_user["deleted"] is not False:
+                    log.info(f"Verification of deleted user '{user_id}' starts")
+                    cmd = f"radosgw-admin user list"
+                    out = utils.exec_shell_cmd(cmd)
+                    if user_id not in out:
+                        log.info(f"Verification of deleted user '{user_id}' successful")
+                    else:
+                        raise AssertionError(
+                            f"Verification of deleted user '{user_id}' failed"
+                        )
+                    continue
+                log.info(f"verifying data for the user: {user_id}")
+                client = boto3.client(
                     "s3",
                     aws_access_key_id=each_user["access_key"],
                     aws_secret_access_key=each_user["secret_key"],
                     endpoint_url=endpoint_url,
                     use_ssl=is_secure,
                     verify=False,
+                    config=botocore.config.Config(
+                        max_pool_connections=self.max_workers
+                    ),
                 )
-
                 for each_bucket in each_user["bucket"]:
-                    if each_bucket["deleted"] is False:
-                        log.info(f"verifying data for bucket: {each_bucket['name']}")
-                        bucket_from_s3 = conn.Bucket(each_bucket["name"])
-                        curr_versioning_status = each_bucket["curr_versioning_status"]
-                        log.info(f"curr_versioning_status: {curr_versioning_status}")
-                        if not each_bucket["keys"]:
-                            log.info("keys are not created")
-                        else:
-                            no_of_keys = len(each_bucket["keys"])
-                            log.info(f"no_of_keys: {no_of_keys}")
-                            for each_key in each_bucket["keys"]:
-                                if each_key["deleted"] is False:
-                                    versioned_keys = len(each_key["versioning_info"])
-                                    log.info(f"versioned_keys: {versioned_keys}")
-                                    if not each_key["versioning_info"]:
-                                        log.info("not versioned key")
-                                        verify_key(each_key, bucket_from_s3)
-                                    else:
-                                        log.info("versioned key")
-                                        verify_key_with_version(
-                                            each_key, bucket_from_s3
-                                        )
-                                else:
-                                    key_name = each_key["name"]
-                                    log.info(
-                                        f"Verification of deleted key '{key_name}' starts"
-                                    )
-                                    try:
-                                        key_from_s3 = bucket_from_s3.Object(
-                                            os.path.basename(key_name)
-                                        )
-                                        log.info(key_from_s3.get())
-                                        raise AssertionError(
-                                            f"Verification of deleted object '{key_name}' failed"
-                                        )
-                                    except botocore.exceptions.ClientError as e:
-                                        log.info(
-                                            f"Verification of deleted object '{key_name}' successful"
-                                        )
-                    else:
-                        bucket_name = each_bucket["name"]
-                        log.info(
-                            f"Verification of deleted bucket '{bucket_name}' starts"
+                    bucket_name = each_bucket["name"]
+                    if each_bucket["deleted"] is not False:
+                        submit(
+                            user_id,
+                            bucket_name,
+                            verify_deleted_bucket,
+                            client,
+                            bucket_name,
                         )
-                        try:
-                            conn.meta.client.head_bucket(Bucket=bucket_name)
-                            raise AssertionError(
-                                f"Verification of deleted bucket '{bucket_name}' failed"
+                        continue
+                    log.info(
+                        f"verifying data for bucket: {bucket_name}, "
+                        f"curr_versioning_status: {each_bucket['curr_versioning_status']}, "
+                        f"no_of_keys: {len(each_bucket['keys'])}"
+                    )
+                    for each_key in each_bucket["keys"]:
+                        key_name = os.path.basename(each_key["name"])
+                        if each_key["deleted"] is not False:
+                            submit(
+                                user_id,
+                                bucket_name,
+                                verify_deleted_object,
+                                client,
+                                bucket_name,
+                                key_name,
                             )
-                        except botocore.exceptions.ClientError as e:
-                            error_code = int(e.response["Error"]["Code"])
-                            if error_code == 404:
-                                log.info(
-                                    f"Verification of deleted bucket '{bucket_name}' successful"
-                                )
-                            else:
-                                raise AssertionError(
-                                    f"Verification of deleted bucket '{bucket_name}' failed"
+                        elif not each_key["versioning_info"]:
+                            submit(
+                                user_id,
+                                bucket_name,
+                                verify_object,
+                                client,
+                                bucket_name,
+                                key_name,
+                                each_key,
+                            )
+                        else:
+                            for each_version in each_key["versioning_info"]:
+                                submit(
+                                    user_id,
+                                    bucket_name,
+                                    verify_object,
+                                    client,
+                                    bucket_name,
+                                    key_name,
+                                    each_version,
+                                    version_id=each_version["version_id"],
                                 )
-            else:
-                user_id = each_user["user_id"]
-                log.info(f"Verification of deleted user '{user_id}' starts")
-                cmd = f"radosgw-admin user list"
-                out = utils.exec_shell_cmd(cmd)
-                if user_id not in out:
-                    log.info(f"Verification of deleted user '{user_id}' successful")
-                else:
-                    raise AssertionError(
-                        f"Verification of deleted user '{user_id}' failed"
-                    )
+
+        summary.report(time.time() - started)
+        if summary.failures:
+            raise TestExecError(
+                f"data verification failed for {len(summary.failures)} object(s), "
+                f"first failure: {summary.failures[0]}"
+            )
         log.info("verification of data completed")
 
 
@@ -217,9 +345,16 @@ if __name__ == "__main__":
     configure_logging(f_name=log_f_name)
     parser = argparse.ArgumentParser(description="RGW S3 Automation")
     parser.add_argument("-c", dest="config", help="RGW Test yaml configuration")
+    parser.add_argument(
+        "-w",
+        dest="workers",
+        type=int,
+        default=VERIFY_WORKERS,
+        help="number of objects verified in parallel",
+    )
     args = parser.parse_args()
     yaml_file = args.config
     IO_INFO_FNAME = f"io_info_{os.path.basename(yaml_file)}"
     IoInfoConfig(io_info_fname=IO_INFO_FNAME)
-    read_io_info = ReadIOInfo(IO_INFO_FNAME)
+    read_io_info = ReadIOInfo(IO_INFO_FNAME, max_workers=args.workers)
     read_io_info.verify_io()
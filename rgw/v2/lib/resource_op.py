@@ -13,7 +13,13 @@ import names
 import v2.lib.s3.write_io_info as write_io_info
 import v2.utils.utils as utils
 import yaml
-from v2.lib.admin import AddUserInfo, BasicIOInfoStructure, TenantInfo, UserMgmt
+from v2.lib.admin import (
+    USER_CREATE_WORKERS,
+    AddUserInfo,
+    BasicIOInfoStructure,
+    TenantInfo,
+    UserMgmt,
+)
 from v2.lib.exceptions import ConfigError
 from v2.lib.frontend_configure import Frontend, Frontend_CephAdm
 from v2.utils.io_info_config import IoInfoConfig
@@ -146,24 +152,30 @@ def create_users(
     primary = utils.is_cluster_primary()
     user_detail_file = get_writable_user_details_file()
     if primary or (config and config.user_names):
-        for i in range(no_of_users_to_create):
-            if user_names:
-                user_details = admin_ops.create_admin_user(
-                    user_id=user_names[i][0],
-                    displayname=user_names[i][0],
-                    cluster_name=cluster_name,
-                )
-                all_users_details.append(user_details)
-            else:
-                user_details = admin_ops.create_admin_user(
-                    user_id=names.get_first_name().lower()
+        if user_names:
+            users = [
+                (user_names[i][0], user_names[i][0])
+                for i in range(no_of_users_to_create)
+            ]
+        else:
+            users = []
+            user_ids = set()
+            while len(users) < no_of_users_to_create:
+                user_id = (
+                    names.get_first_name().lower()
                     + random.choice(string.ascii_lowercase)
                     + "."
-                    + str(random.randint(1, 1000)),
-                    displayname=names.get_full_name().lower(),
-                    cluster_name=cluster_name,
+                    + str(random.randint(1, 1000))
                 )
-                all_users_details.append(user_details)
+                if user_id not in user_ids:
+                    user_ids.add(user_id)
+                    users.append((user_id, names.get_full_name().lower()))
+        workers = USER_CREATE_WORKERS
+        if config and config.test_ops.get("user_create_workers"):
+            workers = config.test_ops["user_create_workers"]
+        all_users_details = admin_ops.create_admin_users(
+            users, cluster_name=cluster_name, workers=workers
+        )
         with open(user_detail_file, "w") as fout:
             json.dump(all_users_details, fout)
     elif not primary:
@@ -173,17 +185,19 @@ def create_users(
             )
         with open(user_detail_file, "r") as fout:
             all_users_details = json.load(fout)
-        for each_user_info in all_users_details:
-            write_user_info = AddUserInfo()
-            basic_io_structure = BasicIOInfoStructure()
-            user_info = basic_io_structure.user(
-                **{
-                    "user_id": each_user_info["user_id"],
-                    "access_key": each_user_info["access_key"],
-                    "secret_key": each_user_info["secret_key"],
-                }
-            )
-            write_user_info.add_user_info(user_info)
+        basic_io_structure = BasicIOInfoStructure()
+        AddUserInfo().add_users_info(
+            [
+                basic_io_structure.user(
+                    **{
+                        "user_id": each_user_info["user_id"],
+                        "access_key": each_user_info["access_key"],
+                        "secret_key": each_user_info["secret_key"],
+                    }
+                )
+                for each_user_info in all_users_details
+            ]
+        )
     return all_users_details
 
 
@@ -338,6 +352,9 @@ class Config(object):
         self.objects_size_range = self.doc["config"].get("objects_size_range")
         self.sharding_type = self.doc["config"].get("sharding_type")
         self.split_size = self.doc["config"].get("split_size", 5)
+        self.multipart_upload_workers = self.doc["config"].get(
+            "multipart_upload_workers"
+        )
         self.test_ops = self.doc["config"].get("test_ops", {})
         self.lifecycle_conf = self.doc["config"].get("lifecycle_conf")
         self.new_lifecycle_conf = self.doc["config"].get("new_lifecycle_conf")
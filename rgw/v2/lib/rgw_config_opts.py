@@ -157,14 +157,29 @@ class CephConfigSet:
             daemon_name = node.get("service_name")
             daemon_name_list.append(daemon_name)
 
+        if value is True:
+            value = "true"
+        log.info(f"got key: {key}")
+        log.info(f"got value: {value}")
+        # one entry per rgw service, orch ps lists each of its daemons
+        daemon_name_list = list(dict.fromkeys(daemon_name_list))
+        if not set_to_all:
+            daemon_name_list = daemon_name_list[:1]
+        cmds = []
         for daemon in daemon_name_list:
             self.who = "client." + daemon  # naming convention as ceph conf
-            if value is True:
-                value = "true"
-            log.info(f"got key: {key}")
-            log.info(f"got value: {value}")
             cmd_list = [self.prefix, self.who, key, str(value)]
-            cmd = " ".join(cmd_list)
+            cmds.append(" ".join(cmd_list))
+        if len(cmds) > 1:
+            # every service's config set in one shell or ssh round trip
+            if remote_ssh_con:
+                results = utils.remote_exec_shell_cmds(remote_ssh_con, cmds)
+            else:
+                results = utils.exec_shell_cmds(cmds)
+            if any(each["rc"] != 0 for each in results):
+                raise InvalidCephConfigOption("Invalid ceph config options")
+            return
+        for cmd in cmds:
             if remote_ssh_con:
                 config_set = utils.remote_exec_shell_cmd(
                     remote_ssh_con, cmd, return_output=False
@@ -173,8 +188,6 @@ class CephConfigSet:
                 config_set = utils.exec_shell_cmd(cmd)
             if config_set is False:
                 raise InvalidCephConfigOption("Invalid ceph config options")
-            if not set_to_all:
-                break
 
 
 class CephConfOp(CephConfFileOP, CephConfigSet):
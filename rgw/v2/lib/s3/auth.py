@@ -6,12 +6,135 @@ import boto3
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
 import logging
+import threading
+from collections import OrderedDict
 
 import v2.utils.utils as utils
 from botocore.client import Config
+from v2.utils.cluster_facts import cluster_fact
 
 log = logging.getLogger()
 
+# sockets kept per cached client, threads sharing a client get this many concurrent connections
+MAX_POOL_CONNECTIONS = 50
+# clients and resources kept by CONNECTIONS, the least recently used is dropped beyond this
+MAX_CACHED_CONNECTIONS = 64
+
+
+@cluster_fact()
+def get_endpoint_host(ssh_con=None):
+    """
+    Returns the hostname and ip of the rgw node, remote when ssh_con is given
+    """
+    if ssh_con is not None:
+        stdin, stdout, stderr = ssh_con.exec_command("hostname")
+        hostname = stdout.readline().strip()
+        stdin, stdout, stderr = ssh_con.exec_command("hostname -I | awk '{print $1}'")
+        ip = stdout.readline().strip()
+    else:
+        hostname = socket.gethostname()
+        ip = socket.gethostbyname(hostname)
+    return hostname, ip
+
+
+class ConnectionManager(object):
+    """
+    Process-wide cache of boto3 clients and resources
+
+    Connections are keyed by credentials, endpoint, service, region and
+    signature version, so every Auth object of a user shares one client,
+    its botocore session and its urllib3 connection pool instead of
+    building new ones per do_auth* call. Clients are thread safe and sized
+    with max_pool_connections, so threaded workloads get concurrent sockets.
+
+    The cache is bounded to max_size connections, least recently used
+    first out. Connections with a session token are short lived and never
+    cached, nor are private ones, asked for by callers that change the
+    client, e.g. by registering or unregistering event handlers.
+    """
+
+    def __init__(self, max_size=MAX_CACHED_CONNECTIONS):
+        self.lock = threading.Lock()
+        self.session = None
+        self.max_size = max_size
+        self.connections = OrderedDict()
+
+    def get(
+        self,
+        kind,
+        service,
+        access_key,
+        secret_key,
+        endpoint_url,
+        region_name="default",
+        session_token=None,
+        signature_version=None,
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        private=False,
+        **kwargs,
+    ):
+        """
+        Returns a cached boto3 client or resource, creating it on first use
+
+        Parameters:
+            kind(str): 'client' or 'resource'
+            service(str): s3, iam, sts or sns
+            private(bool): return a new connection not shared with other callers
+            kwargs: extra arguments for boto3, e.g. use_ssl
+        """
+        cached = not private and session_token is None
+        key = (
+            kind,
+            service,
+            access_key,
+            secret_key,
+            endpoint_url,
+            region_name,
+            signature_version,
+            max_pool_connections,
+            tuple(sorted(kwargs.items())),
+        )
+        with self.lock:
+            if cached:
+                connection = self.connections.get(key)
+                if connection is not None:
+                    self.connections.move_to_end(key)
+                    return connection
+            if self.session is None:
+                # boto3 sessions are not thread safe, clients are created under the lock
+                self.session = boto3.session.Session()
+            config = Config(
+                signature_version=signature_version,
+                s3={"addressing_style": "path"},
+                max_pool_connections=max_pool_connections,
+            )
+            connection = getattr(self.session, kind)(
+                service,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                aws_session_token=session_token,
+                endpoint_url=endpoint_url,
+                region_name=region_name,
+                config=config,
+                verify=False,
+                **kwargs,
+            )
+            if cached:
+                self.connections[key] = connection
+                while len(self.connections) > self.max_size:
+                    self.connections.popitem(last=False)
+            return connection
+
+    def clear(self):
+        """
+        Drops all cached connections
+        """
+        with self.lock:
+            self.connections = OrderedDict()
+
+
+CONNECTIONS = ConnectionManager()
+
 
 class Auth(object):
     """
@@ -19,6 +142,8 @@ class Auth(object):
     The functions in this class are
     1. do_auth() : Authenticate using resource
     2. do_auth_using_client() : Authenticate using client
+    Connections are shared through CONNECTIONS across Auth objects of the same user,
+    do_auth_using_client(private=True) returns a client of its own.
     """
 
     def __init__(self, user_info, ssh_con=None, **extra_kwargs):
@@ -27,19 +152,12 @@ class Auth(object):
         """
         self.access_key = user_info["access_key"]
         self.secret_key = user_info["secret_key"]
-        if ssh_con is not None:
-            stdin, stdout, stderr = ssh_con.exec_command("hostname")
-            self.hostname = stdout.readline().strip()
-            self.port = utils.get_radosgw_port_no(ssh_con)
-            stdin, stdout, stderr = ssh_con.exec_command(
-                "hostname -I | awk '{print $1}'"
-            )
-            self.ip = stdout.readline().strip()
-        else:
-            self.hostname = socket.gethostname()
-            self.port = utils.get_radosgw_port_no()
-            self.ip = socket.gethostbyname(self.hostname)
+        self.hostname, self.ip = get_endpoint_host(ssh_con)
+        self.port = utils.get_radosgw_port_no(ssh_con)
         self.ssl = extra_kwargs.get("ssl", False)
+        self.max_pool_connections = extra_kwargs.get(
+            "max_pool_connections", MAX_POOL_CONNECTIONS
+        )
         self.haproxy = extra_kwargs.get("haproxy", False)
         if self.haproxy:
             self.port = 5000
@@ -70,26 +188,19 @@ class Auth(object):
             rgw: Connection status
         """
         log.info("performing authentication")
-        additional_config = Config(
-            signature_version=config.get("signature_version", None),
-            s3={"addressing_style": "path"},
-        )
 
         # Use region_name from config if provided, otherwise use 'default' as default
         # In multisite setups, this should be the zonegroup name
         region_name = config.get("region_name", "default")
         log.info(f"Using region_name: {region_name}")
 
-        rgw = boto3.resource(
+        rgw = self._connection(
+            "resource",
             "s3",
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url=self.endpoint_url,
+            region_name,
+            signature_version=config.get("signature_version", None),
+            session_token=self.session_token if self.session_token else None,
             use_ssl=self.ssl,
-            verify=False,
-            config=additional_config,
-            region_name=region_name,
-            aws_session_token=self.session_token if self.session_token else None,
         )
 
         log.info("connected")
@@ -100,31 +211,27 @@ class Auth(object):
         This function is to perform authentication using client module
 
         Parameters:
-            **config: Configuration details (can include region_name for multisite)
+            **config: Configuration details (can include region_name for multisite,
+                and private=True for a client not shared with other callers, needed
+                when its event handlers are changed)
 
         Returns:
             rgw: Connection status
         """
         log.info("performing authentication using client module")
-        additional_config = Config(
-            signature_version=config.get("signature_version", None),
-            s3={"addressing_style": "path"},
-        )
 
         # Use region_name from config if provided, otherwise use 'default' as default
         # In multisite setups, this should be the zonegroup name
         region_name = config.get("region_name", "default")
         log.info(f"Using region_name: {region_name}")
 
-        rgw = boto3.client(
+        rgw = self._connection(
+            "client",
             "s3",
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url=self.endpoint_url,
-            config=additional_config,
-            verify=False,
-            region_name=region_name,
-            aws_session_token=self.session_token if self.session_token else None,
+            region_name,
+            signature_version=config.get("signature_version", None),
+            session_token=self.session_token if self.session_token else None,
+            private=config.get("private", False),
         )
         return rgw
 
@@ -136,21 +243,15 @@ class Auth(object):
         """
 
         log.info("performing authentication using iam client")
-        additional_config = Config(s3={"addressing_style": "path"})
-
         # Use region_name from config if provided, otherwise use 'default' as default
         # In multisite setups, this should be the zonegroup name
         region_name = extra_config.get("region_name", "default")
         log.info(f"Using region_name: {region_name}")
 
-        rgw = boto3.client(
+        rgw = self._connection(
+            "client",
             "iam",
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url=self.endpoint_url,
-            region_name=region_name,
-            config=additional_config,
-            verify=False,
+            region_name,
         )
 
         return rgw
@@ -162,21 +263,15 @@ class Auth(object):
         :return: connection object
         """
 
-        additional_config = Config(s3={"addressing_style": "path"})
-
         # Use region_name from config if provided, otherwise use 'default' as default
         # In multisite setups, this should be the zonegroup name
         region_name = config.get("region_name", "default")
         log.info(f"Using region_name: {region_name}")
 
-        sts_client = boto3.client(
+        sts_client = self._connection(
+            "client",
             "sts",
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url=self.endpoint_url,
-            region_name=region_name,
-            config=additional_config,
-            verify=False,
+            region_name,
         )
 
         return sts_client
@@ -188,23 +283,31 @@ class Auth(object):
         :return: connection object
         """
 
-        additional_config = Config(
-            signature_version="s3", s3={"addressing_style": "path"}
-        )
-
         # Use region_name from config if provided, otherwise use 'default' as default
         # In multisite setups, this should be the zonegroup name
         region_name = config.get("region_name", "default")
         log.info(f"Using region_name: {region_name}")
 
-        sns_client = boto3.client(
+        sns_client = self._connection(
+            "client",
             "sns",
-            aws_access_key_id=self.access_key,
-            aws_secret_access_key=self.secret_key,
-            endpoint_url=self.endpoint_url,
-            region_name=region_name,
-            config=additional_config,
-            verify=False,
+            region_name,
+            signature_version="s3",
         )
 
         return sns_client
+
+    def _connection(self, kind, service, region_name, **kwargs):
+        """
+        Returns the shared connection of this user for the given service
+        """
+        return CONNECTIONS.get(
+            kind,
+            service,
+            self.access_key,
+            self.secret_key,
+            self.endpoint_url,
+            region_name=region_name,
+            max_pool_connections=self.max_pool_connections,
+            **kwargs,
+        )
@@ -0,0 +1,305 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../../")))
+import atexit
+import json
+import logging
+import threading
+import time
+
+import yaml
+
+log = logging.getLogger()
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CDumper", yaml.Dumper)
+
+
+class IOInfoLedger(object):
+    """
+    Append-only ledger backing the io_info yaml.
+
+    Every update is applied to an in-memory copy of the io_info data and
+    appended as one json line to <io_info yaml>.journal. Users, buckets and
+    keys are indexed, so an update no longer needs a full parse, scan and
+    dump of the yaml. The journal is folded back into the yaml (same schema
+    as before) periodically and at process exit, so ReadIOInfo and any other
+    reader of the yaml keep working as is. A journal left behind by a
+    process that died before compaction is replayed on the next load.
+
+    One ledger exists per io_info file per process, use IOInfoLedger.get().
+    """
+
+    _ledgers = {}
+    _ledgers_lock = threading.Lock()
+
+    # seconds between two compactions of the journal into the yaml
+    compaction_interval = 300
+
+    def __init__(self, yaml_fname):
+        self.yaml_fname = yaml_fname
+        self.journal_fname = f"{yaml_fname}.journal"
+        self.lock = threading.RLock()
+        self.data = None
+        self.journal = None
+        self.pending = 0
+        self.last_compaction = time.time()
+        self.users = {}
+        self.buckets = {}
+        self.buckets_by_name = {}
+        self.keys = {}
+
+    @classmethod
+    def get(cls, yaml_fname):
+        """
+        Returns the ledger of the given io_info file, creating it on first use
+
+        Parameters:
+            yaml_fname(str): io_info yaml file name
+        """
+        with cls._ledgers_lock:
+            ledger = cls._ledgers.get(yaml_fname)
+            if ledger is None:
+                ledger = cls(yaml_fname)
+                cls._ledgers[yaml_fname] = ledger
+            return ledger
+
+    @classmethod
+    def compact_all(cls):
+        """
+        Compacts the journal of every ledger of this process into its yaml
+        """
+        for ledger in list(cls._ledgers.values()):
+            try:
+                ledger.compact()
+            except Exception as e:
+                log.error(f"io_info compaction of {ledger.yaml_fname} failed: {e}")
+
+    def _load(self):
+        """
+        Loads the yaml, replays a leftover journal and builds the indexes
+        """
+        if self.data is not None:
+            return
+        with open(self.yaml_fname, "r") as fp:
+            self.data = yaml.load(fp, Loader=YAML_LOADER)
+        self._reindex()
+        if os.path.exists(self.journal_fname):
+            replayed = 0
+            with open(self.journal_fname, "r") as fp:
+                for line in fp:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # torn last line of a process killed while appending
+                        log.warning("skipping partial io_info journal entry")
+                        continue
+                    getattr(self, f"_apply_{entry['op']}")(*entry["args"])
+                    replayed += 1
+            log.info(f"replayed {replayed} io_info journal entries")
+            self.pending = replayed
+        self.journal = open(self.journal_fname, "a")
+
+    def _reindex(self):
+        self.users = {}
+        self.buckets = {}
+        self.buckets_by_name = {}
+        self.keys = {}
+        for user in self.data.get("users", []):
+            self._index_user(user)
+            for bucket in user.get("bucket", []):
+                self._index_bucket(user, bucket)
+                for key in bucket.get("keys", []):
+                    self._index_key(bucket, key)
+
+    def _index_user(self, user):
+        self.users.setdefault(user["access_key"], user)
+
+    def _index_bucket(self, user, bucket):
+        self.buckets.setdefault((user["access_key"], bucket["name"]), bucket)
+        # bucket lookups by name alone resolve to the last user owning that name
+        self.buckets_by_name[bucket["name"]] = bucket
+
+    def _index_key(self, bucket, key):
+        keys = self.keys.setdefault(id(bucket), {})
+        keys.setdefault(key["name"], key)
+        keys.setdefault(os.path.basename(key["name"]), key)
+
+    def _bucket(self, access_key, bucket_name):
+        return self.buckets[(access_key, bucket_name)]
+
+    def _key(self, bucket, key_name):
+        keys = self.keys.get(id(bucket), {})
+        key = keys.get(key_name) or keys.get(os.path.basename(key_name))
+        if key is None:
+            raise KeyError(f"key '{key_name}' not found in bucket '{bucket['name']}'")
+        return key
+
+    def _record(self, op, *args):
+        """
+        Applies an update in memory and appends it to the journal
+        """
+        with self.lock:
+            self._load()
+            getattr(self, f"_apply_{op}")(*args)
+            self.journal.write(json.dumps({"op": op, "args": args}, default=str) + "\n")
+            self.journal.flush()
+            self.pending += 1
+            if time.time() - self.last_compaction >= self.compaction_interval:
+                self.compact()
+
+    def _apply_add_user(self, user):
+        self.data["users"].append(user)
+        self._index_user(user)
+
+    def _apply_add_users(self, users):
+        for user in users:
+            self._apply_add_user(user)
+
+    def _apply_set_user_deleted(self, access_key):
+        self.users[access_key]["deleted"] = True
+
+    def _apply_add_bucket(self, access_key, bucket_info):
+        user = self.users.get(access_key)
+        if user is None:
+            raise RuntimeError(
+                f"User with access_key '{access_key}' not found in yaml_data['users']"
+            )
+        user.setdefault("bucket", []).append(bucket_info)
+        self._index_bucket(user, bucket_info)
+
+    def _apply_set_bucket_deleted(self, bucket_name):
+        self.buckets_by_name[bucket_name]["deleted"] = True
+
+    def _apply_set_versioning_status(self, access_key, bucket_name, status):
+        self._bucket(access_key, bucket_name)["curr_versioning_status"] = status
+
+    def _apply_add_bucket_properties(self, access_key, bucket_name, properties):
+        self._bucket(access_key, bucket_name)["properties"].append(properties)
+
+    def _apply_add_key(self, access_key, bucket_name, key_info):
+        bucket = self._bucket(access_key, bucket_name)
+        bucket["keys"].append(key_info)
+        self._index_key(bucket, key_info)
+
+    def _apply_set_keys_deleted(self, bucket_name, key_names):
+        bucket = self.buckets_by_name[bucket_name]
+        for key_name in key_names:
+            self._key(bucket, key_name)["deleted"] = True
+
+    def _apply_add_key_properties(self, access_key, bucket_name, key_name, props):
+        bucket = self._bucket(access_key, bucket_name)
+        self._key(bucket, key_name)["properties"].append(props)
+
+    def _apply_add_versioning_info(self, access_key, bucket_name, key_name, info):
+        bucket = self._bucket(access_key, bucket_name)
+        self._key(bucket, key_name)["versioning_info"].append(info)
+
+    def _apply_delete_version_info(self, access_key, bucket_name, key_name, vid):
+        bucket = self._bucket(access_key, bucket_name)
+        key = self._key(bucket, key_name)
+        key["versioning_info"] = [
+            each for each in key["versioning_info"] if each["version_id"] != vid
+        ]
+
+    def initialize(self, data):
+        """
+        Replaces the io_info data and starts an empty journal
+
+        Parameters:
+            data(dict): initial io_info data
+        """
+        with self.lock:
+            if self.journal is not None:
+                self.journal.close()
+            self.data = data
+            self._reindex()
+            self._dump()
+            self.journal = open(self.journal_fname, "w")
+            self.pending = 0
+            self.last_compaction = time.time()
+
+    def get_data(self):
+        """
+        Returns the current io_info data including the journaled updates
+        """
+        with self.lock:
+            self._load()
+            return self.data
+
+    def add_user(self, user):
+        self._record("add_user", user)
+
+    def add_users(self, users):
+        """
+        Adds many users with a single journal entry
+        """
+        self._record("add_users", list(users))
+
+    def set_user_deleted(self, access_key):
+        self._record("set_user_deleted", access_key)
+
+    def add_bucket(self, access_key, bucket_info):
+        self._record("add_bucket", access_key, bucket_info)
+
+    def set_bucket_deleted(self, bucket_name):
+        self._record("set_bucket_deleted", bucket_name)
+
+    def set_versioning_status(self, access_key, bucket_name, status):
+        self._record("set_versioning_status", access_key, bucket_name, status)
+
+    def add_bucket_properties(self, access_key, bucket_name, properties):
+        self._record("add_bucket_properties", access_key, bucket_name, properties)
+
+    def add_key(self, access_key, bucket_name, key_info):
+        self._record("add_key", access_key, bucket_name, key_info)
+
+    def set_keys_deleted(self, bucket_name, key_names):
+        """
+        Marks many keys of a bucket as deleted with a single journal entry
+        """
+        self._record("set_keys_deleted", bucket_name, list(key_names))
+
+    def add_key_properties(self, access_key, bucket_name, key_name, properties):
+        self._record(
+            "add_key_properties", access_key, bucket_name, key_name, properties
+        )
+
+    def add_versioning_info(self, access_key, bucket_name, key_name, info):
+        self._record("add_versioning_info", access_key, bucket_name, key_name, info)
+
+    def delete_version_info(self, access_key, bucket_name, key_name, version_id):
+        self._record(
+            "delete_version_info", access_key, bucket_name, key_name, version_id
+        )
+
+    def _dump(self):
+        """
+        Writes the in-memory data to the yaml through a temporary file
+        """
+        tmp_fname = f"{self.yaml_fname}.tmp"
+        with open(tmp_fname, "w") as fp:
+            yaml.dump(self.data, fp, Dumper=YAML_DUMPER, default_flow_style=False)
+        os.replace(tmp_fname, self.yaml_fname)
+
+    def compact(self):
+        """
+        Folds the journal into the yaml and truncates the journal
+        """
+        with self.lock:
+            if self.data is None or self.pending == 0:
+                return
+            started = time.time()
+            self._dump()
+            self.journal.close()
+            self.journal = open(self.journal_fname, "w")
+            log.info(
+                f"compacted {self.pending} io_info journal entries into "
+                f"{self.yaml_fname} in {time.time() - started:.2f}s"
+            )
+            self.pending = 0
+            self.last_compaction = time.time()
+
+
+atexit.register(IOInfoLedger.compact_all)
@@ -0,0 +1,170 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../../")))
+import io
+import logging
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
+import v2.lib.resource_op as s3lib
+from v2.lib.exceptions import TestExecError
+from v2.utils.utils import HttpResponseParser
+
+log = logging.getLogger()
+
+# parts uploaded in parallel when the test config does not say otherwise
+MULTIPART_UPLOAD_WORKERS = 4
+
+
+class FilePartReader(io.RawIOBase):
+    """
+    Read-only file object over one part of a memory mapped file.
+
+    Slicing the memoryview does not copy, so no part ever lands on disk
+    and only the chunk botocore asks for is materialised.
+    """
+
+    def __init__(self, view, part_number):
+        self.view = view
+        self.part_number = part_number
+        self.pos = 0
+
+    def __len__(self):
+        return len(self.view)
+
+    def __repr__(self):
+        return f"<FilePartReader part={self.part_number} size={len(self.view)}>"
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def read(self, size=-1):
+        end = len(self.view) if size is None or size < 0 else self.pos + size
+        data = self.view[self.pos : end].tobytes()
+        self.pos += len(data)
+        return data
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.pos = max(0, min(offset, len(self.view)))
+        return self.pos
+
+    def tell(self):
+        return self.pos
+
+    def close(self):
+        # botocore closes the body after a send, the range must stay readable
+        # for retries, so the mapping is released by MultipartUploader.close()
+        pass
+
+
+def get_part_ranges(file_size, part_size):
+    """
+    This function splits a file into (part_number, offset, length) ranges
+
+    Parameters:
+        file_size(int): size of the file in bytes
+        part_size(int): size of each part in bytes, the last one may be smaller
+
+    Returns:
+        list of part ranges, at least one even for an empty file
+    """
+    if file_size == 0:
+        return [(1, 0, 0)]
+    return [
+        (part_number, offset, min(part_size, file_size - offset))
+        for part_number, offset in enumerate(range(0, file_size, part_size), 1)
+    ]
+
+
+class MultipartUploader(object):
+    """
+    This class uploads the parts of a local file to a multipart upload
+
+    Parts are read straight from the source file through mmap slices and
+    uploaded over a pool of worker threads, which share the botocore client
+    and its connection pool.
+    """
+
+    def __init__(self, mpu, fname, part_size, max_workers=MULTIPART_UPLOAD_WORKERS):
+        """
+        Parameters:
+            mpu: boto3 MultipartUpload resource
+            fname(str): local file to upload
+            part_size(int): part size in bytes
+            max_workers(int): parts uploaded in parallel
+        """
+        self.mpu = mpu
+        self.fname = fname
+        self.max_workers = max(1, int(max_workers))
+        self.fp = open(fname, "rb")
+        file_size = os.fstat(self.fp.fileno()).st_size
+        self.mmap = None
+        if file_size:
+            self.mmap = mmap.mmap(self.fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self.parts = get_part_ranges(file_size, part_size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+        self.fp.close()
+
+    def _upload_part(self, part_number, offset, length):
+        log.info(f"trying to upload part: {part_number}, offset: {offset}")
+        if self.mmap is not None:
+            view = memoryview(self.mmap)[offset : offset + length]
+        else:
+            view = memoryview(b"")
+        part = self.mpu.Part(part_number)
+        try:
+            part_upload_response = s3lib.resource_op(
+                {
+                    "obj": part,
+                    "resource": "upload",
+                    "kwargs": dict(Body=FilePartReader(view, part_number)),
+                }
+            )
+        finally:
+            view.release()
+        if part_upload_response is False:
+            raise TestExecError(f"part uploading failed for part {part_number}")
+        response = HttpResponseParser(part_upload_response)
+        if response.status_code != 200:
+            raise TestExecError(f"part uploading failed for part {part_number}")
+        log.info(f"part uploaded: {part_number}")
+        return {
+            "PartNumber": part_number,
+            "ETag": part_upload_response["ETag"],
+            "Size": length,
+        }
+
+    def upload_parts(self, count=None):
+        """
+        This function uploads the first count parts, all of them by default
+
+        Returns:
+            list of {PartNumber, ETag, Size} ordered by part number
+        """
+        parts = self.parts if count is None else self.parts[:count]
+        log.info(
+            f"uploading {len(parts)} of {len(self.parts)} parts "
+            f"with {self.max_workers} workers"
+        )
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._upload_part, *each) for each in parts]
+            parts_info = [future.result() for future in futures]
+        return parts_info
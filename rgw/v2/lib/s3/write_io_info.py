@@ -3,8 +3,8 @@ import os
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+from v2.lib.s3.io_info_ledger import IOInfoLedger
 from v2.utils.io_info_config import IoInfoConfig
-from v2.utils.utils import FileOps
 
 log = logging.getLogger()
 
@@ -48,6 +48,8 @@ class BasicIOInfoStructure(object):
             "size": args["size"],
             "md5_local": args["md5_local"],
             "upload_type": args["upload_type"],
+            # seed of generated data, see manage_data.io_generator
+            "seed": args.get("seed"),
             "properties": list(),
             "versioning_info": list(),
             "deleted": False,
@@ -92,7 +94,7 @@ class AddIOInfo(object):
         if yaml_fname == None:
             yaml_fname = IoInfoConfig().io_info_fname
         self.yaml_fname = yaml_fname
-        self.file_op = FileOps(self.yaml_fname, type="yaml")
+        self.ledger = IOInfoLedger.get(self.yaml_fname)
 
 
 class IOInfoInitialize(AddIOInfo):
@@ -112,7 +114,7 @@ class IOInfoInitialize(AddIOInfo):
             data
         """
         log.info("initial_data: %s" % (data))
-        self.file_op.add_data(data)
+        self.ledger.initialize(data)
 
 
 class AddUserInfo(AddIOInfo):
@@ -120,6 +122,7 @@ class AddUserInfo(AddIOInfo):
     This class is to add the user information to the yaml
     The function/s in this class are
     1. add_user_info() : Add the user information to the yaml
+    2. add_users_info() : Add the information of many users to the yaml at once
     """
 
     def __init__(self):
@@ -132,11 +135,16 @@ class AddUserInfo(AddIOInfo):
             user:
         """
         log.info("got user info structure: %s" % user)
-        yaml_data = self.file_op.get_data()
-        log.info("got yaml data %s" % yaml_data)
-        yaml_data["users"].append(user)
-        log.info("data to add: %s" % yaml_data)
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_user(user)
+
+    def add_users_info(self, users):
+        """
+        This function is to add the information of many users to the yaml in one update
+        Parameters:
+            users(list): user info structures
+        """
+        log.info("got %s user info structures" % len(users))
+        self.ledger.add_users(users)
 
     def set_user_deleted(self, access_key):
         """
@@ -145,14 +153,7 @@ class AddUserInfo(AddIOInfo):
             access_key:
         """
         log.info("Setting user as deleted")
-        yaml_data = self.file_op.get_data()
-        indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                indx = i
-                break
-        yaml_data["users"][indx]["deleted"] = True
-        self.file_op.add_data(yaml_data)
+        self.ledger.set_user_deleted(access_key)
 
 
 class BucketIoInfo(AddIOInfo):
@@ -174,23 +175,8 @@ class BucketIoInfo(AddIOInfo):
             access_key:
             bucket_info:
         """
-        yaml_data = self.file_op.get_data()
-        log.info(f"Existing users data: {yaml_data.get('users', [])}")
         log.info(f"Searching for access_key: {access_key}")
-        indx = None
-        for i, k in enumerate(yaml_data.get("users", [])):  # Ensure users list exists
-            if k.get("access_key") == access_key:
-                indx = i
-                break
-        if indx is None:
-            raise RuntimeError(
-                f"User with access_key '{access_key}' not found in yaml_data['users']"
-            )
-        log.info(f"User index found: {indx}")
-        if "bucket" not in yaml_data["users"][indx]:
-            yaml_data["users"][indx]["bucket"] = []  # Ensure 'bucket' key exists
-        yaml_data["users"][indx]["bucket"].append(bucket_info)
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_bucket(access_key, bucket_info)
         log.info(f"Bucket info added successfully for access_key: {access_key}")
 
     def set_bucket_deleted(self, bucket_name):
@@ -201,17 +187,7 @@ class BucketIoInfo(AddIOInfo):
             bucket_name:
         """
         log.info(f"marking bucket '{bucket_name}' as deleted")
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        for i, _ in enumerate(yaml_data["users"]):
-            for j, k in enumerate(yaml_data["users"][i]["bucket"]):
-                if k["name"] == bucket_name:
-                    bucket_indx = j
-                    access_key_indx = i
-                    break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["deleted"] = True
-        self.file_op.add_data(yaml_data)
+        self.ledger.set_bucket_deleted(bucket_name)
 
     def add_versioning_status(self, access_key, bucket_name, versioning_status):
         """
@@ -221,21 +197,7 @@ class BucketIoInfo(AddIOInfo):
             bucket_name:
             versioning_status:
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx][
-            "curr_versioning_status"
-        ] = versioning_status
-        self.file_op.add_data(yaml_data)
+        self.ledger.set_versioning_status(access_key, bucket_name, versioning_status)
 
     def add_properties(self, access_key, bucket_name, properties):
         """
@@ -245,21 +207,7 @@ class BucketIoInfo(AddIOInfo):
             bucket_name:
             properties:
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["properties"].append(
-            properties
-        )
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_bucket_properties(access_key, bucket_name, properties)
 
 
 class KeyIoInfo(AddIOInfo):
@@ -279,21 +227,7 @@ class KeyIoInfo(AddIOInfo):
             bucket_name: Name of the bucket
             key_info: key information
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"].append(
-            key_info
-        )
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_key(access_key, bucket_name, key_info)
 
     def set_key_deleted(self, bucket_name, key_name):
         """
@@ -304,26 +238,19 @@ class KeyIoInfo(AddIOInfo):
             key_name: name of the key
         """
         log.info(f"marking key '{key_name}' in bucket '{bucket_name}' as deleted")
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        key_indx = None
-        for i, _ in enumerate(yaml_data["users"]):
-            for j, k in enumerate(yaml_data["users"][i]["bucket"]):
-                if k["name"] == bucket_name:
-                    bucket_indx = j
-                    access_key_indx = i
-                    break
-        for i, k in enumerate(
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"]
-        ):
-            if k["name"].ends_with(key_name):
-                key_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"][key_indx][
-            "deleted"
-        ] = True
-        self.file_op.add_data(yaml_data)
+        self.ledger.set_keys_deleted(bucket_name, [key_name])
+
+    def set_keys_deleted(self, bucket_name, key_names):
+        """
+        This function is to mark many keys of a bucket as deleted in one update
+
+        Parameters:
+            bucket_name: name of the bucket
+            key_names: names of the keys
+        """
+        key_names = list(key_names)
+        log.info(f"marking {len(key_names)} keys in bucket '{bucket_name}' as deleted")
+        self.ledger.set_keys_deleted(bucket_name, key_names)
 
     def add_properties(self, access_key, bucket_name, key_name, properties):
         """
@@ -335,28 +262,7 @@ class KeyIoInfo(AddIOInfo):
             key_name: name of the key
             properties: properties
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        key_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        for i, k in enumerate(
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"]
-        ):
-            if k["name"] == key_name:
-                key_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"][key_indx][
-            "properties"
-        ].append(properties)
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_key_properties(access_key, bucket_name, key_name, properties)
 
     def add_versioning_info(self, access_key, bucket_name, key_name, versioning_info):
         """
@@ -368,28 +274,9 @@ class KeyIoInfo(AddIOInfo):
             key_name: name of the key
             versioning_info: versioning information
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        key_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        for i, k in enumerate(
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"]
-        ):
-            if k["name"] == key_name:
-                key_indx = i
-                break
-        yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"][key_indx][
-            "versioning_info"
-        ].append(versioning_info)
-        self.file_op.add_data(yaml_data)
+        self.ledger.add_versioning_info(
+            access_key, bucket_name, key_name, versioning_info
+        )
 
     def delete_version_info(self, access_key, bucket_name, key_name, version_id):
         """
@@ -401,39 +288,7 @@ class KeyIoInfo(AddIOInfo):
             key_name: name of the key
             version_id: version id of the object
         """
-        yaml_data = self.file_op.get_data()
-        access_key_indx = None
-        bucket_indx = None
-        key_indx = None
-        version_info_indx = None
-        for i, k in enumerate(yaml_data["users"]):
-            if k["access_key"] == access_key:
-                access_key_indx = i
-                break
-        for i, k in enumerate(yaml_data["users"][access_key_indx]["bucket"]):
-            if k["name"] == bucket_name:
-                bucket_indx = i
-                break
-        for i, k in enumerate(
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"]
-        ):
-            if k["name"] == key_name:
-                key_indx = i
-                break
-        # print 'versioing info'
-        # print yaml_data['users'][access_key_indx]['bucket'][bucket_indx]['keys'][key_indx]['versioning_info']
-        for i, k in enumerate(
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"][
-                key_indx
-            ]["versioning_info"]
-        ):
-            if k["version_id"] == version_id:
-                version_info_indx = i
-                break
-            yaml_data["users"][access_key_indx]["bucket"][bucket_indx]["keys"][
-                key_indx
-            ]["versioning_info"].pop(version_info_indx)
-        self.file_op.add_data(yaml_data)
+        self.ledger.delete_version_info(access_key, bucket_name, key_name, version_id)
 
 
 def logioinfo(func):
@@ -499,6 +354,7 @@ def logioinfo(func):
                             "size": extra_info["size"],
                             "md5_local": extra_info["md5"],
                             "upload_type": extra_info.get("upload_type", "normal"),
+                            "seed": extra_info.get("seed"),
                         }
                     )
                     write_key_info.add_keys_info(
@@ -4,17 +4,63 @@ Performs s5cmd operations
 
 
 import logging
+import os
+import re
+import subprocess
+import tempfile
 
 log = logging.getLogger()
 
+# parallel workers of a s5cmd process, its own default
+S5CMD_NUMWORKERS = 256
+RUN_ERROR = re.compile(r'ERROR "(.+?)": (.*)$')
+
+
+def normalize(cmd):
+    return " ".join(cmd.split())
+
+
+def parse_run_output(commands, stdout, stderr, returncode):
+    """
+    Matches the output of a s5cmd run back to its commands
+
+    s5cmd prints a line per completed command on stdout, in completion order, and
+    an ERROR "<command>": <reason> line per failed command on stderr.
+
+    Returns:
+        list of {"cmd", "rc", "out"} in the order of commands, rc is None when the
+        outcome of the command is unknown
+    """
+    errors = {}
+    for line in stderr.splitlines():
+        match = RUN_ERROR.match(line.strip())
+        if match:
+            errors[normalize(match.group(1))] = line
+    done = {normalize(line): line for line in stdout.splitlines() if line.strip()}
+    # every command without an error line printed one on completion
+    all_done = len(done) >= len(commands) - len(errors)
+    results = []
+    for cmd in commands:
+        key = normalize(cmd)
+        if key in errors:
+            rc, out = 1, errors[key]
+        elif key in done:
+            rc, out = 0, done[key]
+        elif returncode == 0 or all_done:
+            rc, out = 0, ""
+        else:
+            rc, out = None, ""
+        results.append({"cmd": cmd, "rc": rc, "out": out})
+    return results
+
 
 class S5CMD:
-    def __init__(self, options=None, ssl=None):
+    def __init__(self, options=None, ssl=None, bin_path=""):
         """
         Constructor for s5cmd class
         options(list): Optional options for the command
         """
-        self.prefix = "s5cmd"
+        self.prefix = bin_path + "s5cmd"
         if ssl:
             self.prefix = self.prefix + " --no-verify-ssl"
         if options is None:
@@ -35,3 +81,37 @@ class S5CMD:
         cmd = " ".join(cmd)
         log.info(f"S5CMD command created {cmd}")
         return cmd
+
+    def run_batch(self, commands, numworkers=S5CMD_NUMWORKERS):
+        """
+        Runs many commands with one s5cmd process through a 'run' command file,
+        s5cmd executes them with its own worker parallelism
+        Args:
+            commands(list): s5cmd commands without the s5cmd prefix and options,
+                E.g: cp file s3://bucket/key
+            numworkers(int): commands s5cmd runs at a time
+        Returns: list of {"cmd", "rc", "out"} in the order of commands
+        """
+        with tempfile.NamedTemporaryFile("w", suffix=".s5cmd", delete=False) as fp:
+            fp.write("\n".join(commands) + "\n")
+        command_list = [self.prefix, f"--numworkers {numworkers}", self.options]
+        cmd = " ".join(filter(lambda cmd: len(cmd) > 0, command_list))
+        cmd = f"{cmd} run {fp.name}"
+        log.info(f"S5CMD running {len(commands)} commands: {cmd}")
+        try:
+            pr = subprocess.run(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True
+            )
+        finally:
+            os.remove(fp.name)
+        results = parse_run_output(
+            commands,
+            pr.stdout.decode("utf-8", errors="ignore"),
+            pr.stderr.decode("utf-8", errors="ignore"),
+            pr.returncode,
+        )
+        failed = [each for each in results if each["rc"] != 0]
+        log.info(f"{len(commands) - len(failed)} of {len(commands)} commands succeeded")
+        for each in failed:
+            log.error(f"{each['cmd']}: {each['out'] or 'no result'}")
+        return results
@@ -0,0 +1,341 @@
+"""
+Swift large object upload engine
+
+Uploads the segments of a static (SLO) or dynamic (DLO) large object
+concurrently: the file is read once, in order, and each segment is handed
+to a pool of swiftclient connections with at most workers segments in
+flight, so memory stays at workers * segment_size whatever the object
+size. Workers are capped so that this stays under MAX_SEGMENT_MEMORY. The md5 of every segment and of the whole file are computed
+in that same read. Each segment is sent with its md5 as ETag, which makes
+RGW verify it, and the ETag returned by the PUT is checked against it, so
+no HEAD per segment is needed to build the manifest.
+
+With resume, the segments already in the container with the same name,
+size and md5 (from a single listing of the segment prefix) are not
+uploaded again, so an interrupted upload of a multi-GB object can be
+restarted where it stopped.
+
+usage:
+
+    uploader = SwiftLargeObjectUploader(rgw, container_name)
+    result = uploader.upload_slo(file_path, object_name)
+    log.info(result.md5, result.manifest_etag)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import hashlib
+import itertools
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import swiftclient
+
+log = logging.getLogger()
+
+SEGMENT_SIZE = 1024 * 1024
+SEGMENT_UPLOAD_WORKERS = 8
+# bytes of segment data held at a time, fewer workers are used for large segments
+MAX_SEGMENT_MEMORY = 512 * 1024 * 1024
+
+
+def clone_connection(rgw):
+    """
+    This function returns a new swift connection with the auth of rgw
+
+    swiftclient connections are not thread safe, each upload thread uses
+    its own, the token of rgw is reused so they do not authenticate again.
+    """
+    if not (rgw.url and rgw.token):
+        rgw.url, rgw.token = rgw.get_auth()
+    return swiftclient.Connection(
+        authurl=rgw.authurl,
+        user=rgw.user,
+        key=rgw.key,
+        retries=rgw.retries,
+        preauthurl=rgw.url,
+        preauthtoken=rgw.token,
+        auth_version=rgw.auth_version,
+        os_options=rgw.os_options,
+        insecure=rgw.insecure,
+        cacert=rgw.cacert,
+        timeout=rgw.timeout,
+    )
+
+
+class ConnectionPool(object):
+    """
+    Connections cloned from one swift connection, created as they are needed
+    """
+
+    def __init__(self, rgw, size=SEGMENT_UPLOAD_WORKERS):
+        self.rgw = rgw
+        self.size = size
+        self.created = 0
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+
+    def get(self):
+        with self.lock:
+            if self.idle.empty() and self.created < self.size:
+                self.created += 1
+                return clone_connection(self.rgw)
+        return self.idle.get()
+
+    def put(self, conn):
+        self.idle.put(conn)
+
+    def close(self):
+        while not self.idle.empty():
+            self.idle.get().close()
+
+
+class LargeObjectUpload(object):
+    """
+    Outcome of a large object upload
+    """
+
+    def __init__(self, container_name, segment_prefix):
+        self.container_name = container_name
+        self.segment_prefix = segment_prefix
+        self.segments = []
+        self.md5 = None
+        self.size = 0
+        self.uploaded = 0
+        self.skipped = 0
+        self.elapsed = 0
+
+    @property
+    def manifest(self):
+        """
+        SLO manifest of the segments, in order
+        """
+        return [
+            {"path": each["path"], "etag": each["etag"], "size_bytes": each["size"]}
+            for each in self.segments
+        ]
+
+    @property
+    def manifest_etag(self):
+        """
+        ETag of the large object: the md5 of the concatenated segment md5s
+        """
+        return hashlib.md5(
+            "".join(each["etag"] for each in self.segments).encode()
+        ).hexdigest()
+
+    def __repr__(self):
+        rate = self.size / self.elapsed / 1024 / 1024 if self.elapsed else 0
+        return (
+            f"{len(self.segments)} segments of {self.size} bytes, "
+            f"{self.uploaded} uploaded, {self.skipped} already present, "
+            f"in {self.elapsed:.1f}s ({rate:.1f} MiB/s)"
+        )
+
+
+class SwiftLargeObjectUploader(object):
+    """
+    This class uploads the segments of large objects concurrently, and their manifests
+    """
+
+    def __init__(
+        self,
+        rgw,
+        container_name,
+        segment_size=SEGMENT_SIZE,
+        workers=SEGMENT_UPLOAD_WORKERS,
+        segment_container=None,
+    ):
+        """
+        Parameters:
+            rgw: swiftclient connection
+            container_name(str): container of the manifest
+            segment_size(int): bytes per segment
+            workers(int): segments uploaded at a time, capped so that
+                workers * segment_size stays under MAX_SEGMENT_MEMORY
+            segment_container(str): container of the segments, the manifest's by default
+        """
+        self.rgw = rgw
+        self.container_name = container_name
+        self.segment_container = segment_container or container_name
+        self.segment_size = segment_size
+        self.workers = max(1, min(workers, MAX_SEGMENT_MEMORY // segment_size))
+        if self.workers < workers:
+            log.info(
+                f"{self.workers} segment upload workers instead of {workers}, "
+                f"to hold at most {MAX_SEGMENT_MEMORY} bytes of {segment_size} byte segments"
+            )
+
+    def existing_segments(self, segment_prefix):
+        """
+        This function lists the segments already uploaded under the prefix
+
+        Returns:
+            dict of name: (bytes, md5), empty when the container does not exist yet
+        """
+        try:
+            _, objects = self.rgw.get_container(
+                self.segment_container, prefix=segment_prefix, full_listing=True
+            )
+        except swiftclient.ClientException as e:
+            if e.http_status == 404:
+                return {}
+            raise
+        return {each["name"]: (each["bytes"], each["hash"]) for each in objects}
+
+    def upload_segments(
+        self, file_path, segment_prefix, headers=None, resume=False, content_type=None
+    ):
+        """
+        This function uploads the file in segments named segment_prefix + 8 digit index
+
+        The zero padded index keeps the listing order, which is the order
+        a DLO concatenates its segments in.
+
+        Parameters:
+            file_path(str): file to upload
+            segment_prefix(str): prefix of the segment names
+            headers(dict): headers of each segment PUT
+            resume(bool): do not upload the segments already present with the same md5
+
+        Returns:
+            LargeObjectUpload
+        """
+        started = time.perf_counter()
+        result = LargeObjectUpload(self.container_name, segment_prefix)
+        existing = self.existing_segments(segment_prefix) if resume else {}
+        pool = ConnectionPool(self.rgw, self.workers)
+        # bounds the segments read but not uploaded yet, a slot is taken before reading
+        slots = threading.BoundedSemaphore(self.workers)
+        lock = threading.Lock()
+        failed = threading.Event()
+
+        def upload(segment, data):
+            try:
+                conn = pool.get()
+                try:
+                    etag = conn.put_object(
+                        self.segment_container,
+                        segment["name"],
+                        contents=data,
+                        content_length=len(data),
+                        etag=segment["etag"],
+                        content_type=content_type,
+                        headers=headers,
+                    )
+                finally:
+                    pool.put(conn)
+                if etag is not None and etag.strip('"') != segment["etag"]:
+                    raise swiftclient.ClientException(
+                        f"segment {segment['name']} stored with etag {etag}, "
+                        f"expected {segment['etag']}"
+                    )
+                with lock:
+                    result.uploaded += 1
+                log.info(f"Uploaded segment: {segment['name']}")
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                slots.release()
+
+        file_md5 = hashlib.md5()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = []
+                with open(file_path, "rb") as f:
+                    for index in itertools.count():
+                        if failed.is_set():
+                            break
+                        slots.acquire()
+                        data = f.read(self.segment_size)
+                        if not data:
+                            slots.release()
+                            break
+                        file_md5.update(data)
+                        name = f"{segment_prefix}{index:08d}"
+                        segment = {
+                            "name": name,
+                            "path": f"/{self.segment_container}/{name}",
+                            "etag": hashlib.md5(data).hexdigest(),
+                            "size": len(data),
+                        }
+                        result.segments.append(segment)
+                        result.size += len(data)
+                        if existing.get(name) == (segment["size"], segment["etag"]):
+                            result.skipped += 1
+                            slots.release()
+                            continue
+                        futures.append(executor.submit(upload, segment, data))
+                # the first failure, e.g. a 403, is raised to the caller
+                for future in futures:
+                    future.result()
+        finally:
+            pool.close()
+        result.md5 = file_md5.hexdigest()
+        result.elapsed = time.perf_counter() - started
+        log.info(f"segments of {file_path} in {self.segment_container}: {result}")
+        return result
+
+    def upload_slo(
+        self, file_path, object_name, segment_prefix=None, headers=None, resume=False
+    ):
+        """
+        This function uploads a static large object: its segments, then its manifest
+
+        Parameters:
+            segment_prefix(str): prefix of the segment names, object_name/ by default
+
+        Returns:
+            LargeObjectUpload
+        """
+        result = self.upload_segments(
+            file_path, segment_prefix or f"{object_name}/", resume=resume
+        )
+        self.rgw.put_object(
+            self.container_name,
+            object_name,
+            contents=json.dumps(result.manifest),
+            query_string="multipart-manifest=put",
+            headers=headers,
+        )
+        log.info(
+            f"SLO manifest of {len(result.segments)} segments uploaded for "
+            f"'{object_name}', etag {result.manifest_etag}"
+        )
+        return result
+
+    def upload_dlo(
+        self, file_path, object_name, segment_prefix=None, headers=None, resume=False
+    ):
+        """
+        This function uploads a dynamic large object: its segments, then its manifest
+
+        Parameters:
+            segment_prefix(str): prefix of the segment names, object_name/ by default
+
+        Returns:
+            LargeObjectUpload
+        """
+        segment_prefix = segment_prefix or f"{object_name}/"
+        result = self.upload_segments(file_path, segment_prefix, resume=resume)
+        self.rgw.put_object(
+            self.container_name,
+            object_name,
+            contents="",
+            headers={
+                **(headers or {}),
+                "X-Object-Manifest": f"{self.segment_container}/{segment_prefix}",
+            },
+        )
+        log.info(
+            f"DLO manifest of {len(result.segments)} segments uploaded for "
+            f"'{object_name}', etag {result.manifest_etag}"
+        )
+        return result
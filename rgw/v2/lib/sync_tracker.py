@@ -0,0 +1,273 @@
+"""
+Multisite sync convergence tracker
+
+Checking sync one bucket at a time costs two radosgw-admin calls per bucket
+and round, which with thousands of buckets takes longer than the check
+interval itself. The tracker instead fetches the stats of all buckets with a
+single 'radosgw-admin bucket stats' per zone, runs the zones in parallel,
+diffs them in memory and logs the lag per bucket together with the
+convergence rate and an ETA, returning as soon as every bucket matches.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import v2.utils.utils as utils
+from v2.lib.exceptions import SyncFailedError
+from v2.utils.waiter import wait_until
+
+log = logging.getLogger(__name__)
+
+# number of lagging buckets listed per round
+SYNC_TRACKER_REPORT_TOP = 10
+
+
+def bucket_key(stats):
+    """
+    This function returns the name of a bucket stats entry, tenant/bucket for tenanted buckets
+    """
+    if stats.get("tenant"):
+        return f"{stats['tenant']}/{stats['bucket']}"
+    return stats["bucket"]
+
+
+def bucket_usage(stats):
+    """
+    This function returns (num_objects, size) of a bucket stats entry
+    """
+    main = stats.get("usage", {}).get("rgw.main", {})
+    return main.get("num_objects", 0), main.get("size", 0)
+
+
+def fetch_bucket_stats(ssh_con=None, bucket_name=None):
+    """
+    This function fetches the raw stats of every bucket of a zone in one call
+
+    Parameters:
+        ssh_con: ssh connection to a node of the zone, None for the local zone
+        bucket_name(str): fetch only this bucket
+
+    Returns:
+        list of 'radosgw-admin bucket stats' entries
+    """
+    cmd = "sudo radosgw-admin bucket stats"
+    if bucket_name is not None:
+        cmd += f" --bucket {bucket_name}"
+    if ssh_con is None:
+        out = utils.exec_shell_cmd(cmd)
+        if out is False:
+            raise SyncFailedError(f"'{cmd}' failed")
+    else:
+        # radosgw-admin warnings on stderr must not fail the call
+        stdin, stdout, stderr = ssh_con.exec_command(cmd)
+        out = stdout.read().decode("utf-8", errors="replace")
+    starts = [pos for pos in (out.find("["), out.find("{")) if pos >= 0]
+    if not starts:
+        if bucket_name is not None:
+            # bucket not created on this zone yet
+            return []
+        raise SyncFailedError(f"unexpected '{cmd}' output: {out[:500]}")
+    stats = json.loads(out[min(starts) :])
+    if isinstance(stats, dict):
+        stats = [stats]
+    return stats
+
+
+def fetch_all_bucket_stats(ssh_con=None, bucket_name=None):
+    """
+    This function fetches the stats of every bucket of a zone in one call
+
+    Parameters:
+        ssh_con: ssh connection to a node of the zone, None for the local zone
+        bucket_name(str): fetch only this bucket
+
+    Returns:
+        dict of bucket name to (num_objects, size)
+    """
+    return {
+        bucket_key(each): bucket_usage(each)
+        for each in fetch_bucket_stats(ssh_con, bucket_name)
+    }
+
+
+class SyncConvergenceTracker(object):
+    """
+    This class tracks the sync of a set of buckets from a reference zone to other zones
+
+    A bucket has converged on a zone when its num_objects, and size unless
+    compare_size is False, match the reference zone. With expected counts
+    the reference zone is not needed and num_objects is compared to them.
+    """
+
+    def __init__(
+        self,
+        bucket_names,
+        zones,
+        reference="primary",
+        expected=None,
+        compare_size=True,
+        recorder=None,
+    ):
+        """
+        Parameters:
+            bucket_names(list): buckets to track
+            zones(dict): zone name to ssh connection, None for the local zone
+            reference(str): zone the others are compared against
+            expected(dict): bucket name to num_objects expected on every
+                other zone, instead of the reference zone's stats
+            compare_size(bool): also compare the size of the buckets
+            recorder(BucketStatsRecorder): fetch the stats through this
+                recorder, so that every round is also recorded
+        """
+        self.bucket_names = list(bucket_names)
+        self.zones = zones
+        self.reference = reference
+        self.expected = expected
+        self.compare_size = compare_size
+        self.recorder = recorder
+        self.history = []
+        self.lagging = {}
+
+    def snapshot(self):
+        """
+        This function fetches the bucket stats of all zones in parallel
+
+        Returns:
+            dict of zone name to its bucket stats, see fetch_all_bucket_stats
+        """
+        if self.recorder is not None:
+            return {
+                zone: {bucket_key(each): bucket_usage(each) for each in stats}
+                for zone, stats in self.recorder.record().items()
+            }
+        # a single bucket is cheaper to fetch on its own
+        bucket_name = self.bucket_names[0] if len(self.bucket_names) == 1 else None
+        with ThreadPoolExecutor(max_workers=len(self.zones)) as executor:
+            futures = {
+                zone: executor.submit(fetch_all_bucket_stats, ssh_con, bucket_name)
+                for zone, ssh_con in self.zones.items()
+            }
+            return {zone: future.result() for zone, future in futures.items()}
+
+    def diff(self, snapshot):
+        """
+        This function returns the buckets not converged yet
+
+        Returns:
+            dict of (zone, bucket) to {"expected", "actual", "lag"}, lag is in objects
+        """
+        reference = snapshot.get(self.reference, {})
+        lagging = {}
+        for zone, stats in snapshot.items():
+            if zone == self.reference:
+                continue
+            for name in self.bucket_names:
+                if self.expected is not None:
+                    want = (self.expected[name], None)
+                else:
+                    want = reference.get(name)
+                    if want is None:
+                        raise SyncFailedError(
+                            f"bucket {name} not found on zone {self.reference}"
+                        )
+                    if not self.compare_size:
+                        want = (want[0], None)
+                have = stats.get(name)
+                if have is not None and have[0] == want[0]:
+                    if want[1] is None or have[1] == want[1]:
+                        continue
+                lagging[(zone, name)] = {
+                    "expected": want,
+                    "actual": have,
+                    "lag": want[0] - (have[0] if have is not None else 0),
+                }
+        return lagging
+
+    def poll(self):
+        """
+        This function runs one round: fetch, diff and report
+
+        Returns:
+            True when every bucket has converged on every zone
+        """
+        snapshot = self.snapshot()
+        self.lagging = self.diff(snapshot)
+        total_lag = sum(abs(each["lag"]) for each in self.lagging.values())
+        self.history.append((time.monotonic(), total_lag))
+        self.report(total_lag)
+        return not self.lagging
+
+    def rate(self):
+        """
+        This function returns the convergence rate in objects per second over the tracked rounds
+        """
+        if len(self.history) < 2:
+            return None
+        (t0, lag0), (t1, lag1) = self.history[0], self.history[-1]
+        if t1 <= t0:
+            return None
+        return (lag0 - lag1) / (t1 - t0)
+
+    def targets(self):
+        return [zone for zone in self.zones if zone != self.reference]
+
+    def report(self, total_lag):
+        if not self.lagging:
+            log.info(
+                f"sync converged for {len(self.bucket_names)} bucket(s) on "
+                f"{', '.join(self.targets())}"
+            )
+            return
+        rate = self.rate()
+        if rate is None:
+            rate, eta = "unknown", "unknown"
+        elif rate <= 0:
+            rate, eta = f"{rate:.2f}", "not converging"
+        else:
+            eta = f"{total_lag / rate:.0f}s"
+            rate = f"{rate:.2f}"
+        lagging_buckets = len({name for _, name in self.lagging})
+        log.info(
+            f"sync lag: {lagging_buckets}/{len(self.bucket_names)} bucket(s), "
+            f"{total_lag} object(s) behind, rate {rate} objects/s, eta {eta}"
+        )
+        worst = sorted(
+            self.lagging.items(), key=lambda item: abs(item[1]["lag"]), reverse=True
+        )
+        for (zone, name), each in worst[:SYNC_TRACKER_REPORT_TOP]:
+            actual = "missing" if each["actual"] is None else each["actual"][0]
+            log.info(
+                f"  {zone}/{name}: {actual} of {each['expected'][0]} objects, "
+                f"lag {each['lag']}"
+            )
+
+    def wait(self, timeout=3600, interval=30):
+        """
+        This function polls until every bucket converged
+
+        Raises:
+            SyncFailedError: when buckets still lag after timeout
+        """
+        log.info(
+            f"tracking sync of {len(self.bucket_names)} bucket(s) from "
+            f"{self.reference} to {', '.join(self.targets())}"
+        )
+        if wait_until(
+            self.poll,
+            "bucket stats to converge across zones",
+            timeout=timeout,
+            interval=interval,
+            max_interval=interval,
+            raise_on_timeout=False,
+        ):
+            return True
+        raise SyncFailedError(
+            f"{len(self.lagging)} bucket(s) did not converge after {timeout}s: "
+            f"{sorted(name for _, name in self.lagging)[:SYNC_TRACKER_REPORT_TOP]}"
+        )
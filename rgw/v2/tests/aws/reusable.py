@@ -25,6 +25,7 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../../")))
 import v2.utils.utils as utils
 from v2.lib.exceptions import AWSCommandExecError, TestExecError
 from v2.lib.manage_data import io_generator
+from v2.utils import wait_conditions
 
 
 def create_bucket(
@@ -547,6 +548,35 @@ def put_object(aws_auth, bucket_name, object_name, end_point):
         raise AWSCommandExecError(message=str(e))
 
 
+def put_objects(aws_auth, bucket_name, object_names, end_point):
+    """
+    Put/uploads many objects to the bucket, the uploads run concurrently
+    Ex: /usr/local/bin/aws s3api put-object --bucket <bucket_name> --key <object_name> --body <content> --endpoint <endpoint_url>
+    Args:
+        bucket_name(str): Name of the bucket
+        object_names(list): Names of the objects/files
+        end_point(str): endpoint
+    Return:
+        Response of each put-object operation
+    """
+    commands = [
+        aws_auth.command(
+            operation="put-object",
+            params=[
+                f"--bucket {bucket_name} --key {object_name} --body {object_name} --endpoint-url {end_point}",
+            ],
+        )
+        for object_name in object_names
+    ]
+    results = utils.exec_shell_cmds_parallel(commands)
+    failed = [each["cmd"] for each in results if each["rc"] != 0]
+    if failed:
+        raise AWSCommandExecError(
+            message=f"Create object failed for {bucket_name}: {failed[:10]}"
+        )
+    return [each["out"] for each in results]
+
+
 def put_object_checksum(
     aws_auth,
     bucket_name,
@@ -612,9 +642,7 @@ def validate_gc():
     if len(gc_list_json) == 0:
         raise AssertionError("GC list not generated for deleted objects")
     utils.exec_shell_cmd("radosgw-admin gc process --include-all")
-    gc_list = utils.exec_shell_cmd(cmd1)
-    gc_list_json = json.loads(gc_list)
-    if len(gc_list_json) != 0:
+    if not wait_conditions.wait_for_gc_list_empty(timeout=120, raise_on_timeout=False):
         raise AssertionError("GC process is not successful!")
 
 
@@ -1227,9 +1255,7 @@ def perform_gc_process_and_list():
     """
     utils.exec_shell_cmd("radosgw-admin gc list --include-all")
     utils.exec_shell_cmd("radosgw-admin gc process --include-all")
-    out = utils.exec_shell_cmd("radosgw-admin gc list --include-all")
-    gc_list = json.loads(out)
-    if len(gc_list) != 0:
+    if not wait_conditions.wait_for_gc_list_empty(timeout=120, raise_on_timeout=False):
         raise AssertionError("GC process does not emptied the GC list")
 
 
@@ -2035,7 +2061,6 @@ def check_rgw_debug_logs_and_reset(
                         if host_messages is not None:
                             nodes_checked += 1
                             found_count += host_messages
-                        node_ssh_con.close()
                     except Exception as e:
                         log.warning(f"Failed to check logs on RGW node {host}: {e}")
                 if nodes_checked == 0:
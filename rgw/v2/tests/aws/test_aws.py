@@ -161,7 +161,7 @@ def test_exec(config, ssh_con):
             object_names = ["1.txt", "2.txt", "3.txt"]
             for obj in object_names:
                 utils.exec_shell_cmd(f"fallocate -l 1K {obj}")
-                aws_reusable.put_object(cli_aws, bucket_name, obj, endpoint)
+            aws_reusable.put_objects(cli_aws, bucket_name, object_names, endpoint)
             log.info("Object uplod successful")
             log.info("List bucket with marker object 1.txt")
             marker = "1.txt"
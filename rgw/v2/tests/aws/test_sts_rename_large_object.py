@@ -26,7 +26,6 @@ import logging
 import os
 import random
 import sys
-import time
 import traceback
 
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
@@ -92,7 +91,6 @@ def test_exec(config, ssh_con):
     )
 
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -13,10 +13,14 @@ import time
 from urllib.parse import quote
 
 import v2.utils.utils as utils
+from v2.lib.curl import signed_http
 from v2.lib.exceptions import TestExecError
 
 log = logging.getLogger()
 
+# send the admin API requests with the curl binary instead of in-process
+USE_CURL = False
+
 
 def generate_random_string(length=8):
     """Generate random string for user names"""
@@ -37,11 +41,21 @@ def parse_json_response(response, context="API"):
 
 
 def admin_api_call(
-    method, endpoint, admin_key, admin_secret, params="", data="", content_type=""
+    method,
+    endpoint,
+    admin_key,
+    admin_secret,
+    params="",
+    data="",
+    content_type="",
+    resource="/admin/user",
 ):
     """
     Execute admin API call with AWS signature authentication
 
+    The request is signed in-process and sent over a pooled keep-alive connection,
+    with USE_CURL set it is signed in bash and sent with curl.
+
     Args:
         method: HTTP method (GET, PUT, POST, DELETE)
         endpoint: RGW endpoint URL
@@ -50,9 +64,10 @@ def admin_api_call(
         params: URL query parameters
         data: Request body data
         content_type: Content-Type header value
+        resource: Admin API resource, /admin/user or /admin/bucket
 
     Returns:
-        Response string from curl command
+        Response string, as from the curl command, False when the request failed
     """
     host = endpoint.split("//")[1]
     ct_header = f'-H "Content-Type: {content_type}"' if content_type else ""
@@ -60,11 +75,24 @@ def admin_api_call(
 
     cmd = f"""
 DATE=$(date -R -u)
-STRING_TO_SIGN="{method}\\n\\n{content_type}\\n$DATE\\n/admin/user"
+STRING_TO_SIGN="{method}\\n\\n{content_type}\\n$DATE\\n{resource}"
 SIGNATURE=$(echo -en "$STRING_TO_SIGN" | openssl sha1 -hmac {admin_secret} -binary | base64)
-curl -s -X {method} {ct_header} -H "Date: $DATE" -H "Authorization: AWS {admin_key}:$SIGNATURE" -H "Host: {host}" {data_param} "{endpoint}/admin/user{params}"
+curl -s -X {method} {ct_header} -H "Date: $DATE" -H "Authorization: AWS {admin_key}:$SIGNATURE" -H "Host: {host}" {data_param} "{endpoint}{resource}{params}"
 """
-    return utils.exec_shell_cmd(cmd)
+    if USE_CURL:
+        return utils.exec_shell_cmd(cmd)
+    url = signed_http.encode_url(f"{endpoint}{resource}{params}")
+    headers = {"Content-Type": content_type} if content_type else {}
+    headers = signed_http.sigv2_headers(method, url, headers, admin_key, admin_secret)
+    log.info(f"executing admin api call: {method} {url}")
+    try:
+        response = signed_http.send(method, url, headers, data.encode("utf-8") or None)
+    except Exception as e:
+        log.error(f"admin api call failed: {e}")
+        return False
+    # as curl -s, the body of an error response is returned too
+    log.info(f"{response.status_code} {response.reason}\n{response.text}")
+    return response.text
 
 
 def create_user(endpoint, admin_key, admin_secret, uid, display_name, site_name=""):
@@ -606,14 +634,15 @@ def remove_user_capabilities(
     """
     site_info = f" on {site_name} site" if site_name else ""
     log.info(f"Removing capabilities '{caps}' from user '{uid}'{site_info}")
-    host = endpoint.split("//")[1]
-    cmd = f"""
-DATE=$(date -R -u)
-STRING_TO_SIGN="DELETE\\n\\napplication/json\\n$DATE\\n/admin/user"
-SIGNATURE=$(echo -en "$STRING_TO_SIGN" | openssl sha1 -hmac {admin_secret} -binary | base64)
-curl -s -X DELETE -H "Content-Type: application/json" -H "Date: $DATE" -H "Authorization: AWS {admin_key}:$SIGNATURE" -H "Host: {host}" "{endpoint}/admin/user?uid={uid}&caps&user-caps={caps}&format=json"
-"""
-    response = utils.exec_shell_cmd(cmd)
+    response = admin_api_call(
+        "DELETE",
+        endpoint,
+        admin_key,
+        admin_secret,
+        f"?uid={uid}&caps&user-caps={caps}&format=json",
+        "",
+        "application/json",
+    )
     log.info(f"Remove capabilities response: {response}")
     log.info(f"Capabilities removed successfully{site_info}")
 
@@ -702,14 +731,16 @@ def delete_bucket_admin_api(
     """
     site_info = f" on {site_name} site" if site_name else ""
     log.info(f"Deleting bucket '{bucket_name}'{site_info}")
-    host = endpoint.split("//")[1]
-    cmd = f"""
-DATE=$(date -R -u)
-STRING_TO_SIGN="DELETE\\n\\napplication/json\\n$DATE\\n/admin/bucket"
-SIGNATURE=$(echo -en "$STRING_TO_SIGN" | openssl sha1 -hmac {admin_secret} -binary | base64)
-curl -s -X DELETE -H "Content-Type: application/json" -H "Date: $DATE" -H "Authorization: AWS {admin_key}:$SIGNATURE" -H "Host: {host}" "{endpoint}/admin/bucket?bucket={bucket_name}&purge-objects=True&format=json"
-"""
-    response = utils.exec_shell_cmd(cmd)
+    response = admin_api_call(
+        "DELETE",
+        endpoint,
+        admin_key,
+        admin_secret,
+        f"?bucket={bucket_name}&purge-objects=True&format=json",
+        "",
+        "application/json",
+        resource="/admin/bucket",
+    )
     log.info(f"Delete bucket response: {response}")
     log.info(f"Bucket '{bucket_name}' deleted successfully{site_info}")
 
@@ -93,12 +93,11 @@ def create_user(curl_auth, user_name=None):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    user_create_resp = curl_auth.execute(
         http_method="PUT",
         headers=headers,
         url_suffix=f"admin/user?display-name={user_name}&uid={user_name}",
     )
-    user_create_resp = utils.exec_shell_cmd(command)
     if user_create_resp is False:
         raise TestExecError("user creation failed")
     log.info(f"user create response: {user_create_resp}")
@@ -117,12 +116,9 @@ def get_user_info(curl_auth, uid):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
-        http_method="GET",
-        headers=headers,
-        url_suffix=f"admin/user?uid={uid}",
+    user_get_resp = curl_auth.execute(
+        http_method="GET", headers=headers, url_suffix=f"admin/user?uid={uid}"
     )
-    user_get_resp = utils.exec_shell_cmd(command)
     if user_get_resp is False:
         raise TestExecError("get user info failed")
     log.info(f"user get response: {user_get_resp}")
@@ -157,12 +153,11 @@ def create_subuser(curl_auth, uid, subuser_name, endpoint, retries=3, wait_time=
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    subuser_create_resp = curl_auth.execute(
         http_method="PUT",
         headers=headers,
         url_suffix=f"admin/user?subuser={subuser_name}&uid={uid}",
     )
-    subuser_create_resp = utils.exec_shell_cmd(command)
     if subuser_create_resp is False:
         raise TestExecError("subuser creation failed")
     log.info(f"subuser create response: {subuser_create_resp}")
@@ -197,10 +192,9 @@ def create_bucket(curl_auth, bucket_name, endpoint, retries=3, wait_time=5):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    bucket_creation_status = curl_auth.execute(
         http_method="PUT", headers=headers, url_suffix=bucket_name
     )
-    bucket_creation_status = utils.exec_shell_cmd(command)
     if bucket_creation_status is False:
         raise TestExecError("Bucket Creation Failed")
     log.info(f"Bucket {bucket_name} created")
@@ -261,25 +255,23 @@ def upload_object(
         log.info("testing requests.options before the actual put request")
         headers_options = headers.copy()
         headers_options["Access-Control-Request-Method"] = "PUT"
-        command = curl_auth.command(
+        upload_object_status = curl_auth.execute(
             http_method="OPTIONS",
             headers=headers_options,
             input_file=s3_object_path,
             # url_suffix=f"{bucket_name}/{s3_object_name}",
             presigned_url=presigned_url,
         )
-        upload_object_status = utils.exec_shell_cmd(command)
         if upload_object_status is False:
             raise TestExecError("requests.options failed for PUT")
         log.info(f"object {s3_object_name} uploaded")
-    command = curl_auth.command(
+    upload_object_status = curl_auth.execute(
         http_method="PUT",
         headers=headers,
         input_file=s3_object_path,
         url_suffix=f"{bucket_name}/{s3_object_name}",
         presigned_url=presigned_url,
     )
-    upload_object_status = utils.exec_shell_cmd(command)
     if upload_object_status is False:
         raise TestExecError("object upload failed")
     log.info(f"object {s3_object_name} uploaded")
@@ -313,13 +305,13 @@ def put_cors_object(
         TestExecError("data creation failed")
     log.info(f"uploading s3 object: {s3_object_path}")
     headers = {"x-amz-content-sha256": "UNSIGNED-PAYLOAD", "Origin": cors_origin}
-    command = curl_auth.command(
+    upload_object_status, err = curl_auth.execute(
+        debug_info=True,
         http_method="PUT",
         headers=headers,
         input_file=s3_object_path,
         url_suffix=f"{bucket_name}/{s3_object_name}",
     )
-    upload_object_status, err = utils.exec_shell_cmd(command, debug_info=True)
     log.info(upload_object_status)
     if upload_object_status is False:
         raise TestExecError("object upload failed")
@@ -354,13 +346,12 @@ def download_object(
         headers = {
             "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
         }
-    command = curl_auth.command(
+    upload_object_status = curl_auth.execute(
         http_method="GET",
         headers=headers,
         output_file=s3_object_download_path,
         url_suffix=f"{bucket_name}/{s3_object_name}",
     )
-    upload_object_status = utils.exec_shell_cmd(command)
     if upload_object_status is False:
         raise TestExecError("object download failed")
     log.info(f"object {s3_object_name} downloaded")
@@ -392,12 +383,11 @@ def delete_object(curl_auth, bucket_name, s3_object_name, cors_origin=None):
         headers = {
             "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
         }
-    command = curl_auth.command(
+    delete_object_status = curl_auth.execute(
         http_method="DELETE",
         headers=headers,
         url_suffix=f"{bucket_name}/{s3_object_name}",
     )
-    delete_object_status = utils.exec_shell_cmd(command)
     if delete_object_status is False:
         raise TestExecError("object deletion failed")
     log.info(f"object {s3_object_name} deleted")
@@ -416,10 +406,9 @@ def delete_bucket(curl_auth, bucket_name):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    delete_bucket_status = curl_auth.execute(
         http_method="DELETE", headers=headers, url_suffix=f"{bucket_name}"
     )
-    delete_bucket_status = utils.exec_shell_cmd(command)
     if delete_bucket_status is False:
         raise TestExecError("bucket deletion failed")
     log.info(f"Bucket {bucket_name} deleted")
@@ -464,13 +453,12 @@ def set_user_quota(
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    cmd_output = curl_auth.execute(
         http_method="PUT",
         headers=headers,
         url_suffix=f"admin/user?quota=true&quota-type={quota_type}&uid={user_id}",
         raw_data_list=[json.dumps(quota_json)],
     )
-    cmd_output = utils.exec_shell_cmd(command)
     log.info(f"set user quota status: {cmd_output}")
     if cmd_output is False:
         raise TestExecError(f"failed to set user quota for quota-type {quota_type}")
@@ -498,13 +486,12 @@ def set_individual_bucket_quota(curl_auth, user_id, bucket_name, quota_json):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    cmd_output = curl_auth.execute(
         http_method="PUT",
         headers=headers,
         url_suffix=f"admin/bucket?bucket={bucket_name}&quota=true&uid={user_id}",
         raw_data_list=[json.dumps(quota_json)],
     )
-    cmd_output = utils.exec_shell_cmd(command)
     log.info(f"bucket quota set status: {cmd_output}")
     if cmd_output is False:
         raise TestExecError(
@@ -607,10 +594,9 @@ def head_bucket(curl_auth, bucket_name):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    cmd_output = curl_auth.execute(
         headers=headers, url_suffix=f"{bucket_name}", head_request=True
     )
-    cmd_output = utils.exec_shell_cmd(command)
     log.info(f"head bucket result: {cmd_output}")
     if cmd_output is False:
         raise TestExecError(
@@ -633,12 +619,11 @@ def get_user_quota(curl_auth, user_id, quota_type):
     headers = {
         "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
     }
-    command = curl_auth.command(
+    cmd_output = curl_auth.execute(
         http_method="GET",
         headers=headers,
         url_suffix=f"admin/user?quota=true&quota-type={quota_type}&uid={user_id}",
     )
-    cmd_output = utils.exec_shell_cmd(command)
     log.info(f"user quota: {cmd_output}")
     if cmd_output is False:
         raise TestExecError(f"failed to get user quota for quota-type {quota_type}")
@@ -658,12 +643,11 @@ def create_multipart_upload(curl_auth, bucket_name, s3_object_name):
     """
     log.info(f"create multipart upload for object: {s3_object_name}")
     headers = {"x-amz-content-sha256": "UNSIGNED-PAYLOAD", "Accept": "application/json"}
-    command = curl_auth.command(
+    create_mpu_output = curl_auth.execute(
         http_method="POST",
         headers=headers,
         url_suffix=f"{bucket_name}/{s3_object_name}?uploads=true",
     )
-    create_mpu_output = utils.exec_shell_cmd(command)
     if create_mpu_output is False:
         raise TestExecError(
             f"create multipart upload failed for object {s3_object_name}"
@@ -699,13 +683,13 @@ def upload_part(
     headers = {"x-amz-content-sha256": "UNSIGNED-PAYLOAD"}
     if content_length:
         headers["Content-Length"] = content_length
-    command = curl_auth.command(
+    upload_part_output, verbose_output = curl_auth.execute(
+        debug_info=True,
         http_method="PUT",
         headers=headers,
         input_file=body,
         url_suffix=f"{bucket_name}/{s3_object_name}?partNumber={part_number}&uploadId={upload_id}",
     )
-    upload_part_output, verbose_output = utils.exec_shell_cmd(command, debug_info=True)
     if upload_part_output is False:
         raise TestExecError(f"upload part failed for object {s3_object_name}")
     log.info(f"upload part successful for object {s3_object_name}")
@@ -743,13 +727,12 @@ def complete_multipart_upload(
     """
     log.info(f"complete multipart upload for object: {s3_object_name}")
     headers = {"x-amz-content-sha256": "UNSIGNED-PAYLOAD", "Accept": "application/json"}
-    command = curl_auth.command(
+    complete_mpu_output = curl_auth.execute(
         http_method="POST",
         headers=headers,
         raw_data_list=[complete_mpu_string],
         url_suffix=f"{bucket_name}/{s3_object_name}?uploadId={upload_id}",
     )
-    complete_mpu_output = utils.exec_shell_cmd(command)
     if complete_mpu_output is False:
         raise TestExecError(
             f"complete multipart upload failed for object {s3_object_name}"
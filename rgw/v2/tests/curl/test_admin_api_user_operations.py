@@ -44,6 +44,7 @@ def test_exec(config, ssh_con):
     io_info_initialize = IOInfoInitialize()
     basic_io_structure = BasicIOInfoStructure()
     io_info_initialize.initialize(basic_io_structure.initial())
+    admin_api.USE_CURL = config.test_ops.get("use_curl", False)
 
     # Get endpoints
     primary_ip = utils.get_rgw_ip_zone("primary")
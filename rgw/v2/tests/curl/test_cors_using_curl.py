@@ -63,9 +63,14 @@ def test_exec(config, ssh_con):
         endpoint = aws_reusable.get_endpoint(ssh_con, ssl=config.ssl)
         aws_auth.do_auth_aws(each_user)
         curl_silent = True
+        use_curl = config.test_ops.get("use_curl", False)
         if config.test_ops.get("CRLF_injection", False):
             curl_silent = False
-        curl_auth = CURL(each_user, ssh_con, curl_silent, ssl=config.ssl)
+            # the sanitizing of the curl output is verified
+            use_curl = True
+        curl_auth = CURL(
+            each_user, ssh_con, curl_silent, ssl=config.ssl, use_curl=use_curl
+        )
 
         for bc in range(config.bucket_count):
             bucket_name = utils.gen_bucket_name_from_userid(user_name, rand_no=bc)
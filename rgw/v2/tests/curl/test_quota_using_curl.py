@@ -55,7 +55,12 @@ def test_exec(config, ssh_con):
         user_name = each_user["user_id"]
         log.info(user_name)
 
-        curl_auth = CURL(each_user, ssh_con, ssl=config.ssl)
+        curl_auth = CURL(
+            each_user,
+            ssh_con,
+            ssl=config.ssl,
+            use_curl=config.test_ops.get("use_curl", False),
+        )
 
         caps_add_cmd = f'sudo radosgw-admin caps add --uid={user_name} --caps="users=*;buckets=*;usage=*"'
         utils.exec_shell_cmd(caps_add_cmd)
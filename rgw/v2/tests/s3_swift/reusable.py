@@ -1,5 +1,4 @@
 import base64
-import glob
 import json
 import os
 import random
@@ -24,9 +23,16 @@ import configobj
 import v2.lib.manage_data as manage_data
 import v2.lib.resource_op as s3lib
 import v2.utils.utils as utils
-from v2.lib.exceptions import DefaultDatalogBackingError, MFAVersionError, TestExecError
+from v2.lib.bulk_delete import BulkDeleter
+from v2.lib.exceptions import (
+    DefaultDatalogBackingError,
+    MFAVersionError,
+    SyncFailedError,
+    TestExecError,
+)
 from v2.lib.rgw_config_opts import CephConfOp, ConfigOpts
 from v2.lib.s3.auth import Auth
+from v2.lib.s3.multipart import MULTIPART_UPLOAD_WORKERS, MultipartUploader
 from v2.lib.s3.write_io_info import (
     AddUserInfo,
     BasicIOInfoStructure,
@@ -35,8 +41,12 @@ from v2.lib.s3.write_io_info import (
     KeyIoInfo,
 )
 from v2.lib.sync_status import sync_status
+from v2.lib.sync_tracker import SyncConvergenceTracker, bucket_key
 from v2.tests.s3_swift.reusables import server_side_encryption_s3 as sse_s3
+from v2.utils import wait_conditions
+from v2.utils.cluster_facts import invalidate_cluster_facts
 from v2.utils.utils import HttpResponseParser, RGWService
+from v2.utils.waiter import wait_until
 
 rgw_service = RGWService()
 
@@ -377,6 +387,10 @@ def upload_object(
     s3_object_path = os.path.join(TEST_DATA_PATH, s3_object_name)
     log.info("s3 object path: %s" % s3_object_path)
     s3_object_size = config.obj_size
+    # virtual objects are generated while uploading and never written to disk
+    virtual_object = (
+        config.test_ops.get("virtual_objects") is True and append_data is not True
+    )
     if append_data is True:
         data_info = manage_data.io_generator(
             s3_object_path,
@@ -384,6 +398,9 @@ def upload_object(
             op="append",
             **{"message": "\n%s" % append_msg},
         )
+    elif virtual_object:
+        data_info = manage_data.virtual_io_generator(s3_object_size)
+        data_info["name"] = s3_object_path
     else:
         data_info = manage_data.io_generator(s3_object_path, s3_object_size)
     if data_info is False:
@@ -416,17 +433,30 @@ def upload_object(
         log.info(f"ChecksumAlgorithm used is {checksum_algorithm}")
         extra_args = {"ChecksumAlgorithm": checksum_algorithm}
         args.append(extra_args)
-    object_uploaded_status = s3lib.resource_op(
-        {
-            "obj": s3_obj,
-            "resource": "upload_file",
-            "args": args,
-            "extra_info": upload_info,
-        }
-    )
+    if virtual_object:
+        put_kwargs = {"Body": upload_info.pop("body")}
+        for extra_args in args[1:]:
+            put_kwargs.update(extra_args)
+        object_uploaded_status = s3lib.resource_op(
+            {
+                "obj": s3_obj,
+                "resource": "put",
+                "kwargs": put_kwargs,
+                "extra_info": upload_info,
+            }
+        )
+    else:
+        object_uploaded_status = s3lib.resource_op(
+            {
+                "obj": s3_obj,
+                "resource": "upload_file",
+                "args": args,
+                "extra_info": upload_info,
+            }
+        )
     if object_uploaded_status is False:
         raise TestExecError("Resource execution failed: object upload failed")
-    if object_uploaded_status is None:
+    if object_uploaded_status is None or virtual_object:
         log.info("object uploaded")
 
 
@@ -699,15 +729,6 @@ def upload_mutipart_object(
         data_info = manage_data.io_generator(s3_object_path, s3_object_size)
     if data_info is False:
         TestExecError("data creation failed")
-    mp_dir = os.path.join(TEST_DATA_PATH, s3_object_name + ".mp.parts")
-    log.info("mp part dir: %s" % mp_dir)
-    log.info("making multipart object part dir")
-    mkdir = utils.exec_shell_cmd("sudo mkdir %s" % mp_dir)
-    if mkdir is False:
-        raise TestExecError("mkdir failed creating mp_dir_name")
-    utils.split_file(s3_object_path, split_size, mp_dir + "/")
-    parts_list = sorted(glob.glob(mp_dir + "/" + "*"))
-    log.info("parts_list: %s" % parts_list)
     log.info("uploading s3 object: %s" % s3_object_path)
     upload_info = dict(
         {"access_key": user_info["access_key"], "upload_type": "multipart"}, **data_info
@@ -730,76 +751,58 @@ def upload_mutipart_object(
         mpu_dict.update({"kwargs": {"Tagging": obj_tag}})
 
     mpu = s3lib.resource_op(mpu_dict)
-    part_number = 1
-    parts_info = {"Parts": []}
-    if config.test_ops.get("test_get_object_attributes"):
-        object_parts_info = {"TotalPartsCount": len(parts_list), "Parts": []}
-    log.info("no of parts: %s" % len(parts_list))
+    uploader = MultipartUploader(
+        mpu,
+        s3_object_path,
+        split_size * 1024 * 1024,
+        max_workers=getattr(config, "multipart_upload_workers", None)
+        or MULTIPART_UPLOAD_WORKERS,
+    )
+    no_of_parts = len(uploader.parts)
+    log.info("no of parts: %s" % no_of_parts)
     # Handle edge case when there's only 1 part - set abort_part_no to 2 to ensure at least one part uploads before abort
-    if len(parts_list) <= 1:
+    if no_of_parts <= 1:
         abort_part_no = 2  # Will never abort since part_number will be 1
     else:
-        abort_part_no = random.randint(1, len(parts_list) - 1)
+        abort_part_no = random.randint(1, no_of_parts - 1)
         """if randomly selected abort-part-no is less than 1 then we will increment it by 1 to make sure atleast one part is uploaded
         before aborting multipart(to avoid some corner case)"""
         if abort_part_no <= 1:
             abort_part_no = abort_part_no + 1
     log.info(f"abort part no is: {abort_part_no}")
-    for each_part in parts_list:
-        log.info("trying to upload part: %s" % each_part)
-        part = mpu.Part(part_number)
-        # part_upload_response = part.upload(Body=open(each_part))
-        part_upload_response = s3lib.resource_op(
-            {
-                "obj": part,
-                "resource": "upload",
-                "kwargs": dict(Body=open(each_part, mode="rb")),
-            }
-        )
-        if part_upload_response is not False:
-            response = HttpResponseParser(part_upload_response)
-            if response.status_code == 200:
-                log.info("part uploaded")
-            else:
-                raise TestExecError("part uploading failed")
-        part_info = {"PartNumber": part_number, "ETag": part_upload_response["ETag"]}
-        parts_info["Parts"].append(part_info)
-        if each_part != parts_list[-1]:
-            # increase the part number only if the current part is not the last part
-            part_number += 1
-        log.info("curr part_number: %s" % part_number)
-
-        if abort_multipart and part_number == abort_part_no:
-            log.info(f"aborting multi part {part_number}")
+    with uploader:
+        if abort_multipart and abort_part_no <= no_of_parts:
+            # parts before abort_part_no are uploaded, the upload is left incomplete
+            uploader.upload_parts(count=abort_part_no - 1)
+            log.info(f"aborting multi part {abort_part_no}")
             return
-        if config.test_ops.get("test_get_object_attributes"):
-            part_info_get_obj_attr = part_info.copy()
-            part_info_get_obj_attr["Size"] = os.stat(each_part).st_size
-            object_parts_info["Parts"].append(part_info_get_obj_attr)
-
-    if config.local_file_delete is True:
-        log.info("deleting local file part")
-        utils.exec_shell_cmd(f"rm -rf {mp_dir}")
-    # log.info('parts_info so far: %s'% parts_info)
-    if len(parts_list) == part_number:
-        log.info("all parts upload completed")
-        if complete_abort_race:
-            log.info("triggering complete and abort multipart upload at the same time")
-            t1 = Thread(
-                target=mpu.complete,
-                kwargs={"MultipartUpload": parts_info},
-            )
-            t2 = Thread(target=mpu.abort, kwargs={})
-
-            t1.start()
-            time.sleep(0.01)
-            t2.start()
-
-            t1.join()
-            t2.join()
-        else:
-            mpu.complete(MultipartUpload=parts_info)
-        log.info("multipart upload complete for key: %s" % s3_object_name)
+        uploaded_parts = uploader.upload_parts()
+    parts_info = {
+        "Parts": [
+            {"PartNumber": each["PartNumber"], "ETag": each["ETag"]}
+            for each in uploaded_parts
+        ]
+    }
+    if config.test_ops.get("test_get_object_attributes"):
+        object_parts_info = {"TotalPartsCount": no_of_parts, "Parts": uploaded_parts}
+    log.info("all parts upload completed")
+    if complete_abort_race:
+        log.info("triggering complete and abort multipart upload at the same time")
+        t1 = Thread(
+            target=mpu.complete,
+            kwargs={"MultipartUpload": parts_info},
+        )
+        t2 = Thread(target=mpu.abort, kwargs={})
+
+        t1.start()
+        time.sleep(0.01)
+        t2.start()
+
+        t1.join()
+        t2.join()
+    else:
+        mpu.complete(MultipartUpload=parts_info)
+    log.info("multipart upload complete for key: %s" % s3_object_name)
     if config.test_ops.get("test_get_object_attributes"):
         return object_parts_info
 
@@ -840,18 +843,6 @@ def upload_multipart_with_break(
     if data_info is False:
         raise TestExecError("data creation failed")
 
-    # Create multipart parts directory
-    mp_dir = os.path.join(TEST_DATA_PATH, s3_object_name + ".mp.parts")
-    log.info("mp part dir: %s" % mp_dir)
-    log.info("making multipart object part dir")
-    mkdir = utils.exec_shell_cmd("sudo mkdir -p %s" % mp_dir)
-    if mkdir is False:
-        raise TestExecError("mkdir failed creating mp_dir_name")
-
-    # Split file into parts
-    utils.split_file(s3_object_path, split_size, mp_dir + "/")
-    parts_list = sorted(glob.glob(mp_dir + "/" + "*"))
-    log.info("parts_list: %s" % parts_list)
     log.info("uploading s3 object: %s" % s3_object_path)
 
     upload_info = dict(
@@ -876,38 +867,22 @@ def upload_multipart_with_break(
     }
 
     mpu = s3lib.resource_op(mpu_dict)
-    part_number = 1
-    parts_info = {"Parts": []}
-    log.info("no of parts: %s" % len(parts_list))
-
-    if break_at_part_no > 0:
-        log.info("starting at part no: %s" % break_at_part_no)
-        log.info("--------------------------------------------------")
-
-    # Upload parts
-    for each_part in parts_list:
-        log.info("trying to upload part: %s" % each_part)
-        part = mpu.Part(part_number)
-        part_upload_response = s3lib.resource_op(
-            {
-                "obj": part,
-                "resource": "upload",
-                "kwargs": dict(Body=open(each_part, mode="rb")),
-            }
-        )
-        if part_upload_response is not False:
-            response = HttpResponseParser(part_upload_response)
-            if response.status_code == 200:
-                log.info("part uploaded")
-            else:
-                raise TestExecError("part uploading failed")
-
-        part_info = {"PartNumber": part_number, "ETag": part_upload_response["ETag"]}
-        parts_info["Parts"].append(part_info)
+    with MultipartUploader(
+        mpu,
+        s3_object_path,
+        split_size * 1024 * 1024,
+        max_workers=getattr(config, "multipart_upload_workers", None)
+        or MULTIPART_UPLOAD_WORKERS,
+    ) as uploader:
+        no_of_parts = len(uploader.parts)
+        log.info("no of parts: %s" % no_of_parts)
 
         # Check if we should abort at this part
-        if break_at_part_no > 0 and part_number == break_at_part_no:
-            log.info(f"aborting multipart upload at part {part_number}")
+        if 0 < break_at_part_no <= no_of_parts:
+            log.info("starting at part no: %s" % break_at_part_no)
+            log.info("--------------------------------------------------")
+            uploader.upload_parts(count=break_at_part_no)
+            log.info(f"aborting multipart upload at part {break_at_part_no}")
             # Abort the multipart upload
             abort_response = s3lib.resource_op(
                 {
@@ -918,23 +893,19 @@ def upload_multipart_with_break(
             )
             log.info(f"multipart upload aborted: {abort_response}")
             return
-
-        if each_part != parts_list[-1]:
-            # increase the part number only if the current part is not the last part
-            part_number += 1
-        log.info("curr part_number: %s" % part_number)
+        uploaded_parts = uploader.upload_parts()
 
     # Complete multipart upload if not aborted
-    if len(parts_list) == part_number:
-        log.info("all parts upload completed")
-        complete_response = mpu.complete(MultipartUpload=parts_info)
-        log.info("multipart upload complete for key: %s" % s3_object_name)
-        log.info(f"complete response: {complete_response}")
-
-    # Cleanup local parts
-    if config.local_file_delete is True:
-        log.info("deleting local file part")
-        utils.exec_shell_cmd(f"rm -rf {mp_dir}")
+    log.info("all parts upload completed")
+    parts_info = {
+        "Parts": [
+            {"PartNumber": each["PartNumber"], "ETag": each["ETag"]}
+            for each in uploaded_parts
+        ]
+    }
+    complete_response = mpu.complete(MultipartUpload=parts_info)
+    log.info("multipart upload complete for key: %s" % s3_object_name)
+    log.info(f"complete response: {complete_response}")
 
 
 def upload_part(
@@ -1418,7 +1389,6 @@ def set_bi_max_shards(shard_count):
     out1 = utils.exec_shell_cmd(cmd)
     log.info("trying to restart services")
     srv_restarted = rgw_service.restart()
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -1458,6 +1428,7 @@ def period_update_commit(validate_policy=False, pipe_op=None):
     _, realm_name = get_multisite_info()
     cmd_realm = f"radosgw-admin period update --rgw-realm={realm_name} --commit"
     op = utils.exec_shell_cmd(cmd_realm)
+    invalidate_cluster_facts()
     json_doc = json.loads(op)
     if validate_policy:
         sync_policy = json_doc["period_map"]["zonegroups"][0]["sync_policy"]["groups"]
@@ -1543,54 +1514,34 @@ def link_chown_nontenant_to_nontenant(new_uid, bucket):
 
 def delete_objects(bucket, gc_verification=True):
     """
-    deletes the objects in a given bucket
+    deletes the objects in a given bucket, in concurrent DeleteObjects batches
     :param bucket: S3Bucket object
     """
-    log.info("listing all objects in bucket: %s" % bucket.name)
-    objects = s3lib.resource_op({"obj": bucket, "resource": "objects", "args": None})
-    log.info("objects :%s" % objects)
-    all_objects = s3lib.resource_op({"obj": objects, "resource": "all", "args": None})
-    log.info("all objects: %s" % all_objects)
-    for obj in all_objects:
-        log.info("object_name: %s" % obj.key)
-        log.info("object_size: %s" % obj.size)
-        gc_verify_list = []
-        if obj.size < 4194304:
-            gc_verify_list.append("No")
-            if "No" in gc_verify_list:
-                gc_verification = False
-    log.info("deleting all objects in bucket")
-    objects_deleted = s3lib.resource_op(
-        {"obj": objects, "resource": "delete", "args": None}
-    )
-    log.info("objects_deleted: %s" % objects_deleted)
-    if objects_deleted is False:
-        raise TestExecError("Resource execution failed: Object deletion failed")
-    if objects_deleted is not None:
-        response = HttpResponseParser(objects_deleted[0])
-        if response.status_code == 200:
-            log.info("objects deleted ")
-            write_key_info = KeyIoInfo()
-            for obj in all_objects:
-                log.info(f"writing log for delete object {obj.key}")
-                write_key_info.set_key_deleted(obj.bucket_name, obj.key)
-            if gc_verification:
-                log.info("Verify GC Process")
-                cmd1 = f"radosgw-admin gc list --include-all"
-                gc_list = utils.exec_shell_cmd(cmd1)
-                gc_list_json = json.loads(gc_list)
-                if len(gc_list_json) == 0:
-                    raise AssertionError("GC list not generated for deleted objects")
-                utils.exec_shell_cmd("radosgw-admin gc process --include-all")
-                gc_list = utils.exec_shell_cmd(cmd1)
-                gc_list_json = json.loads(gc_list)
-                if len(gc_list_json) != 0:
-                    raise AssertionError("GC process is not successful!")
-
-        else:
-            raise TestExecError("objects deletion failed")
-    else:
-        raise TestExecError("objects deletion failed")
+    log.info("deleting all objects in bucket: %s" % bucket.name)
+    result = BulkDeleter(bucket.meta.client, bucket.name).delete_objects()
+    if result.errors:
+        raise TestExecError(
+            f"objects deletion failed, {len(result.errors)} not deleted: "
+            f"{result.errors[:10]}"
+        )
+    log.info("objects deleted ")
+    write_key_info = KeyIoInfo()
+    write_key_info.set_keys_deleted(bucket.name, result.deleted_keys)
+    # objects smaller than 4M have no tail objects for gc
+    if not result.deleted or result.min_size < 4194304:
+        gc_verification = False
+    if gc_verification:
+        log.info("Verify GC Process")
+        cmd1 = f"radosgw-admin gc list --include-all"
+        gc_list = utils.exec_shell_cmd(cmd1)
+        gc_list_json = json.loads(gc_list)
+        if len(gc_list_json) == 0:
+            raise AssertionError("GC list not generated for deleted objects")
+        utils.exec_shell_cmd("radosgw-admin gc process --include-all")
+        if not wait_conditions.wait_for_gc_list_empty(
+            timeout=120, raise_on_timeout=False
+        ):
+            raise AssertionError("GC process is not successful!")
 
 
 def list_objects(bucket):
@@ -1688,13 +1639,26 @@ def delete_versioned_object(
     :param rgw_conn: rgw connection
     :param user_info: user info dict containing access_key, secret_key and user_id
     """
-    versions = bucket.object_versions.filter(Prefix=s3_object_name)
     log.info("deleting s3_obj keys and its versions")
+    if not return_status:
+        log.info("deleting versions for s3 obj: %s" % s3_object_name)
+        result = BulkDeleter(rgw_conn.meta.client, bucket.name).delete_versions(
+            key=s3_object_name
+        )
+        if result.errors:
+            raise TestExecError(f"version deletion failed: {result.errors[:10]}")
+        versions = []
+    else:
+        # the status of the first version delete is returned
+        versions = bucket.object_versions.filter(Prefix=s3_object_name)
+        s3_obj = s3lib.resource_op(
+            {
+                "obj": rgw_conn,
+                "resource": "Object",
+                "args": [bucket.name, s3_object_name],
+            }
+        )
     not_deleted = False
-    s3_obj = s3lib.resource_op(
-        {"obj": rgw_conn, "resource": "Object", "args": [bucket.name, s3_object_name]}
-    )
-    log.info("deleting versions for s3 obj: %s" % s3_object_name)
     for version in versions:
         log.info("trying to delete obj version: %s" % version.version_id)
         del_obj_version = s3lib.resource_op(
@@ -1726,19 +1690,24 @@ def delete_versioned_object(
         )
 
 
-def delete_bucket(bucket):
+def delete_bucket(bucket, purge=False):
     """
     deletes a given bucket
     :param bucket: s3Bucket object
-    """
+    :param purge: first delete all objects, versions, delete markers and
+        incomplete multipart uploads left in the bucket
+    """
+    if purge:
+        result = BulkDeleter(bucket.meta.client, bucket.name).purge()
+        if result.errors:
+            raise TestExecError(f"bucket purge failed: {result.errors[:10]}")
+        KeyIoInfo().set_keys_deleted(bucket.name, result.deleted_keys)
     for retry_count in range(4):
         log.info("listing objects if any")
-        objs = bucket.objects.all()
-        count = sum(1 for _ in bucket.objects.all())
-        if count > 0:
-            log.info(f"objects not deleted, count is:{count}")
-            for ob in objs:
-                log.info(f"object: {ob.key}")
+        # one listing page is enough to tell and to show what is left
+        objs = list(bucket.objects.limit(count=10))
+        if objs:
+            log.info(f"objects not deleted, e.g.: {[ob.key for ob in objs]}")
         else:
             log.info("No objects in bucket")
             break
@@ -1810,7 +1779,6 @@ def set_gc_conf(ceph_conf, conf):
     )
     log.info("trying to restart services")
     srv_restarted = rgw_service.restart()
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -2562,18 +2530,25 @@ def bucket_reshard_dynamic(bucket, config):
     # the number of shards  should be greater than   [ (no of objects)/(max objects per shard) ]
     # example: objects = 500 ; max object per shard = 10
     # then no of shards should be at least 50 or more
-    resharding_sleep_time = config.rgw_reshard_thread_interval
-    log.info(
-        "verification of dynamic resharding starts after waiting for reshard_thread_interval:"
-        + f"{resharding_sleep_time} seconds"
-    )
-    time.sleep(resharding_sleep_time)
     bucket_name = f"{bucket.name}"
     if config.test_ops.get("tenant_name"):
         tenant_name = config.test_ops.get("tenant_name")
         bucket_name = f"{tenant_name}/{bucket.name}"
     num_shards_expected = config.objects_count / config.max_objects_per_shard
     log.info("num_shards_expected: %s" % num_shards_expected)
+    # the reshard thread runs every reshard_thread_interval, a few runs are allowed
+    reshard_timeout = max(600, 3 * config.rgw_reshard_thread_interval)
+    log.info("verification of dynamic resharding starts once the bucket is resharded")
+    wait_conditions.wait_for_num_shards(
+        bucket_name,
+        lambda num_shards: int(num_shards) >= int(num_shards_expected),
+        f">= {int(num_shards_expected)}",
+        timeout=reshard_timeout,
+        raise_on_timeout=False,
+    )
+    wait_conditions.wait_for_reshard_list_empty(
+        timeout=reshard_timeout, raise_on_timeout=False
+    )
     op = utils.exec_shell_cmd("radosgw-admin bucket stats --bucket %s" % bucket_name)
     json_doc = json.loads(op)
     bucket_id = json_doc["id"]
@@ -2741,52 +2716,21 @@ def verify_object_sync_on_other_site(rgw_ssh_con, bucket, config, bucket_object=
         bkt_objects = bucket_object
 
     log.info(f"Verify object sync on other site for bucket {bucket.name}")
-    _, stdout, _ = rgw_ssh_con.exec_command(
-        f"radosgw-admin bucket stats --bucket {bucket.name}"
+    # the tracker names tenanted buckets tenant/bucket
+    tracked_name = bucket_key(bucket_stats)
+    tracker = SyncConvergenceTracker(
+        [tracked_name],
+        {"other site": rgw_ssh_con},
+        expected={tracked_name: bkt_objects},
     )
-    cmd_output = json.loads(stdout.read().decode())
-    if "rgw.main" not in cmd_output["usage"].keys():
-        for retry_count in range(25):
-            time.sleep(60)
-            _, re_stdout, _ = rgw_ssh_con.exec_command(
-                f"radosgw-admin bucket stats --bucket {bucket.name}"
-            )
-            re_cmd_output = json.loads(re_stdout.read().decode())
-            log.info(
-                f"check bucket stats on other site after 60s: {re_cmd_output} for bucket {bucket.name}"
-            )
-            if "rgw.main" not in re_cmd_output["usage"].keys():
-                log.info(
-                    f"bucket stats not synced: for bucket {bucket.name}, so retry {retry_count}"
-                )
-            else:
-                log.info(f"bucket stats synced for bucket {bucket.name}")
-                break
-
-        if (retry_count > 25) and ("rgw.main" not in re_cmd_output["usage"].keys()):
-            raise TestExecError(
-                f"object not synced on bucket {bucket.name} in another site even after 25m"
-            )
-        cmd_output = re_cmd_output
-
-    site_bkt_objects = cmd_output["usage"]["rgw.main"]["num_objects"]
-    if bkt_objects != site_bkt_objects:
-        log.info(
-            f"object count mismatch found for bucket {bucket.name} : {site_bkt_objects} expected {bkt_objects}"
-        )
-        log.info("Check after 180s")
-        time.sleep(180)
-        _, output, _ = rgw_ssh_con.exec_command(
-            f"radosgw-admin bucket stats --bucket {bucket.name}"
+    try:
+        tracker.wait(timeout=1680, interval=60)
+    except SyncFailedError:
+        raise TestExecError(
+            f"object count mismatch found in another site for bucket {bucket.name} : "
+            f"{tracker.lagging.get(('other site', tracked_name), {}).get('actual')} expected {bkt_objects}"
         )
-        command_output = json.loads(output.read().decode())
-        bucket_objects = command_output["usage"]["rgw.main"]["num_objects"]
-        if bkt_objects != bucket_objects:
-            raise TestExecError(
-                f"object count mismatch found in another site for bucket {bucket.name} : {bucket_objects} expected {bkt_objects}"
-            )
-        cmd_output = command_output
-    log.info(f"object synced on another site for bucket {bucket.name} : {cmd_output}")
+    log.info(f"object synced on another site for bucket {bucket.name}")
 
 
 def flow_operation(
@@ -3044,49 +2988,52 @@ def test_bucket_stats_across_sites(bucket_name_to_create, config):
         log.info(
             f"Collecting bucket stats for {bucket_name_to_create} at remote site {zone_name}"
         )
-        if config.test_ops.get("download_object_at_remote_site", False):
-            log.info("We have already waited for the sync lease period")
-        else:
-            log.info("We have to wait for sync lease period")
-            time.sleep(1200)
 
-        # Try bucket stats at remote site with fallback
-        stdin, stdout, stderr = remote_site_ssh_con.exec_command(
-            f"radosgw-admin bucket stats --bucket {bucket_name_to_create}"
-        )
-        cmd_output = stdout.read().decode()
-        err_output = stderr.read().decode()
-        if cmd_output.strip():
-            stats_remote = json.loads(cmd_output)
-        elif "failure: (2002) Unknown error 2002:" in err_output:
-            log.warning(
-                f"Bucket stats failed for {bucket_name_to_create} at remote, trying with tenant0 prefix"
-            )
+        def remote_bucket_stats():
+            # Try bucket stats at remote site with fallback
             stdin, stdout, stderr = remote_site_ssh_con.exec_command(
-                f"radosgw-admin bucket stats --bucket tenant0/{bucket_name_to_create}"
+                f"radosgw-admin bucket stats --bucket {bucket_name_to_create}"
             )
             cmd_output = stdout.read().decode()
             err_output = stderr.read().decode()
             if cmd_output.strip():
-                stats_remote = json.loads(cmd_output)
-            else:
-                raise TestExecError(
-                    f"Bucket stats failed for {bucket_name_to_create} at remote site {zone_name}: {err_output}"
+                return json.loads(cmd_output)
+            if "failure: (2002) Unknown error 2002:" in err_output:
+                log.warning(
+                    f"Bucket stats failed for {bucket_name_to_create} at remote, trying with tenant0 prefix"
                 )
-        else:
+                stdin, stdout, stderr = remote_site_ssh_con.exec_command(
+                    f"radosgw-admin bucket stats --bucket tenant0/{bucket_name_to_create}"
+                )
+                cmd_output = stdout.read().decode()
+                err_output = stderr.read().decode()
+                if cmd_output.strip():
+                    return json.loads(cmd_output)
             raise TestExecError(
                 f"Bucket stats failed for {bucket_name_to_create} at remote site {zone_name}: {err_output}"
             )
 
-        log.info(
-            f"Bucket stats at remote site {zone_name} for {bucket_name_to_create} is {stats_remote}"
-        )
+        def stats_consistent():
+            stats_remote = remote_bucket_stats()
+            log.info(
+                f"Bucket stats at remote site {zone_name} for {bucket_name_to_create} is {stats_remote}"
+            )
+            remote_num_objects = stats_remote["usage"]["rgw.main"]["num_objects"]
+            remote_size = stats_remote["usage"]["rgw.main"]["size"]
+            return remote_size == local_size and remote_num_objects == local_num_objects
+
         log.info(
             "Verify num_objects and size is consistent across local and remote site"
         )
-        remote_num_objects = stats_remote["usage"]["rgw.main"]["num_objects"]
-        remote_size = stats_remote["usage"]["rgw.main"]["size"]
-        if remote_size == local_size and remote_num_objects == local_num_objects:
+        # polled for up to the sync lease period instead of sleeping through it
+        if wait_until(
+            stats_consistent,
+            f"bucket stats of {bucket_name_to_create} to match at {zone_name}",
+            timeout=1200,
+            interval=10,
+            max_interval=60,
+            raise_on_timeout=False,
+        ):
             log.info(f"Data is consistent for bucket {bucket_name_to_create}")
         else:
             raise TestExecError(
@@ -3117,13 +3064,19 @@ def test_object_download_at_replicated_site(
         # Download objects from remote site using boto3 rgw client
         remote_ip = utils.get_rgw_ip_zone(zone_name)
         remote_site_ssh_conn = utils.connect_remote(remote_ip)
+        # up to the sync lease period for the object to reach the remote site
+        wait_conditions.wait_for_bucket_synced(
+            bucket_name,
+            remote_site_ssh_conn,
+            timeout=1200,
+            raise_on_timeout=False,
+        )
         remote_site_auth = get_auth(
             each_user, remote_site_ssh_conn, config.ssl, config.haproxy
         )
         remote_s3_client = remote_site_auth.do_auth_using_client()
         if zone_name == "archive":
             log.info(f"It is a {zone_name} zone, hence objects are always versioned.")
-        time.sleep(20)
         response_versions = remote_s3_client.list_object_versions(
             Bucket=bucket_name, Prefix=s3_object_name
         )
@@ -3873,6 +3826,9 @@ def find_admin_socket(ssh_con=None):
     """
     Find the RGW admin socket file in /var/run/ceph/
 
+    Not a cluster fact: the socket name holds the daemon pid, which changes
+    with every restart, including the ones done with ceph orch directly.
+
     Returns:
         str: Path to the admin socket file
     """
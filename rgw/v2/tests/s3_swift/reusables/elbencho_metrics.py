@@ -0,0 +1,299 @@
+"""
+Structured elbencho results
+
+elbencho writes its per phase result table to a file with --jsonfile (or
+--csvfile). The functions here parse that file into typed metrics per
+phase, keep every run in a json lines history file and compare a run
+against a baseline run of an earlier build to flag throughput and latency
+regressions. Besides v2.utils.log for the log directory, this module only
+uses the standard library: it needs no numpy, pyarrow or boto3, so report
+scripts running outside the test environment can import it.
+"""
+
+import csv
+import json
+import logging
+import os
+import time
+import uuid
+
+from v2.utils.log import LOG_DIR
+
+log = logging.getLogger()
+
+ELBENCHO_HISTORY_FILE = os.path.join(LOG_DIR, "elbencho_run_history.jsonl")
+# a metric regresses when it is worse than the baseline by more than this fraction
+THROUGHPUT_TOLERANCE = 0.10
+LATENCY_TOLERANCE = 0.20
+
+# elbencho result columns, '[first]' is when the first thread finished the
+# phase (stonewall) and '[last]' when all of them did
+ELBENCHO_COLUMNS = {
+    "operation": "phase",
+    "label": "label",
+    "threads": "threads",
+    "hosts": "hosts",
+    "file size": "object_size",
+    "block size": "block_size",
+    "time ms [first]": "time_ms_first",
+    "time ms [last]": "time_ms",
+    "cpu% [last]": "cpu_pct",
+    "entries [last]": "entries",
+    "entries/s [first]": "entries_per_sec_first",
+    "entries/s [last]": "entries_per_sec",
+    "ent lat us [min]": "ent_lat_us_min",
+    "ent lat us [avg]": "ent_lat_us_avg",
+    "ent lat us [max]": "ent_lat_us_max",
+    "mib [last]": "mib",
+    "mib/s [first]": "mib_per_sec_first",
+    "mib/s [last]": "mib_per_sec",
+    "iops [first]": "iops_first",
+    "iops [last]": "iops",
+    "io lat us [min]": "io_lat_us_min",
+    "io lat us [avg]": "io_lat_us_avg",
+    "io lat us [max]": "io_lat_us_max",
+}
+
+# metric name, True when higher is better
+COMPARED_METRICS = [
+    ("mib_per_sec", True),
+    ("iops", True),
+    ("entries_per_sec", True),
+    ("io_lat_us_avg", False),
+    ("ent_lat_us_avg", False),
+]
+
+
+def elbencho_result_args(result_file):
+    """
+    This function returns the elbencho options writing the results to result_file
+
+    Parameters:
+        result_file(str): .json or .csv file, the format follows the extension
+    """
+    option = "--csvfile" if result_file.endswith(".csv") else "--jsonfile"
+    return f"{option} {result_file} --lat --lathisto"
+
+
+def to_number(value):
+    """
+    This function converts an elbencho result value to int or float, other values are kept
+    """
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+def _phase_metrics(row):
+    """
+    This function maps one elbencho result row to typed phase metrics
+    """
+    normalized = {" ".join(str(k).lower().split()): v for k, v in row.items()}
+    metrics = {}
+    for column, name in ELBENCHO_COLUMNS.items():
+        if column in normalized and normalized[column] not in ("", None):
+            metrics[name] = to_number(normalized[column])
+    histograms = {k: v for k, v in normalized.items() if "histo" in k}
+    if histograms:
+        metrics["latency_histograms"] = histograms
+    threads = metrics.get("threads") or 0
+    hosts = metrics.get("hosts") or 1
+    if threads and isinstance(metrics.get("mib_per_sec"), (int, float)):
+        metrics["mib_per_sec_per_thread"] = metrics["mib_per_sec"] / (threads * hosts)
+    if threads and isinstance(metrics.get("iops"), (int, float)):
+        metrics["iops_per_thread"] = metrics["iops"] / (threads * hosts)
+    return metrics
+
+
+def _read_json_rows(text):
+    """
+    This function reads the json objects of an elbencho result file
+
+    elbencho appends one object per phase, so the file is a sequence of
+    objects rather than a single json document.
+    """
+    decoder = json.JSONDecoder()
+    rows = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        obj, end = decoder.raw_decode(text, pos)
+        rows.extend(obj if isinstance(obj, list) else [obj])
+        pos = end
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+    return rows
+
+
+def parse_elbencho_results(result_file):
+    """
+    This function parses an elbencho --jsonfile or --csvfile result file
+
+    Parameters:
+        result_file(str): result file written by elbencho
+
+    Returns:
+        list of phase metrics dicts, in the order elbencho ran the phases
+    """
+    with open(result_file, "r") as fp:
+        if result_file.endswith(".csv"):
+            reader = csv.DictReader(fp)
+            # appended runs repeat the header line
+            rows = [
+                row
+                for row in reader
+                if row.get(reader.fieldnames[0]) != reader.fieldnames[0]
+            ]
+        else:
+            rows = _read_json_rows(fp.read())
+    phases = [_phase_metrics(row) for row in rows]
+    log.info(f"parsed {len(phases)} elbencho phase(s) from {result_file}")
+    return phases
+
+
+def summarize_phases(phases):
+    """
+    This function returns the totals of the write phases, keyed like the old
+    stdout metrics, for callers adding up the data written
+    """
+    writes = [each for each in phases if str(each.get("phase", "")).upper() == "WRITE"]
+    return {
+        "Throughput": sum(each.get("mib_per_sec", 0) for each in writes),
+        "IOPS": sum(each.get("iops", 0) for each in writes),
+        "Total Data Written (MiB)": sum(each.get("mib", 0) for each in writes),
+    }
+
+
+class ElbenchoRunHistory(object):
+    """
+    This class keeps elbencho runs in a json lines file, one run per line
+
+    A run holds its label (e.g. zone and workload), the build it ran
+    against, its start and end time and the parsed phases.
+    """
+
+    def __init__(self, fname=ELBENCHO_HISTORY_FILE):
+        self.fname = fname
+
+    def append(self, label, phases, build=None, started=None, **extra):
+        """
+        This function records a run and returns it
+        """
+        run = dict(
+            {
+                "run_id": uuid.uuid4().hex,
+                "label": label,
+                "build": build,
+                "started": started or time.time(),
+                "ended": time.time(),
+                "phases": phases,
+            },
+            **extra,
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(self.fname)), exist_ok=True)
+        with open(self.fname, "a") as fp:
+            fp.write(json.dumps(run, default=str) + "\n")
+        return run
+
+    def runs(self, label=None, since=None, until=None):
+        """
+        This function returns the recorded runs, optionally filtered by label and time
+        """
+        if not os.path.exists(self.fname):
+            return []
+        runs = []
+        with open(self.fname, "r") as fp:
+            for line in fp:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if label is not None and run["label"] != label:
+                    continue
+                if since is not None and run["started"] < since:
+                    continue
+                if until is not None and run["started"] > until:
+                    continue
+                runs.append(run)
+        return runs
+
+    def baseline(self, run, baseline_build=None):
+        """
+        This function returns the run to compare run against
+
+        The baseline is the latest run with the same label on baseline_build,
+        or on any other build than run's when baseline_build is not given.
+        """
+        for candidate in reversed(self.runs(run["label"], until=run["started"])):
+            if candidate["run_id"] == run["run_id"]:
+                continue
+            if baseline_build is not None:
+                if candidate["build"] == baseline_build:
+                    return candidate
+            elif candidate["build"] != run["build"]:
+                return candidate
+        return None
+
+
+def compare_runs(
+    baseline,
+    current,
+    throughput_tolerance=THROUGHPUT_TOLERANCE,
+    latency_tolerance=LATENCY_TOLERANCE,
+):
+    """
+    This function compares the phases of a run against the same phases of a baseline run
+
+    Returns:
+        list of {phase, metric, baseline, current, change, regression}, change
+        is the relative difference, positive when the metric went up
+    """
+    baseline_phases = {each.get("phase"): each for each in baseline["phases"]}
+    comparison = []
+    for phase in current["phases"]:
+        base = baseline_phases.get(phase.get("phase"))
+        if base is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old, new = base.get(metric), phase.get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)):
+                continue
+            if not old:
+                continue
+            change = (new - old) / old
+            if higher_is_better:
+                regression = change < -throughput_tolerance
+            else:
+                regression = change > latency_tolerance
+            comparison.append(
+                {
+                    "phase": phase.get("phase"),
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": change,
+                    "regression": regression,
+                }
+            )
+    return comparison
+
+
+def log_comparison(label, baseline, comparison):
+    """
+    This function logs a comparison table and returns the regressions in it
+    """
+    log.info(
+        f"elbencho run '{label}' against baseline build {baseline['build']} "
+        f"({time.ctime(baseline['started'])}):"
+    )
+    for each in comparison:
+        flag = "REGRESSION" if each["regression"] else ""
+        log.info(
+            f"{str(each['phase']):<8} {each['metric']:<18} {each['baseline']:>12.2f} "
+            f"{each['current']:>12.2f} {each['change'] * 100:>+8.1f}% {flag}"
+        )
+    return [each for each in comparison if each["regression"]]
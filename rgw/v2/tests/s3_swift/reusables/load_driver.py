@@ -0,0 +1,358 @@
+"""
+Concurrent object load driver
+
+Drives a put/get/delete mix against a bucket from a pool of worker threads or
+processes, optionally paced to a target ops/sec, and reports per operation
+latency percentiles. Uploads follow upload_object/upload_mutipart_object:
+objects are generated from a seed (see manage_data.virtual_io_generator),
+uploaded with a single PUT or as a multipart upload above the multipart
+threshold, and recorded in io_info together with the deletes, so
+read_io_info verifies the surviving objects afterwards.
+
+config, under test_ops:
+
+    load_driver:
+      workers: 8              # per bucket
+      worker_type: thread     # thread or process
+      ops: 1000               # operations per bucket, objects_count by default
+      ops_per_sec: 200        # per bucket, 0 for unpaced
+      mix:                    # relative weights
+        put: 70
+        get: 20
+        delete: 10
+      multipart_threshold: 64 # MB, uploads at or above it are multipart
+      seed: 1234              # fixes the operation plan and the object data
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import v2.utils.utils as utils
+from boto3.s3.transfer import TransferConfig
+from v2.lib import manage_data
+from v2.lib.exceptions import TestExecError
+from v2.lib.read_io_info import stream_md5
+from v2.lib.s3.auth import CONNECTIONS, MAX_POOL_CONNECTIONS
+from v2.lib.s3.write_io_info import BasicIOInfoStructure, KeyIoInfo
+
+log = logging.getLogger()
+
+LOAD_WORKERS = 8
+LOAD_OPS_MIX = {"put": 100, "get": 0, "delete": 0}
+LOAD_PERCENTILES = [50, 90, 99]
+
+
+class RateLimiter(object):
+    """
+    Paces callers of wait() to ops_per_sec in total, unpaced if ops_per_sec is 0
+
+    Every call reserves the next free slot on a fixed schedule, so a slow
+    operation does not lower the offered rate of the other workers.
+    """
+
+    def __init__(self, ops_per_sec):
+        self.interval = 1.0 / ops_per_sec if ops_per_sec else 0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(self.next_slot, now)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def percentile(sorted_values, pct):
+    """
+    This function returns the nearest-rank percentile of sorted values
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def plan_ops(bucket_name, sizes, ops, mix, workers, seed):
+    """
+    This function plans the operations of every worker of a bucket
+
+    Each worker gets its own keys: a get or delete always targets a key the
+    same worker put earlier and not deleted yet, so the plan holds however
+    the workers interleave. A get or delete with no live key becomes a put.
+    Every key is put once.
+
+    Parameters:
+        bucket_name(str): bucket to load
+        sizes(list): object sizes in bytes, used round robin by the puts
+        ops(int): operations in total
+        mix(dict): relative weights of put, get and delete
+        workers(int): number of workers
+        seed: seed of the plan and of the object data
+
+    Returns:
+        list of operations per worker, an operation is (op, key name, size, data seed)
+    """
+    rng = random.Random(seed)
+    op_names = [name for name in ("put", "get", "delete") if mix.get(name)]
+    weights = [mix[name] for name in op_names]
+    plans = [[] for _ in range(workers)]
+    live_keys = [[] for _ in range(workers)]
+    puts = 0
+    for index in range(ops):
+        worker = index % workers
+        op = rng.choices(op_names, weights)[0]
+        if op != "put" and not live_keys[worker]:
+            op = "put"
+        if op == "put":
+            name = utils.gen_s3_object_name(bucket_name, puts)
+            size = sizes[puts % len(sizes)]
+            plans[worker].append(("put", name, size, rng.getrandbits(64)))
+            live_keys[worker].append((name, size))
+            puts += 1
+        elif op == "get":
+            name, size = rng.choice(live_keys[worker])
+            plans[worker].append(("get", name, size, None))
+        else:
+            name, size = live_keys[worker].pop(rng.randrange(len(live_keys[worker])))
+            plans[worker].append(("delete", name, size, None))
+    return plans
+
+
+def _init_worker_process():
+    # connections inherited through fork must not be shared with the parent
+    CONNECTIONS.session = None
+    CONNECTIONS.clear()
+
+
+def run_worker(
+    conn_info, bucket_name, plan, ops_per_sec, multipart_threshold, part_size
+):
+    """
+    This function runs the planned operations of one worker in order
+
+    Parameters:
+        conn_info(dict): access_key, secret_key, endpoint_url and max_pool_connections
+        bucket_name(str): bucket to load
+        plan(list): operations from plan_ops
+        ops_per_sec(float): target rate of this worker, 0 for unpaced
+        multipart_threshold(int): size in bytes from which uploads are multipart
+        part_size(int): multipart part size in bytes
+
+    Returns:
+        list of results, one dict per operation
+    """
+    client = CONNECTIONS.get("client", "s3", **conn_info)
+    transfer_config = TransferConfig(
+        multipart_threshold=multipart_threshold,
+        multipart_chunksize=part_size,
+        use_threads=False,
+    )
+    limiter = RateLimiter(ops_per_sec)
+    md5s = {}
+    results = []
+    for op, name, size, seed in plan:
+        limiter.wait()
+        result = {"op": op, "name": name, "size": size, "error": None}
+        started = time.perf_counter()
+        try:
+            if op == "put":
+                data_info = manage_data.virtual_io_generator(size, seed=seed)
+                if size >= multipart_threshold:
+                    result["upload_type"] = "multipart"
+                    client.upload_fileobj(
+                        data_info["body"], bucket_name, name, Config=transfer_config
+                    )
+                else:
+                    result["upload_type"] = "normal"
+                    client.put_object(
+                        Bucket=bucket_name, Key=name, Body=data_info["body"]
+                    )
+                md5s[name] = result["md5"] = data_info["md5"]
+                result["seed"] = seed
+            elif op == "get":
+                response = client.get_object(Bucket=bucket_name, Key=name)
+                md5, nbytes = stream_md5(response["Body"])
+                if md5 != md5s[name] or nbytes != size:
+                    raise TestExecError(f"md5 mismatch on get of {name}")
+            else:
+                client.delete_object(Bucket=bucket_name, Key=name)
+        except Exception as e:
+            result["error"] = str(e)
+        result["latency"] = time.perf_counter() - started
+        results.append(result)
+    return results
+
+
+class LoadDriver(object):
+    """
+    This class runs a load_driver config against one bucket of a user
+    """
+
+    def __init__(self, auth, user_info, bucket_name, config):
+        """
+        Parameters:
+            auth: Auth object of the user
+            user_info(dict): user owning the bucket
+            bucket_name(str): bucket to load
+            config: test Config, the load is read from test_ops['load_driver']
+        """
+        load_config = config.test_ops["load_driver"]
+        self.user_info = user_info
+        self.bucket_name = bucket_name
+        self.workers = max(1, int(load_config.get("workers", LOAD_WORKERS)))
+        self.worker_type = load_config.get("worker_type", "thread")
+        self.ops = int(load_config.get("ops") or config.objects_count)
+        self.ops_per_sec = float(load_config.get("ops_per_sec", 0))
+        self.mix = load_config.get("mix", LOAD_OPS_MIX)
+        if config.test_ops.get("upload_type") == "multipart":
+            # same as upload_mutipart_object, every object is a multipart upload
+            self.multipart_threshold = 1
+        else:
+            self.multipart_threshold = (
+                int(load_config.get("multipart_threshold", 64)) * 1024 * 1024
+            )
+        self.seed = load_config.get("seed", manage_data.new_seed())
+        self.sizes = list(config.mapped_sizes.values())
+        self.conn_info = {
+            "access_key": auth.access_key,
+            "secret_key": auth.secret_key,
+            "endpoint_url": auth.endpoint_url,
+            "max_pool_connections": max(self.workers, MAX_POOL_CONNECTIONS),
+        }
+        self.part_size = int(getattr(config, "split_size", 5)) * 1024 * 1024
+
+    def run(self):
+        """
+        This function runs the load, records it in io_info and reports latencies
+
+        Returns:
+            summary dict, see summarize()
+        """
+        log.info(
+            f"load on bucket {self.bucket_name}: {self.ops} ops, mix {self.mix}, "
+            f"{self.workers} {self.worker_type} workers, "
+            f"{self.ops_per_sec or 'unpaced'} ops/sec, seed {self.seed}"
+        )
+        plans = plan_ops(
+            self.bucket_name, self.sizes, self.ops, self.mix, self.workers, self.seed
+        )
+        if self.worker_type == "process":
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker_process
+            )
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.workers)
+        started = time.perf_counter()
+        with executor:
+            futures = [
+                executor.submit(
+                    run_worker,
+                    self.conn_info,
+                    self.bucket_name,
+                    plan,
+                    self.ops_per_sec / self.workers,
+                    self.multipart_threshold,
+                    self.part_size,
+                )
+                for plan in plans
+            ]
+            results = [each for future in futures for each in future.result()]
+        elapsed = time.perf_counter() - started
+        self.record_io_info(results)
+        summary = self.summarize(results, elapsed)
+        self.report(summary)
+        failures = [each for each in results if each["error"] is not None]
+        if failures:
+            for each in failures[:10]:
+                log.error(f"{each['op']} {each['name']} failed: {each['error']}")
+            raise TestExecError(
+                f"{len(failures)} of {len(results)} load operations failed "
+                f"on bucket {self.bucket_name}"
+            )
+        return summary
+
+    def record_io_info(self, results):
+        """
+        This function adds the uploaded keys to io_info and marks the deleted ones
+        """
+        basic_io_structure = BasicIOInfoStructure()
+        write_key_io_info = KeyIoInfo()
+        deleted = []
+        for each in results:
+            if each["error"] is not None:
+                continue
+            if each["op"] == "put":
+                key_info = basic_io_structure.key(
+                    **{
+                        "name": each["name"],
+                        "size": each["size"],
+                        "md5_local": each["md5"],
+                        "upload_type": each["upload_type"],
+                        "seed": each["seed"],
+                    }
+                )
+                write_key_io_info.add_keys_info(
+                    self.user_info["access_key"], self.bucket_name, key_info
+                )
+            elif each["op"] == "delete":
+                deleted.append(each["name"])
+        if deleted:
+            write_key_io_info.set_keys_deleted(self.bucket_name, deleted)
+
+    @staticmethod
+    def summarize(results, elapsed):
+        """
+        This function computes count, errors, throughput and latency percentiles per operation
+
+        Returns:
+            dict of operation name to its stats, latencies in milliseconds
+        """
+        summary = {}
+        for op in ("put", "get", "delete"):
+            op_results = [each for each in results if each["op"] == op]
+            if not op_results:
+                continue
+            latencies = sorted(each["latency"] * 1000 for each in op_results)
+            nbytes = sum(each["size"] for each in op_results if op != "delete")
+            stats = {
+                "count": len(op_results),
+                "errors": sum(1 for each in op_results if each["error"] is not None),
+                "ops_per_sec": len(op_results) / max(elapsed, 1e-6),
+                "mib_per_sec": nbytes / (1024 * 1024) / max(elapsed, 1e-6),
+                "max": latencies[-1],
+            }
+            for pct in LOAD_PERCENTILES:
+                stats[f"p{pct}"] = percentile(latencies, pct)
+            summary[op] = stats
+        summary["elapsed"] = elapsed
+        return summary
+
+    def report(self, summary):
+        log.info(
+            f"load summary of bucket {self.bucket_name} ({summary['elapsed']:.2f}s), "
+            "latencies in ms:"
+        )
+        pct_header = " ".join(f"{'p' + str(pct):>8}" for pct in LOAD_PERCENTILES)
+        log.info(
+            f"{'op':<8} {'count':>8} {'errors':>8} {'ops/s':>8} {'MiB/s':>8} "
+            f"{pct_header} {'max':>8}"
+        )
+        for op in ("put", "get", "delete"):
+            stats = summary.get(op)
+            if stats is None:
+                continue
+            pcts = " ".join(
+                f"{stats['p' + str(pct)]:>8.1f}" for pct in LOAD_PERCENTILES
+            )
+            log.info(
+                f"{op:<8} {stats['count']:>8} {stats['errors']:>8} "
+                f"{stats['ops_per_sec']:>8.1f} {stats['mib_per_sec']:>8.2f} "
+                f"{pcts} {stats['max']:>8.1f}"
+            )
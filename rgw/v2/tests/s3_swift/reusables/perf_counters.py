@@ -0,0 +1,412 @@
+"""
+RGW perf counter sampler
+
+Collects 'perf dump' of every RGW daemon of a set of hosts, local and over
+ssh, at a fixed interval in a background thread for the duration of a test.
+Every host is sampled with one command which dumps all the rgw admin
+sockets found on it. The 'rgw' section and the 'data-sync-from-*' sections
+are kept, as one json line per daemon and sample in a time series file.
+
+From consecutive samples the counters turn into per second rates, the
+latency counters (put_initial_lat, get_initial_lat, ...) into the average
+latency of every interval, and cache_hit/cache_miss into a hit ratio. perf
+dump only holds the sum and count of a latency, so percentiles are over the
+interval averages, not over single requests.
+
+usage:
+
+    sampler = PerfCounterSampler({"primary": None, "secondary": ssh_con})
+    sampler.start()
+    ... workload ...
+    sampler.stop()
+    sampler.log_summary()
+    sampler.assert_latency_not_regressed("put_initial_lat", baseline_summary)
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import v2.utils.utils as utils
+from v2.lib.exceptions import TestExecError
+from v2.utils.log import LOG_DIR
+
+log = logging.getLogger()
+
+# perf dump sections sampled, by name or name prefix
+PERF_SECTIONS = ("rgw",)
+PERF_SECTION_PREFIXES = ("data-sync-from-",)
+# a latency regresses when it is worse than the baseline by more than this fraction
+PERF_LATENCY_TOLERANCE = 0.20
+# separates the perf dumps of the daemons of a host in the command output
+SOCKET_MARKER = "### asok "
+
+
+def flatten_perf_dump(dump):
+    """
+    This function keeps the sampled sections of a perf dump as flat counters
+
+    Returns:
+        dict of 'section.counter' to a number, or to [sum, avgcount] for
+        latency counters
+    """
+    counters = {}
+    for section, values in dump.items():
+        if section not in PERF_SECTIONS and not section.startswith(
+            PERF_SECTION_PREFIXES
+        ):
+            continue
+        for name, value in values.items():
+            key = f"{section}.{name}"
+            if isinstance(value, dict):
+                if "avgtime" in value:
+                    counters[key] = [value["sum"], value["avgcount"]]
+                elif "avgcount" in value and "sum" in value:
+                    # averaged amounts like fetch_bytes, rates of both make sense
+                    counters[key] = value["sum"]
+                    counters[f"{key}_count"] = value["avgcount"]
+            elif isinstance(value, (int, float)):
+                counters[key] = value
+    return counters
+
+
+def dump_host(ssh_con=None):
+    """
+    This function dumps the perf counters of every rgw daemon of a host in one command
+
+    Returns:
+        dict of admin socket name to its flattened counters
+    """
+    # the sockets of cephadm daemons are under /var/run/ceph/<fsid>, the fsid
+    # of a remote site differs, so the glob runs as root instead of
+    # find_admin_socket and chmod -R 777 /var/run/ceph
+    cmd = (
+        "sudo sh -c 'for asok in /var/run/ceph/*/ceph-client.rgw.*.asok "
+        '/var/run/ceph/ceph-client.rgw.*.asok; do [ -S "$asok" ] || continue; '
+        f'echo "{SOCKET_MARKER}$asok"; ceph --admin-daemon "$asok" perf dump; done\''
+    )
+    if ssh_con is None:
+        out = utils.exec_shell_cmd(cmd)
+        if out is False:
+            raise TestExecError(f"perf dump failed: {cmd}")
+    else:
+        stdin, stdout, stderr = ssh_con.exec_command(cmd)
+        out = stdout.read().decode("utf-8", errors="replace")
+    daemons = {}
+    for part in out.split(SOCKET_MARKER)[1:]:
+        asok, _, body = part.partition("\n")
+        start = body.find("{")
+        if start < 0:
+            log.warning(f"no perf dump from {asok}: {body[:200]}")
+            continue
+        try:
+            dump = json.loads(body[start:])
+        except json.JSONDecodeError as e:
+            log.warning(f"bad perf dump from {asok}: {e}")
+            continue
+        daemons[os.path.basename(asok)] = flatten_perf_dump(dump)
+    return daemons
+
+
+def percentile(values, pct):
+    """
+    This function returns the nearest rank percentile of values
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+class PerfCounterSampler(object):
+    """
+    This class samples the perf counters of the rgw daemons of a set of hosts
+    """
+
+    def __init__(self, hosts, interval=10, output=None):
+        """
+        Parameters:
+            hosts(dict): host or zone name to ssh connection, None for this node
+            interval(int): seconds between samples
+            output(str): time series file, json lines, under LOG_DIR by default
+        """
+        self.hosts = hosts
+        self.interval = interval
+        self.output = output or os.path.join(
+            LOG_DIR, f"perf_counters_{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+        )
+        # (host, daemon) to list of (time, counters)
+        self.samples = {}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        """
+        This function takes one sample of every daemon and appends it to the time series file
+        """
+        lines = []
+        for host, ssh_con in self.hosts.items():
+            try:
+                daemons = dump_host(ssh_con)
+            except Exception as e:
+                # a failed sample leaves a gap, the sampling goes on
+                log.warning(f"perf dump of {host} failed: {e}")
+                continue
+            now = time.time()
+            with self.lock:
+                for daemon, counters in daemons.items():
+                    self.samples.setdefault((host, daemon), []).append((now, counters))
+                    lines.append(
+                        json.dumps(
+                            {
+                                "time": now,
+                                "host": host,
+                                "daemon": daemon,
+                                "counters": counters,
+                            },
+                            separators=(",", ":"),
+                        )
+                    )
+        if lines:
+            with open(self.output, "a") as fp:
+                fp.write("\n".join(lines) + "\n")
+
+    def run(self):
+        while not self.stop_event.is_set():
+            started = time.monotonic()
+            self.sample()
+            self.stop_event.wait(max(0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        log.info(
+            f"sampling rgw perf counters of {', '.join(self.hosts)} every "
+            f"{self.interval}s into {self.output}"
+        )
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.stop_event.set()
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def intervals(self, counter):
+        """
+        This function returns the change of a counter between consecutive samples of every daemon
+
+        A daemon restart resets its counters, an interval going backwards is skipped.
+
+        Returns:
+            list of (elapsed seconds, delta), delta being (sum, count) for averaged counters
+        """
+        key = counter if "." in counter else f"rgw.{counter}"
+        deltas = []
+        with self.lock:
+            series = list(self.samples.values())
+        for samples in series:
+            for (t0, before), (t1, after) in zip(samples, samples[1:]):
+                if key not in before or key not in after or t1 <= t0:
+                    continue
+                old, new = before[key], after[key]
+                if isinstance(new, list):
+                    delta = (new[0] - old[0], new[1] - old[1])
+                    if delta[1] < 0:
+                        continue
+                else:
+                    delta = new - old
+                    if delta < 0:
+                        continue
+                deltas.append((t1 - t0, delta))
+        return deltas
+
+    def rate(self, counter):
+        """
+        This function returns the mean per second rate of a counter, summed over the daemons
+        """
+        deltas = self.intervals(counter)
+        if not deltas:
+            return None
+        return sum(delta for _, delta in deltas) / (
+            sum(elapsed for elapsed, _ in deltas) / self.daemon_count()
+        )
+
+    def latencies(self, counter):
+        """
+        This function returns the average latency in seconds of every interval with requests
+        """
+        return [
+            delta[0] / delta[1]
+            for _, delta in self.intervals(counter)
+            if isinstance(delta, tuple) and delta[1] > 0
+        ]
+
+    def latency(self, counter, pct=None):
+        """
+        This function returns the mean latency of a counter, or the pct percentile of its interval averages
+        """
+        if pct is not None:
+            values = self.latencies(counter)
+            return percentile(values, pct) if values else None
+        deltas = [delta for _, delta in self.intervals(counter)]
+        count = sum(delta[1] for delta in deltas if isinstance(delta, tuple))
+        if not count:
+            return None
+        return sum(delta[0] for delta in deltas if isinstance(delta, tuple)) / count
+
+    def cache_hit_ratio(self):
+        hits = sum(delta for _, delta in self.intervals("cache_hit"))
+        misses = sum(delta for _, delta in self.intervals("cache_miss"))
+        if not hits + misses:
+            return None
+        return hits / (hits + misses)
+
+    def daemon_count(self):
+        with self.lock:
+            return max(1, len(self.samples))
+
+    def counters(self):
+        """
+        This function returns the names of all counters seen in the samples
+        """
+        names = set()
+        with self.lock:
+            for samples in self.samples.values():
+                for _, counters in samples:
+                    names.update(counters)
+        return names
+
+    def summary(self):
+        """
+        This function summarises the sampling
+
+        Returns:
+            dict with the rate of every plain counter that moved, and the
+            mean, p50, p99 and max of every latency counter with requests
+        """
+        summary = {
+            "daemons": sorted(f"{host}/{daemon}" for host, daemon in self.samples),
+            "rates": {},
+            "latencies": {},
+            "cache_hit_ratio": self.cache_hit_ratio(),
+        }
+        for name in sorted(self.counters()):
+            values = self.latencies(name)
+            if values:
+                summary["latencies"][name] = {
+                    "mean": self.latency(name),
+                    "p50": percentile(values, 50),
+                    "p99": percentile(values, 99),
+                    "max": max(values),
+                }
+                continue
+            rate = self.rate(name)
+            if rate:
+                summary["rates"][name] = rate
+        return summary
+
+    def log_summary(self):
+        summary = self.summary()
+        log.info(f"perf counters of {len(summary['daemons'])} rgw daemon(s)")
+        for name, rate in summary["rates"].items():
+            log.info(f"  {name}: {rate:.2f}/s")
+        for name, each in summary["latencies"].items():
+            log.info(
+                f"  {name}: mean {each['mean'] * 1000:.2f}ms, p50 "
+                f"{each['p50'] * 1000:.2f}ms, p99 {each['p99'] * 1000:.2f}ms, "
+                f"max {each['max'] * 1000:.2f}ms"
+            )
+        if summary["cache_hit_ratio"] is not None:
+            log.info(f"  cache hit ratio: {summary['cache_hit_ratio'] * 100:.1f}%")
+        return summary
+
+    def write_summary(self, fname=None):
+        """
+        This function writes the summary next to the time series file, to serve as a later baseline
+        """
+        fname = fname or os.path.splitext(self.output)[0] + ".summary.json"
+        summary = self.summary()
+        with open(fname, "w") as fp:
+            json.dump(summary, fp, indent=2)
+        log.info(f"perf counter summary written to {fname}")
+        return summary
+
+    def assert_counters_available(self, counters):
+        """
+        This function checks that every daemon reported the counters
+
+        Raises:
+            TestExecError: when a daemon lacks a counter, or no daemon was sampled
+        """
+        with self.lock:
+            latest = {each: samples[-1][1] for each, samples in self.samples.items()}
+        if not latest:
+            raise TestExecError("no rgw perf counters sampled")
+        missing = []
+        for (host, daemon), values in latest.items():
+            for counter in counters:
+                key = counter if "." in counter else f"rgw.{counter}"
+                if key not in values:
+                    missing.append(f"{host}/{daemon}: {key}")
+        if missing:
+            raise TestExecError(f"perf counters missing: {missing}")
+        log.info(
+            f"{len(counters)} perf counter(s) available on {len(latest)} daemon(s)"
+        )
+
+    def assert_latency_not_regressed(
+        self, counter, baseline, pct=99, tolerance=PERF_LATENCY_TOLERANCE
+    ):
+        """
+        This function checks a latency percentile against a baseline
+
+        Parameters:
+            counter(str): latency counter, e.g. put_initial_lat
+            baseline: latency in seconds, or a summary of an earlier run
+            pct(int): percentile of the interval averages compared
+            tolerance(float): allowed growth, as a fraction of the baseline
+
+        Raises:
+            TestExecError: when the latency grew by more than tolerance, or
+                there is a baseline but no interval with requests to compare
+        """
+        key = counter if "." in counter else f"rgw.{counter}"
+        if isinstance(baseline, dict):
+            baseline = baseline["latencies"].get(key, {}).get(f"p{pct}")
+        if baseline is None:
+            log.warning(f"{key} p{pct}: no baseline to compare with")
+            return
+        current = self.latency(key, pct)
+        if current is None:
+            raise TestExecError(
+                f"{key} p{pct}: no sampled interval had requests, nothing to "
+                f"compare with the baseline {baseline * 1000:.2f}ms"
+            )
+        change = (current - baseline) / baseline if baseline else 0
+        log.info(
+            f"{key} p{pct}: {baseline * 1000:.2f}ms -> {current * 1000:.2f}ms "
+            f"({change * 100:+.1f}%)"
+        )
+        if change > tolerance:
+            raise TestExecError(
+                f"{key} p{pct} regressed by {change * 100:.1f}%, more than "
+                f"{tolerance * 100:.0f}%"
+            )
+
+
+def load_summary(fname):
+    """
+    This function reads a summary written by PerfCounterSampler.write_summary
+    """
+    with open(fname, "r") as fp:
+        return json.load(fp)
@@ -4,6 +4,7 @@ import os
 import random
 import re
 import subprocess
+import tempfile
 import threading
 import time
 
@@ -19,6 +20,7 @@ from v2.lib.s3.write_io_info import (
     KeyIoInfo,
 )
 from v2.tests.s3_swift import reusable
+from v2.tests.s3_swift.reusables import elbencho_metrics
 from v2.tests.s3_swift.reusables import rgw_accounts as accounts
 
 log = logging.getLogger()
@@ -477,30 +479,78 @@ def elbench_install_configure():
             log.error(f"Failed to install Elbencho on remote site: {e}")
 
 
+def exec_elbencho(elbencho_args, label):
+    """
+    This function runs elbencho with its results written to a file and records them
+
+    The parsed phases are appended to the elbencho run history and compared
+    against the latest run with the same label on another build, regressions
+    are logged.
+
+    Parameters:
+        elbencho_args(str): elbencho options and bucket paths
+        label(str): workload label, runs are compared by label
+
+    Returns:
+        list of phase metrics, False if elbencho failed
+    """
+    fd, result_file = tempfile.mkstemp(prefix="elbencho_", suffix=".json")
+    os.close(fd)
+    started = time.time()
+    try:
+        output = utils.exec_shell_cmd(
+            f"time /usr/local/bin/elbencho "
+            f"{elbencho_metrics.elbencho_result_args(result_file)} {elbencho_args}"
+        )
+        if output is False:
+            return False
+        phases = elbencho_metrics.parse_elbencho_results(result_file)
+    finally:
+        os.unlink(result_file)
+    try:
+        build = " ".join(utils.get_ceph_version())
+    except Exception:
+        build = None
+    history = elbencho_metrics.ElbenchoRunHistory()
+    run = history.append(label, phases, build=build, started=started)
+    baseline = history.baseline(run)
+    if baseline is not None:
+        regressions = elbencho_metrics.log_comparison(
+            label, baseline, elbencho_metrics.compare_runs(baseline, run)
+        )
+        for each in regressions:
+            log.warning(
+                f"[{label}] {each['phase']} {each['metric']} regressed "
+                f"{each['change'] * 100:+.1f}% against build {baseline['build']}"
+            )
+    return phases
+
+
 def run_elbencho(
     endpoint, zone_name, num_objects, buckets, each_user, threads, object_size
 ):
-    """Runs Elbencho with specified parameters."""
+    """Runs Elbencho with specified parameters, returns the parsed phase metrics."""
     log.info(
         f"[{zone_name}] Running Elbencho workload for {num_objects} objects on buckets {buckets}"
     )
     bucket_prefix = "-".join(buckets[0].split("-")[:-1]) + "-"
     num_buckets = len(buckets)
     bucket_format = f"{bucket_prefix}{{0..{num_buckets-1}}}"
-    elbencho_cmd = (
-        f"time /usr/local/bin/elbencho --s3endpoints {endpoint} --s3key {each_user['access_key']} --s3secret {each_user['secret_key']} "
+    elbencho_args = (
+        f"--s3endpoints {endpoint} --s3key {each_user['access_key']} --s3secret {each_user['secret_key']} "
         f"-w -t {threads} -n0 -N {num_objects} -s {object_size} {bucket_format}"
     )
-    output = utils.exec_shell_cmd(elbencho_cmd)
-    if output is False:
+    phases = exec_elbencho(elbencho_args, f"{zone_name}-put-{object_size}")
+    if phases is False:
         log.error(f"Elbencho execution failed on {zone_name}")
         return
-    metrics = parse_elbencho_output(output)
-    log.info(f"[{zone_name}] Performance metrics: {metrics}")
+    for phase in phases:
+        log.info(f"[{zone_name}] Performance metrics: {phase}")
+    return phases
 
 
 def parse_elbencho_output(output):
-    """Parses Elbencho output and extracts performance metrics."""
+    """Parses the result table of Elbencho's console output, prefer exec_elbencho."""
     log.info("Parsing Elbencho output")
     if not isinstance(output, str):
         log.error("Invalid output received from Elbencho command.")
@@ -509,11 +559,13 @@ def parse_elbencho_output(output):
     lines = output.split("\n")
     for line in lines:
         if "Throughput MiB/s" in line:
-            metrics["Throughput"] = line.split()[-1]
+            metrics["Throughput"] = elbencho_metrics.to_number(line.split()[-1])
         elif "IOPS" in line:
-            metrics["IOPS"] = line.split()[-1]
+            metrics["IOPS"] = elbencho_metrics.to_number(line.split()[-1])
         elif "Total MiB" in line:
-            metrics["Total Data Written (MiB)"] = line.split()[-1]
+            metrics["Total Data Written (MiB)"] = elbencho_metrics.to_number(
+                line.split()[-1]
+            )
     return metrics
 
 
@@ -1,14 +1,194 @@
 import datetime
+import hashlib
+import io
 import logging
-import random
-import string
+import os
+import time
 
-import pandas as pd
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 log = logging.getLogger()
 
+# rows generated per chunk, one chunk is one parquet row group or one csv upload chunk
+S3SELECT_CHUNK_ROWS = 100000
+# rows of generated data shown in the logs
+LOG_PREVIEW_ROWS = 5
+STRING_COLUMN_CHARS = 20
+STRING_ALPHABET = np.frombuffer(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 ", dtype=np.uint8
+)
+COLUMN_TYPES = {
+    "int": pa.int64(),
+    "float": pa.float64(),
+    "string": pa.string(),
+    "timestamp": pa.string(),
+}
+
+
+def new_dataset_seed():
+    """
+    This function returns a random seed for a generated dataset
+    """
+    return int(np.random.SeedSequence().entropy % (2 ** 63))
+
+
+def _string_column(rng, rows):
+    codes = rng.integers(0, len(STRING_ALPHABET), size=rows * STRING_COLUMN_CHARS)
+    data = STRING_ALPHABET[codes].tobytes()
+    offsets = np.arange(
+        0, rows * STRING_COLUMN_CHARS + 1, STRING_COLUMN_CHARS, dtype=np.int32
+    )
+    return pa.StringArray.from_buffers(rows, pa.py_buffer(offsets), pa.py_buffer(data))
+
+
+def _timestamp_column(rng, rows, start):
+    # iso format strings within 1000 days from start, like datetime.isoformat()
+    offsets_us = rng.integers(0, 1000 * 24 * 3600 * 10 ** 6, size=rows)
+    values = np.datetime64(start, "us") + offsets_us.astype("timedelta64[us]")
+    isoformat = pa.array(np.datetime_as_string(values, unit="us"))
+    return pc.binary_join_element_wise(isoformat, "+00:00", "")
+
+
+def generate_chunk(seed, chunk_index, rows, column_data_types, start=None):
+    """
+    This function generates one chunk of a dataset as a pyarrow table
+
+    Every chunk has its own generator derived from (seed, chunk_index), so a
+    dataset is reproducible from its seed chunk by chunk.
+
+    Parameters:
+        seed(int): dataset seed
+        chunk_index(int): index of the chunk in the dataset
+        rows(int): rows in the chunk
+        column_data_types(list): int, float, string or timestamp per column
+        start(datetime): timestamps are generated within 1000 days from start
+
+    Returns:
+        pyarrow Table, columns are named by their index
+    """
+    rng = np.random.default_rng([seed, chunk_index])
+    start = start or datetime.datetime(2025, 1, 1)
+    columns = []
+    for data_type in column_data_types:
+        if data_type == "int":
+            columns.append(
+                pa.array(rng.integers(1, 111111111111, size=rows, endpoint=True))
+            )
+        elif data_type == "float":
+            columns.append(
+                pa.array(rng.uniform(111111111111111.1, 222222222222222.2, size=rows))
+            )
+        elif data_type == "string":
+            columns.append(_string_column(rng, rows))
+        elif data_type == "timestamp":
+            columns.append(_timestamp_column(rng, rows, start))
+        else:
+            raise ValueError(f"unsupported column data type: {data_type}")
+    return pa.Table.from_arrays(
+        columns, names=[str(index) for index in range(len(columns))]
+    )
+
+
+def iter_chunks(row_count, column_data_types, seed, chunk_rows=S3SELECT_CHUNK_ROWS):
+    """
+    This function yields the pyarrow tables of a dataset, chunk_rows rows at a time
+    """
+    for chunk_index, first_row in enumerate(range(0, row_count, chunk_rows)):
+        yield generate_chunk(
+            seed,
+            chunk_index,
+            min(chunk_rows, row_count - first_row),
+            column_data_types,
+        )
+
+
+def chunk_to_csv(table, field_delimiter=",", record_delimiter="\n"):
+    """
+    This function formats a pyarrow table as csv records, without quoting
+
+    Floats are written as str(float) writes them, e.g. 167980180522250.72,
+    as pyarrow's cast would give 1.6798018052225072e+14.
+
+    Returns:
+        bytes, every record is followed by record_delimiter
+    """
+    columns = [
+        pa.array(map(str, column.to_pylist()), pa.string())
+        if pa.types.is_floating(column.type)
+        else pc.cast(column, pa.string())
+        for column in table.columns
+    ]
+    records = pc.binary_join_element_wise(*columns, field_delimiter)
+    records = pc.binary_join_element_wise(records, "", record_delimiter)
+    records = (
+        records.combine_chunks() if isinstance(records, pa.ChunkedArray) else records
+    )
+    offsets = np.frombuffer(records.buffers()[1], dtype=np.int32)
+    first, last = offsets[records.offset], offsets[records.offset + len(records)]
+    return records.buffers()[2].to_pybytes()[first:last]
+
+
+def log_preview(name, table, seed):
+    """
+    This function logs the first rows of a generated dataset
+    """
+    preview = table.slice(0, LOG_PREVIEW_ROWS).to_pylist()
+    log.info(f"{name} generated with seed {seed}, first {len(preview)} rows: {preview}")
+
+
+def iter_csv_chunks(
+    row_count,
+    column_data_types,
+    seed,
+    field_delimiter=",",
+    record_delimiter="\n",
+    chunk_rows=S3SELECT_CHUNK_ROWS,
+):
+    """
+    This function yields a generated csv dataset as bytes, one chunk at a time
+
+    Records are separated by record_delimiter, the last one is not followed by it.
+    """
+    trailer = len(record_delimiter.encode())
+    for chunk_index, table in enumerate(
+        iter_chunks(row_count, column_data_types, seed, chunk_rows)
+    ):
+        if chunk_index == 0:
+            log_preview("csv data", table, seed)
+        data = chunk_to_csv(table, field_delimiter, record_delimiter)
+        if chunk_index * chunk_rows + table.num_rows >= row_count:
+            data = data[:-trailer]
+        yield data
+
+
+class CsvObjectStream(io.RawIOBase):
+    """
+    Readable file object over iter_csv_chunks, uploaded without a local copy
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.buffer = b""
+        self.size = 0
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size is None or size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        self.size += len(data)
+        return data
+
 
 def create_csv_object(
     row_count,
@@ -16,70 +196,180 @@ def create_csv_object(
     column_data_types,
     field_delimiter=",",
     record_delimiter="\n",
+    seed=None,
+):
+    """
+    This function generates a csv dataset in memory, use upload_csv_object for large datasets
+
+    Returns:
+        columns as lists keyed by column index, and the csv string
+    """
+    seed = new_dataset_seed() if seed is None else seed
+    column_data_types = column_data_types[:column_count]
+    table = pa.concat_tables(iter_chunks(row_count, column_data_types, seed))
+    csv_string = b"".join(
+        iter_csv_chunks(
+            row_count, column_data_types, seed, field_delimiter, record_delimiter
+        )
+    ).decode()
+    columns = {index: column.to_pylist() for index, column in enumerate(table.columns)}
+    return columns, csv_string
+
+
+def upload_csv_object(
+    rgw_s3_client,
+    bucket_name,
+    object_name,
+    row_count,
+    column_data_types,
+    seed=None,
+    field_delimiter=",",
+    record_delimiter="\n",
 ):
-    csv_matrix = []
-    for r_index in range(row_count):
-        each_row = []
-        for c_index in range(column_count):
-            data_type = column_data_types[c_index]
-            if data_type == "int":
-                random_val = random.randint(1, 111111111111)
-            if data_type == "float":
-                random_val = random.uniform(111111111111111.1, 222222222222222.2)
-            if data_type == "string":
-                random_val = "".join(
-                    random.choices(string.ascii_letters + string.digits + " ", k=20)
-                )
-            if data_type == "timestamp":
-                current_date = datetime.datetime.now(datetime.timezone.utc)
-                start_date = current_date + datetime.timedelta(days=1000)
-                end_date = current_date + datetime.timedelta(days=1000)
-                random_date = start_date + (end_date - start_date) * random.random()
-                random_val = str(random_date.isoformat())
-            each_row.append(random_val)
-        csv_matrix.append(each_row)
-
-    each_row_strings = []
-    for r_index in range(row_count):
-        row_string = field_delimiter.join(str(x) for x in csv_matrix[r_index])
-        each_row_strings.append(row_string)
-    csv_string = record_delimiter.join(each_row_strings)
-    log.info(f"csv data generated: \n{csv_string}\n")
-    return csv_matrix, csv_string
-
-
-def create_parquet_object(parquet_obj_path, row_count, column_count, column_data_types):
-    dataset_dict = {}
-    for c_index in range(column_count):
-        each_col = []
-        data_type = column_data_types[c_index]
-        for r_index in range(row_count):
-            if data_type == "int":
-                random_val = random.randint(1, 111111111111)
-            if data_type == "float":
-                random_val = random.uniform(111111111111111.1, 222222222222222.2)
-            if data_type == "string":
-                random_val = "".join(
-                    random.choices(string.ascii_letters + string.digits + " ", k=20)
-                )
-            if data_type == "timestamp":
-                current_date = datetime.datetime.now(datetime.timezone.utc)
-                start_date = current_date + datetime.timedelta(days=1000)
-                end_date = current_date + datetime.timedelta(days=1000)
-                random_date = start_date + (end_date - start_date) * random.random()
-                random_val = str(random_date.isoformat())
-            each_col.append(random_val)
-        dataset_dict[c_index] = each_col
-
-    log.info(f"dataset:\n{dataset_dict}")
-
-    df = pd.DataFrame(dataset_dict)
-    table = pa.Table.from_pandas(df, preserve_index=False)
-    obj = pa.BufferOutputStream()
-    pq.write_table(table, obj, compression="snappy")
-    with open(parquet_obj_path, "wb") as fp:
-        fp.write(obj.getvalue().to_pybytes())
-    return dataset_dict
+    """
+    This function streams a generated csv dataset to an object
+
+    Chunks are generated while uploading, large datasets go as a multipart upload.
+
+    Returns:
+        dict with the seed, row count and size of the object
+    """
+    seed = new_dataset_seed() if seed is None else seed
+    stream = CsvObjectStream(
+        iter_csv_chunks(
+            row_count, column_data_types, seed, field_delimiter, record_delimiter
+        )
+    )
+    rgw_s3_client.upload_fileobj(stream, bucket_name, object_name)
+    log.info(
+        f"uploaded csv object {object_name}: {row_count} rows, "
+        f"{stream.size} bytes, seed {seed}"
+    )
+    return {"seed": seed, "rows": row_count, "size": stream.size}
+
+
+def create_parquet_object(
+    parquet_obj_path,
+    row_count,
+    column_count,
+    column_data_types,
+    seed=None,
+    chunk_rows=S3SELECT_CHUNK_ROWS,
+):
+    """
+    This function writes a generated parquet dataset, one row group per chunk
+
+    Returns:
+        dict with the seed, row count and size of the parquet file
+    """
+    seed = new_dataset_seed() if seed is None else seed
+    column_data_types = column_data_types[:column_count]
+    schema = pa.schema(
+        [
+            (str(index), COLUMN_TYPES[data_type])
+            for index, data_type in enumerate(column_data_types)
+        ]
+    )
+    with pq.ParquetWriter(parquet_obj_path, schema, compression="snappy") as writer:
+        for chunk_index, table in enumerate(
+            iter_chunks(row_count, column_data_types, seed, chunk_rows)
+        ):
+            if chunk_index == 0:
+                log_preview("parquet dataset", table, seed)
+            writer.write_table(table)
+    size = os.path.getsize(parquet_obj_path)
+    log.info(f"parquet object {parquet_obj_path}: {row_count} rows, {size} bytes")
+    return {"seed": seed, "rows": row_count, "size": size}
+
+
+def consume_select_stream(payload, max_result_bytes=None):
+    """
+    This function reads a select_object_content event stream as it arrives
+
+    Records are hashed as they come in and at most max_result_bytes of them
+    are kept, so a query returning a large result does not have to fit in
+    memory.
+
+    Parameters:
+        payload: the 'Payload' event stream of the select_object_content response
+        max_result_bytes(int): bytes of records kept, all of them if None
+
+    Returns:
+        dict with the kept records, their md5 and size, the number of records
+        events, time to the first records event and the Stats event
+    """
+    started = time.perf_counter()
+    md5 = hashlib.md5()
+    kept = []
+    kept_bytes = 0
+    info = {
+        "result_bytes": 0,
+        "records_events": 0,
+        "ttfb": None,
+        "stats": {},
+        "truncated": False,
+    }
+    for event in payload:
+        if "Records" in event:
+            records = event["Records"]["Payload"]
+            if info["ttfb"] is None:
+                info["ttfb"] = time.perf_counter() - started
+            info["records_events"] += 1
+            info["result_bytes"] += len(records)
+            md5.update(records)
+            if max_result_bytes is None or kept_bytes < max_result_bytes:
+                if max_result_bytes is not None:
+                    records = records[: max_result_bytes - kept_bytes]
+                kept.append(records)
+                kept_bytes += len(records)
+        if "Progress" in event:
+            log.debug(f"progress: {event['Progress']['Details']}")
+        if "Stats" in event:
+            info["stats"] = event["Stats"]["Details"]
+        if "End" in event:
+            log.debug("End")
+    info["truncated"] = kept_bytes < info["result_bytes"]
+    info["result"] = b"".join(kept).decode("utf-8", errors="replace")
+    info["md5"] = md5.hexdigest()
+    return info
+
+
+def run_s3select_query(
+    rgw_client,
+    bucket_name,
+    object_name,
+    query,
+    input_serialization,
+    output_serialization,
+    max_result_bytes=None,
+):
+    """
+    This function runs a query and measures it
+
+    Returns:
+        dict from consume_select_stream plus the total latency, the bytes
+        scanned/processed/returned from the Stats event and the error if the
+        query failed
+    """
+    started = time.perf_counter()
+    try:
+        response = rgw_client.select_object_content(
+            Bucket=bucket_name,
+            Key=object_name,
+            ExpressionType="SQL",
+            InputSerialization=input_serialization,
+            OutputSerialization=output_serialization,
+            Expression=query,
+        )
+        info = consume_select_stream(response["Payload"], max_result_bytes)
+        info["error"] = None
+    except Exception as e:
+        info = {"result": "", "result_bytes": 0, "ttfb": None, "stats": {}}
+        info["error"] = e
+    info["latency"] = time.perf_counter() - started
+    for name in ("BytesScanned", "BytesProcessed", "BytesReturned"):
+        info[name] = info["stats"].get(name)
+    return info
 
 
 def execute_s3select_query(
@@ -90,7 +380,9 @@ def execute_s3select_query(
     input_serialization,
     output_serialization,
 ):
-    result = ""
+    """
+    This function runs a query and returns all of its records as a string
+    """
     r = rgw_client.select_object_content(
         Bucket=bucket_name,
         Key=object_name,
@@ -99,19 +391,6 @@ def execute_s3select_query(
         OutputSerialization=output_serialization,
         Expression=query,
     )
-
-    for event in r["Payload"]:
-        if "Records" in event:
-            result = ""
-            records = event["Records"]["Payload"].decode("utf-8")
-            result += records
-        if "Progress" in event:
-            log.info("progress")
-            log.info(event["Progress"])
-        if "Stats" in event:
-            log.info("Stats")
-            log.info(event["Stats"])
-        if "End" in event:
-            log.info("End")
-            log.info(event["End"])
-    return result
+    info = consume_select_stream(r["Payload"])
+    log.info(f"Stats: {info['stats']}")
+    return info["result"]
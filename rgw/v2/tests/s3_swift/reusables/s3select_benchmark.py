@@ -0,0 +1,190 @@
+"""
+s3select query benchmark
+
+Runs a generated query set (see s3select_query_generation.get_queries)
+against an object with a configurable number of queries in flight, and
+records per query the time to the first records event, the total latency
+and the bytes scanned/processed/returned of the Stats event. The table is
+logged and written as json together with the ceph build, and compared with
+the report of an earlier build when one is given.
+
+config, under test_ops:
+
+    query_parallelism: 8                 # queries in flight, 1 by default
+    query_result_bytes: 1048576          # result bytes kept per query
+    query_report: /path/report.json      # where to write the report
+    query_baseline_report: /path/old.json  # report of an earlier build
+"""
+
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import v2.tests.s3_swift.reusables.s3select as s3select
+import v2.utils.utils as utils
+
+log = logging.getLogger()
+
+# result bytes kept per query, the rest is only hashed
+S3SELECT_RESULT_BYTES = 1024 * 1024
+# a query regresses when its latency grew by more than this fraction
+S3SELECT_LATENCY_TOLERANCE = 0.20
+
+
+def run_query_set(
+    rgw_client,
+    bucket_name,
+    object_name,
+    queries,
+    input_serialization,
+    output_serialization,
+    parallelism=1,
+    max_result_bytes=S3SELECT_RESULT_BYTES,
+):
+    """
+    This function runs the queries concurrently and measures each of them
+
+    Every query dict gets its result, status ('pass' or 'fail') and
+    exception, as the sequential loop of test_s3select set them.
+
+    Parameters:
+        queries(list): query dicts with 'id' and 'query'
+        parallelism(int): queries in flight
+
+    Returns:
+        list of per query measurements, in the order of queries
+    """
+
+    def run(query):
+        log.info(f"Executing query{query['id']}: {query['query']}")
+        return s3select.run_s3select_query(
+            rgw_client,
+            bucket_name,
+            object_name,
+            query["query"],
+            input_serialization,
+            output_serialization,
+            max_result_bytes,
+        )
+
+    log.info(
+        f"running {len(queries)} queries on {bucket_name}/{object_name}, "
+        f"{parallelism} in flight"
+    )
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, parallelism)) as executor:
+        infos = list(executor.map(run, queries))
+    elapsed = time.perf_counter() - started
+    rows = []
+    for query, info in zip(queries, infos):
+        if info["error"] is None:
+            log.info(f"query{query['id']} result: {result_preview(info)}")
+            query["result"] = info["result"]
+            query["status"] = "pass"
+        else:
+            log.error(f"query{query['id']} failed: {info['error']}")
+            query["exception"] = info["error"]
+            query["status"] = "fail"
+        rows.append(
+            {
+                "id": query["id"],
+                "query": query["query"],
+                "status": query["status"],
+                "ttfb_ms": None if info["ttfb"] is None else info["ttfb"] * 1000,
+                "latency_ms": info["latency"] * 1000,
+                "bytes_scanned": info["BytesScanned"],
+                "bytes_processed": info["BytesProcessed"],
+                "bytes_returned": info["BytesReturned"],
+                "result_bytes": info["result_bytes"],
+                "result_md5": info.get("md5"),
+            }
+        )
+    log.info(
+        f"{len(queries)} queries in {elapsed:.2f}s, "
+        f"{len(queries) / max(elapsed, 1e-6):.1f} queries/s"
+    )
+    return rows
+
+
+def result_preview(info, chars=200):
+    result = info["result"]
+    more = len(result) > chars or info.get("truncated")
+    return result[:chars] + (f"... ({info['result_bytes']} bytes)" if more else "")
+
+
+def log_query_table(rows):
+    """
+    This function logs the per query measurements as a table
+    """
+    log.info(
+        f"{'id':>5} {'status':<6} {'ttfb ms':>9} {'total ms':>9} {'scanned':>12} "
+        f"{'processed':>12} {'returned':>12}  query"
+    )
+    for row in rows:
+        ttfb = "-" if row["ttfb_ms"] is None else f"{row['ttfb_ms']:.1f}"
+        log.info(
+            f"{row['id']:>5} {row['status']:<6} {ttfb:>9} {row['latency_ms']:>9.1f} "
+            f"{str(row['bytes_scanned']):>12} {str(row['bytes_processed']):>12} "
+            f"{str(row['bytes_returned']):>12}  {row['query']}"
+        )
+
+
+def write_query_report(rows, report_path, build=None):
+    """
+    This function writes the measurements of a query set with the ceph build they ran on
+    """
+    if build is None:
+        try:
+            build = " ".join(utils.get_ceph_version())
+        except Exception:
+            build = None
+    with open(report_path, "w") as fp:
+        json.dump({"build": build, "time": time.time(), "queries": rows}, fp, indent=2)
+    log.info(f"s3select query report written to {report_path}")
+
+
+def compare_query_reports(
+    baseline_path, rows, latency_tolerance=S3SELECT_LATENCY_TOLERANCE
+):
+    """
+    This function compares the latencies with a report of an earlier build
+
+    Queries are matched by their text, a failed query is not compared.
+
+    Returns:
+        list of {id, query, baseline_ms, latency_ms, change} of the regressed queries
+    """
+    with open(baseline_path, "r") as fp:
+        baseline = json.load(fp)
+    baseline_rows = {
+        row["query"]: row for row in baseline["queries"] if row["status"] == "pass"
+    }
+    regressions = []
+    compared = 0
+    for row in rows:
+        old = baseline_rows.get(row["query"])
+        if old is None or row["status"] != "pass" or not old["latency_ms"]:
+            continue
+        compared += 1
+        change = (row["latency_ms"] - old["latency_ms"]) / old["latency_ms"]
+        if change > latency_tolerance:
+            regressions.append(
+                {
+                    "id": row["id"],
+                    "query": row["query"],
+                    "baseline_ms": old["latency_ms"],
+                    "latency_ms": row["latency_ms"],
+                    "change": change,
+                }
+            )
+    log.info(
+        f"compared {compared} queries against build {baseline['build']}, "
+        f"{len(regressions)} slower by more than {latency_tolerance * 100:.0f}%"
+    )
+    for each in regressions:
+        log.warning(
+            f"query{each['id']}: {each['baseline_ms']:.1f}ms -> "
+            f"{each['latency_ms']:.1f}ms ({each['change'] * 100:+.1f}%) {each['query']}"
+        )
+    return regressions
@@ -21,10 +21,14 @@ import time
 
 import v2.lib.resource_op as s3lib
 import v2.utils.utils as utils
-from v2.lib.exceptions import TestExecError
+from v2.lib.bucket_stats_recorder import BucketStatsRecorder
+from v2.lib.exceptions import SyncFailedError, TestExecError
+from v2.lib.sync_tracker import SyncConvergenceTracker
 from v2.tests.s3_swift import reusable
+from v2.tests.s3_swift.reusables import elbencho_metrics
 from v2.tests.s3_swift.reusables import rgw_s3_elbencho as elbencho
 from v2.tests.s3cmd import reusable as s3cmd_reusable
+from v2.utils.log import LOG_DIR
 
 log = logging.getLogger(__name__)
 
@@ -280,17 +284,20 @@ def verify_secondary_stopped_via_sync_status():
 
 
 def verify_sync_using_bucket_stats(
-    bucket_names, remote_ssh_con, max_retries=600, check_interval=30
+    bucket_names, remote_ssh_con, max_retries=600, check_interval=30, recorder=None
 ):
     """
     Verify sync consistency using radosgw-admin bucket stats on both zones.
-    Compares num_objects on primary and secondary to ensure they match.
+    Compares num_objects on primary and secondary to ensure they match,
+    for all buckets at once with one bucket stats call per zone and round.
 
     Args:
         bucket_names: List of bucket names to verify
         remote_ssh_con: SSH connection to secondary site
-        max_retries: Maximum number of retry attempts
-        check_interval: Seconds to wait between retries
+        max_retries: Maximum number of rounds
+        check_interval: Seconds to wait between rounds
+        recorder: BucketStatsRecorder of the buckets on primary and secondary,
+            records every round for the sync throughput curves
 
     Raises:
         TestExecError: If sync doesn't complete within max_retries
@@ -340,128 +347,56 @@ def verify_sync_using_bucket_stats(
 
     log.info(f"{'='*80}\n")
 
-    for bucket_name in bucket_names:
-        log.info(f"Verifying sync for bucket: {bucket_name}")
-        synced = False
-
-        for attempt in range(1, max_retries + 1):
-            # Get primary bucket stats
-            primary_stats_output = utils.exec_shell_cmd(
-                f"radosgw-admin bucket stats --bucket {bucket_name}"
-            )
-            primary_json_match = re.search(r"\{.*\}", primary_stats_output, re.DOTALL)
-
-            if not primary_json_match:
-                log.warning(
-                    f"  Attempt {attempt}: Failed to parse primary bucket stats"
-                )
-                time.sleep(check_interval)
-                continue
-
-            primary_stats = json.loads(primary_json_match.group(0))
-            primary_num_objects = primary_stats["usage"]["rgw.main"]["num_objects"]
-
-            # Get secondary bucket stats
-            stdin, stdout, stderr = remote_ssh_con.exec_command(
-                f"sudo radosgw-admin bucket stats --bucket {bucket_name}"
-            )
-            secondary_stats_output = (
-                stdout.read().decode("utf-8", errors="replace").strip()
-            )
-            secondary_stderr = stderr.read().decode("utf-8", errors="replace").strip()
+    # one bulk bucket stats call per zone and round instead of two per bucket
+    tracker = SyncConvergenceTracker(
+        bucket_names,
+        {"primary": None, "secondary": remote_ssh_con},
+        compare_size=False,
+        recorder=recorder,
+    )
+    try:
+        tracker.wait(timeout=max_retries * check_interval, interval=check_interval)
+    except SyncFailedError as e:
+        raise TestExecError(f"Sync verification failed: {e}")
+    finally:
+        if recorder is not None:
+            recorder.log_summary()
 
-            # Log the raw output for debugging
-            if attempt == 1:
-                log.info(f"Secondary bucket stats output (attempt 1):")
-                log.info(
-                    secondary_stats_output[:1000]
-                    if len(secondary_stats_output) > 1000
-                    else secondary_stats_output
-                )
-            if secondary_stderr:
-                log.warning(f"Secondary stderr: {secondary_stderr}")
-
-            # Check if bucket doesn't exist on secondary yet
-            if (
-                "no such bucket" in secondary_stats_output.lower()
-                or "could not get bucket info" in secondary_stats_output.lower()
-                or len(secondary_stats_output) == 0
-            ):
-                log.info(
-                    f"  Attempt {attempt}/{max_retries}: Bucket not yet synced to secondary (Primary={primary_num_objects}, Secondary=bucket not found)"
-                )
-                if attempt < max_retries:
-                    time.sleep(check_interval)
-                    continue
-                else:
-                    raise TestExecError(
-                        f"Bucket {bucket_name} never appeared on secondary after {max_retries} attempts"
-                    )
+    log.info(f"\n{'='*80}")
+    log.info("✅ ALL BUCKETS SYNCED SUCCESSFULLY")
+    log.info(f"{'='*80}\n")
 
-            # Try to parse JSON - handle case where output might be just JSON or have extra text
-            try:
-                # First try: parse entire output as JSON (if it's pure JSON)
-                secondary_stats = json.loads(secondary_stats_output)
-            except json.JSONDecodeError:
-                # Second try: extract JSON from output that might have extra text
-                secondary_json_match = re.search(
-                    r"\{.*\}", secondary_stats_output, re.DOTALL
-                )
-                if not secondary_json_match:
-                    log.warning(
-                        f"  Attempt {attempt}: Failed to parse secondary bucket stats (not valid JSON)"
-                    )
-                    log.warning(f"  Secondary output: {secondary_stats_output[:500]}")
-                    time.sleep(check_interval)
-                    continue
-                try:
-                    secondary_stats = json.loads(secondary_json_match.group(0))
-                except json.JSONDecodeError as e:
-                    log.warning(
-                        f"  Attempt {attempt}: JSON parsing failed even after regex extraction: {e}"
-                    )
-                    time.sleep(check_interval)
-                    continue
 
-            # Extract num_objects safely
-            try:
-                secondary_num_objects = secondary_stats["usage"]["rgw.main"][
-                    "num_objects"
-                ]
-            except (KeyError, TypeError) as e:
-                log.warning(
-                    f"  Attempt {attempt}: Failed to extract num_objects from secondary stats: {e}"
-                )
-                log.warning(
-                    f"  Available keys in secondary_stats: {list(secondary_stats.keys()) if isinstance(secondary_stats, dict) else 'not a dict'}"
-                )
-                time.sleep(check_interval)
-                continue
+def start_bucket_stats_recorder(bucket_names, remote_ssh_con, interval=30):
+    """
+    Start recording bucket stats of the buckets on primary and secondary.
 
-            log.info(
-                f"  Attempt {attempt}/{max_retries}: Primary={primary_num_objects}, "
-                f"Secondary={secondary_num_objects}"
-            )
+    Record from before the upload so that the series holds the ingest on
+    primary and the sync to secondary. Stop the recorder when the upload is
+    done and pass it to verify_sync_using_bucket_stats, which records on.
 
-            if primary_num_objects == secondary_num_objects:
-                log.info(
-                    f"  ✓ Sync complete for {bucket_name}: {primary_num_objects} objects on both zones"
-                )
-                synced = True
-                break
+    Returns:
+        BucketStatsRecorder, recording in the background
+    """
+    recorder = BucketStatsRecorder(
+        bucket_names,
+        {"primary": None, "secondary": remote_ssh_con},
+        interval=interval,
+    )
+    recorder.start()
+    return recorder
 
-            if attempt < max_retries:
-                time.sleep(check_interval)
 
-        if not synced:
-            raise TestExecError(
-                f"Sync verification failed for {bucket_name} after {max_retries} attempts. "
-                f"Primary: {primary_num_objects}, Secondary: {secondary_num_objects}"
-            )
+def save_bucket_stats_recording(recorder, name):
+    """
+    Stop the recorder and save its series to LOG_DIR/<name>_bucket_stats.json.
 
-    log.info(f"\n{'='*80}")
-    log.info("✅ ALL BUCKETS SYNCED SUCCESSFULLY")
-    log.info(f"{'='*80}\n")
+    Returns:
+        summary of the recording, see BucketStatsRecorder.summary
+    """
+    recorder.stop()
+    recorder.save(os.path.join(LOG_DIR, f"{name}_bucket_stats.json"))
+    return recorder.summary()
 
 
 def run_sanity_check(
@@ -574,17 +509,17 @@ def run_sanity_check(
         test_threads = 10
 
         # Simple write test - just one size range
-        elbencho_cmd = (
-            f"/usr/local/bin/elbencho --s3endpoints {local_endpoint} "
+        elbencho_args = (
+            f"--s3endpoints {local_endpoint} "
             f"--s3key {test_user['access_key']} --s3secret {test_user['secret_key']} "
             f"-w -t {test_threads} -n0 -N {test_objects} -s 1024 {sanity_bucket_name}"
         )
 
-        output = utils.exec_shell_cmd(elbencho_cmd)
-        if output is False:
+        phases = elbencho.exec_elbencho(elbencho_args, "sanity-put-1024")
+        if phases is False:
             raise TestExecError("  ❌ Elbencho write test failed")
 
-        metrics = elbencho.parse_elbencho_output(output)
+        metrics = elbencho_metrics.summarize_phases(phases)
         log.info(f"  ✓ Wrote {test_objects} objects - Metrics: {metrics}")
 
         # 8. Verify sync to secondary
@@ -702,8 +637,8 @@ def run_elbencho_with_size_distribution(
         )
 
         # Build elbencho command
-        elbencho_cmd = (
-            f"time /usr/local/bin/elbencho --s3endpoints {endpoint} "
+        elbencho_args = (
+            f"--s3endpoints {endpoint} "
             f"--s3key {each_user['access_key']} --s3secret {each_user['secret_key']} "
             f"-w -t {threads} -n0 -N {obj_count} -s {size_range} "
             f"{bucket_format}"
@@ -715,14 +650,13 @@ def run_elbencho_with_size_distribution(
                 f"[{zone_name}] Note: Special character object names not supported by elbencho"
             )
 
-        output = utils.exec_shell_cmd(elbencho_cmd)
-        if output is False:
+        phases = elbencho.exec_elbencho(elbencho_args, f"{zone_name}-put-{size_range}")
+        if phases is False:
             raise TestExecError(
                 f"Elbencho failed on {zone_name} for size range {size_range}"
             )
 
-        # Parse metrics
-        metrics = elbencho.parse_elbencho_output(output)
+        metrics = elbencho_metrics.summarize_phases(phases)
         log.info(f"[{zone_name}] Metrics for size {size_range}: {metrics}")
 
         if "Total Data Written (MiB)" in metrics:
@@ -765,20 +699,22 @@ def run_versioned_workload(
     for version_num in range(version_count):
         log.info(f"[{zone_name}] Creating version {version_num + 1}/{version_count}")
 
-        elbencho_cmd = (
-            f"time /usr/local/bin/elbencho --s3endpoints {endpoint} "
+        elbencho_args = (
+            f"--s3endpoints {endpoint} "
             f"--s3key {each_user['access_key']} --s3secret {each_user['secret_key']} "
             f"-w -t {threads} -n0 -N {num_objects} -s {object_size} "
             f"{bucket_format}"
         )
 
-        output = utils.exec_shell_cmd(elbencho_cmd)
-        if output is False:
+        phases = elbencho.exec_elbencho(
+            elbencho_args, f"{zone_name}-versioned-put-{object_size}"
+        )
+        if phases is False:
             raise TestExecError(
                 f"Elbencho failed on {zone_name} for version {version_num + 1}"
             )
 
-        metrics = elbencho.parse_elbencho_output(output)
+        metrics = elbencho_metrics.summarize_phases(phases)
         log.info(f"[{zone_name}] Version {version_num + 1}: {metrics}")
         total_versions_written += num_objects
 
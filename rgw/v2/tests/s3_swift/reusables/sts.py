@@ -77,7 +77,6 @@ def add_sts_config_to_ceph_conf(
     )
     ceph_config_set.set_to_ceph_conf("global", ConfigOpts.rgw_s3_auth_use_sts, "True")
     srv_restarted = rgw_service.restart()
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
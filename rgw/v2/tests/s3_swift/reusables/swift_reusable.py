@@ -1,4 +1,3 @@
-import hashlib
 import json
 import logging
 import os
@@ -11,6 +10,7 @@ import v2.lib.manage_data as manage_data
 import v2.utils.utils as utils
 from cryptography.fernet import Fernet
 from swiftclient import ClientException
+from v2.lib.swift.large_object import SEGMENT_UPLOAD_WORKERS, SwiftLargeObjectUploader
 
 log = logging.getLogger()
 
@@ -23,44 +23,31 @@ def get_unique_name(length=7):
 def create_a_large_file(TEST_DATA_PATH, filename, filesize=10000):
     file_path = os.path.join(TEST_DATA_PATH, filename)
     data_info = manage_data.io_generator(file_path, filesize)  # File Creation
-    # Container and object detail
-    log.info(f"md5 of uploading large file :{utils.get_md5(file_path)}")
+    # Container and object detail, the md5 is computed while writing the file
+    log.info(f"md5 of uploading large file :{data_info['md5']}")
     log.info(f"DATA INFO :: {data_info}")
+    return data_info
 
 
 def upload_segments(
-    rgw, TEST_DATA_PATH, container_name, object_name, filename, segment_size
+    rgw,
+    TEST_DATA_PATH,
+    container_name,
+    object_name,
+    filename,
+    segment_size,
+    workers=SEGMENT_UPLOAD_WORKERS,
+    resume=False,
 ):
-    """Upload segments of the binary file."""
-    segment_list = []
+    """Upload segments of the binary file, concurrently, and return the SLO manifest."""
     file_path = os.path.join(TEST_DATA_PATH, filename)
-
-    with open(file_path, "rb") as f:
-        segment_number = 0
-        while True:
-            segment_data = f.read(segment_size)
-            if not segment_data:
-                break
-
-            # Segment name
-            segment_name = f"{object_name}/segment_{segment_number:08d}"
-
-            # Upload the segment
-            rgw.put_object(container_name, segment_name, contents=segment_data)
-
-            # Add segment metadata to the manifest list
-            segment_list.append(
-                {
-                    "path": f"/{container_name}/{segment_name}",
-                    "etag": rgw.head_object(container_name, segment_name)["etag"],
-                    "size_bytes": len(segment_data),
-                }
-            )
-
-            log.info(f"Uploaded segment: {segment_name}")
-            segment_number += 1
-
-    return segment_list
+    uploader = SwiftLargeObjectUploader(
+        rgw, container_name, segment_size=segment_size, workers=workers
+    )
+    result = uploader.upload_segments(
+        file_path, f"{object_name}/segment_", resume=resume
+    )
+    return result.manifest
 
 
 def upload_manifest(rgw, container_name, object_name, segment_list):
@@ -150,64 +137,62 @@ def upload_regular_object(rgw, container_name, TEST_DATA_PATH):
     print("Regular object uploaded.")
 
 
-def upload_dlo(rgw, container_name, TEST_DATA_PATH, filesize=10000):
+def upload_dlo(
+    rgw,
+    container_name,
+    TEST_DATA_PATH,
+    filesize=10000,
+    workers=SEGMENT_UPLOAD_WORKERS,
+    resume=False,
+):
     # Upload DLO (Dynamic Large Object)
     segment_prefix = "dlo_segments/segment"
     segment_size = 1024 * 1024  # 1MB per segment
     object_name = "dlo_object"
     filename_test = "a_large_file" + get_unique_name(3)
     create_a_large_file(TEST_DATA_PATH, filename_test, filesize)
-    with open(os.path.join(TEST_DATA_PATH, filename_test), "rb") as f:
-        i = 0
-        while True:
-            chunk = f.read(segment_size)
-            if not chunk:
-                break
-            rgw.put_object(container_name, f"{segment_prefix}{i}", contents=chunk)
-            i += 1
-    # Upload manifest
-    rgw.put_object(
-        container_name,
+    uploader = SwiftLargeObjectUploader(
+        rgw, container_name, segment_size=segment_size, workers=workers
+    )
+    result = uploader.upload_dlo(
+        os.path.join(TEST_DATA_PATH, filename_test),
         object_name,
-        contents="",
-        headers={"X-Object-Manifest": f"{container_name}/{segment_prefix}"},
+        segment_prefix=segment_prefix,
+        resume=resume,
     )
     print("DLO uploaded.")
+    return result
 
 
-def upload_slo(rgw, container_name, TEST_DATA_PATH, filesize=10000):
+def upload_slo(
+    rgw,
+    container_name,
+    TEST_DATA_PATH,
+    filesize=10000,
+    workers=SEGMENT_UPLOAD_WORKERS,
+    resume=False,
+):
     # Upload SLO (Static Large Object)
     segment_prefix = "slo_segments/segment"
     segment_size = 1024 * 1024
-    manifest = []
 
     filename_test = "a_large_file" + get_unique_name(3)
     create_a_large_file(TEST_DATA_PATH, filename_test, filesize)
-    with open(os.path.join(TEST_DATA_PATH, filename_test), "rb") as f:
-        i = 0
-        while True:
-            chunk = f.read(segment_size)
-            if not chunk:
-                break
-            segment_name = f"{segment_prefix}{i}"
-            etag = hashlib.md5(chunk).hexdigest()
-            rgw.put_object(container_name, segment_name, contents=chunk)
-            manifest.append(
-                {
-                    "path": f"/{container_name}/{segment_name}",
-                    "etag": etag,
-                    "size_bytes": len(chunk),
-                }
-            )
-            i += 1
+    uploader = SwiftLargeObjectUploader(
+        rgw, container_name, segment_size=segment_size, workers=workers
+    )
+    result = uploader.upload_segments(
+        os.path.join(TEST_DATA_PATH, filename_test), segment_prefix, resume=resume
+    )
     # Upload SLO manifest
     rgw.put_object(
         container_name,
         "slo_object",
-        contents=json.dumps(manifest),
+        contents=json.dumps(result.manifest),
         headers={"X-Static-Large-Object": "True", "Content-Type": "application/json"},
     )
     print("SLO uploaded.")
+    return result
 
 
 def upload_multipart(rgw, container_name, TEST_DATA_PATH):
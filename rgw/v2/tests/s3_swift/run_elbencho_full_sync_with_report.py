@@ -22,6 +22,12 @@ Usage:
         -c multisite_configs/test_elbencho_full_sync_all_scenarios.yaml \
         --no-report
 
+Elbencho metrics are read from the elbencho run history written by the test
+(see reusables/elbencho_metrics.py), attributed to the scenario that ran
+them and compared against the latest runs of another build, or of the build
+given with --baseline-build. Throughput or latency regressions are flagged
+in the report.
+
 When report generation is enabled, the script will create:
     output_dir/
         ├── test_report.html              # Main HTML report
@@ -45,6 +51,9 @@ from pathlib import Path
 
 import yaml
 
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
+from v2.tests.s3_swift.reusables import elbencho_metrics
+
 
 class ScenarioTracker:
     """Tracks individual scenario execution details."""
@@ -88,11 +97,21 @@ class ScenarioTracker:
 class TestRunner:
     """Main test runner that executes tests and generates reports."""
 
-    def __init__(self, config_file, output_dir, log_level="info", generate_report=True):
+    def __init__(
+        self,
+        config_file,
+        output_dir,
+        log_level="info",
+        generate_report=True,
+        baseline_build=None,
+    ):
         self.config_file = config_file
         self.output_dir = Path(output_dir)
         self.log_level = log_level
         self.generate_report = generate_report
+        self.baseline_build = baseline_build
+        # elbencho runs of this test with their scenario and baseline comparison
+        self.elbencho_runs = []
 
         # Create output directory only if generating reports
         if self.generate_report:
@@ -304,6 +323,9 @@ class TestRunner:
             if master_log:
                 master_log.close()
 
+        self.collect_elbencho_metrics()
+        self.print_elbencho_metrics()
+
         # Generate reports only if enabled
         if self.generate_report:
             # Write individual scenario logs
@@ -324,6 +346,119 @@ class TestRunner:
             )
             print(f"\nReport generation was disabled in config.\n")
 
+    def scenario_of(self, timestamp):
+        """Return the id of the scenario running at the given epoch time."""
+        for scenario_id, scenario in self.scenarios.items():
+            if not scenario.start_time:
+                continue
+            end_time = scenario.end_time or self.test_end_time
+            if scenario.start_time.timestamp() <= timestamp and (
+                end_time is None or timestamp <= end_time.timestamp()
+            ):
+                return scenario_id
+        return None
+
+    def collect_elbencho_metrics(self):
+        """Load the elbencho runs of this test and compare them with their baseline."""
+        if not self.test_start_time:
+            return
+        history = elbencho_metrics.ElbenchoRunHistory()
+        until = self.test_end_time.timestamp() if self.test_end_time else None
+        for run in history.runs(since=self.test_start_time.timestamp(), until=until):
+            baseline = history.baseline(run, self.baseline_build)
+            comparison = (
+                elbencho_metrics.compare_runs(baseline, run) if baseline else []
+            )
+            self.elbencho_runs.append(
+                {
+                    "run": run,
+                    "scenario": self.scenario_of(run["started"]),
+                    "baseline": baseline,
+                    "comparison": comparison,
+                    "regressions": [each for each in comparison if each["regression"]],
+                }
+            )
+
+    def print_elbencho_metrics(self):
+        """Print throughput, IOPS and latency of every elbencho phase of this test."""
+        if not self.elbencho_runs:
+            return
+        print(f"\n{'='*80}")
+        print("ELBENCHO METRICS")
+        print(f"{'='*80}")
+        for each in self.elbencho_runs:
+            run = each["run"]
+            for phase in run["phases"]:
+                print(
+                    f"  [{each['scenario'] or '-'}] {run['label']} {phase.get('phase')}: "
+                    f"{phase.get('mib_per_sec', 'N/A')} MiB/s, "
+                    f"{phase.get('iops', 'N/A')} IOPS, "
+                    f"avg latency {phase.get('io_lat_us_avg', 'N/A')} us"
+                )
+            for regression in each["regressions"]:
+                print(
+                    f"    ⚠ {regression['phase']} {regression['metric']} "
+                    f"{regression['change'] * 100:+.1f}% against build "
+                    f"{each['baseline']['build']}"
+                )
+
+    def _elbencho_metrics_html(self):
+        """Return the HTML section with the elbencho metrics of this test."""
+        if not self.elbencho_runs:
+            return ""
+        rows = ""
+        for each in self.elbencho_runs:
+            run = each["run"]
+            changes = {(c["phase"], c["metric"]): c for c in each["comparison"]}
+            scenario = self.scenarios.get(each["scenario"])
+            for phase in run["phases"]:
+                cells = ""
+                for metric in ("mib_per_sec", "iops", "io_lat_us_avg"):
+                    value = phase.get(metric)
+                    change = changes.get((phase.get("phase"), metric))
+                    text = f"{value:.2f}" if isinstance(value, (int, float)) else "N/A"
+                    if change:
+                        style = (
+                            "status-failed" if change["regression"] else "status-passed"
+                        )
+                        text += (
+                            f' <span class="status-badge {style}">'
+                            f"{change['change'] * 100:+.1f}%</span>"
+                        )
+                    cells += f"<td>{text}</td>"
+                baseline = each["baseline"]["build"] if each["baseline"] else "N/A"
+                rows += f"""
+                    <tr>
+                        <td>{scenario.name if scenario else 'N/A'}</td>
+                        <td><strong>{run['label']}</strong></td>
+                        <td>{phase.get('phase', 'N/A')}</td>
+                        {cells}
+                        <td class="timestamp">{baseline}</td>
+                    </tr>
+"""
+        return f"""
+        <div class="scenarios">
+            <h2>📈 Elbencho Metrics</h2>
+
+            <table class="scenario-table">
+                <thead>
+                    <tr>
+                        <th>Scenario</th>
+                        <th>Workload</th>
+                        <th>Phase</th>
+                        <th>MiB/s</th>
+                        <th>IOPS</th>
+                        <th>Avg IO latency (us)</th>
+                        <th>Baseline build</th>
+                    </tr>
+                </thead>
+                <tbody>
+{rows}
+                </tbody>
+            </table>
+        </div>
+"""
+
     def write_scenario_logs(self):
         """Write individual log files for each scenario."""
         for scenario_id, scenario in self.scenarios.items():
@@ -654,7 +789,7 @@ class TestRunner:
                 </tbody>
             </table>
         </div>
-
+{self._elbencho_metrics_html()}
         <div class="footer">
             <p><strong>Test Information</strong></p>
             <p class="timestamp">Started: {self.test_start_time.strftime('%Y-%m-%d %H:%M:%S') if self.test_start_time else 'N/A'}</p>
@@ -714,6 +849,12 @@ def main():
         action="store_true",
         help="Disable HTML report generation (overrides config setting)",
     )
+    parser.add_argument(
+        "--baseline-build",
+        dest="baseline_build",
+        default=None,
+        help="Ceph build to compare elbencho metrics against (default: latest other build)",
+    )
 
     args = parser.parse_args()
 
@@ -741,6 +882,7 @@ def main():
         output_dir=args.output,
         log_level=args.log_level,
         generate_report=generate_report,
+        baseline_build=args.baseline_build,
     )
 
     runner.run_test()
@@ -761,6 +903,11 @@ def main():
                 )
     else:
         print(f"Report Generation: DISABLED")
+    regressions = sum(len(each["regressions"]) for each in runner.elbencho_runs)
+    if runner.elbencho_runs:
+        print(
+            f"\nElbencho runs: {len(runner.elbencho_runs)}, regressions: {regressions}"
+        )
     print(f"{'='*80}\n")
 
 
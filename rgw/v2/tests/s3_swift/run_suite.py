@@ -0,0 +1,328 @@
+"""
+run_suite.py - run a suite of test configs in parallel
+
+Usage: run_suite.py [--suite sanity_suite.yaml] [--workers 4] [--rgw-node <ip>]
+
+The suite file lists the tests as script, config and tags:
+
+    tests:
+      - script: test_Mbuckets_with_Nobjects.py
+        config: test_Mbuckets_with_Nobjects_enc.yaml
+        tags: [needs-restart, ceph-conf]
+
+Operation:
+    every test runs as its own process, in its own working directory, so
+    the io_info_<config>.yaml files and the captured output never clash
+    tests tagged needs-restart or ceph-conf restart rgw or change the ceph
+    config for everybody, they run alone; multisite tests run one at a time
+    tests start longest first, by the durations recorded in earlier runs
+    a JUnit xml and a json summary are written to the results directory
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
+import argparse
+import json
+import logging
+import subprocess
+import time
+import xml.etree.ElementTree as ET
+
+import yaml
+from v2.utils.log import LOG_DIR, configure_logging
+
+log = logging.getLogger()
+
+SUITE_DIR = os.path.dirname(os.path.abspath(__file__))
+DURATION_HISTORY_FILE = os.path.join(LOG_DIR, "suite_durations.json")
+# tests with these tags never overlap with any other test
+EXCLUSIVE_TAGS = {"needs-restart", "ceph-conf"}
+# at most one test with one of these tags runs at a time
+SERIAL_TAGS = {"multisite"}
+# durations kept per test, the estimate is their mean
+DURATION_HISTORY_RUNS = 5
+# estimate of a test never run before, high so that it starts early
+UNKNOWN_DURATION = 3600
+POLL_INTERVAL = 1
+
+
+class SuiteTest(object):
+    """
+    A test config of the suite and the outcome of its run
+    """
+
+    def __init__(self, script, config, tags=None):
+        self.script = script
+        self.config = config
+        self.tags = set(tags or [])
+        self.name = f"{os.path.splitext(script)[0]}:{os.path.splitext(os.path.basename(config))[0]}"
+        self.estimate = UNKNOWN_DURATION
+        self.process = None
+        self.workdir = None
+        self.started = None
+        self.duration = None
+        self.returncode = None
+
+    @property
+    def exclusive(self):
+        return bool(self.tags & EXCLUSIVE_TAGS)
+
+    def conflicts(self, running):
+        """
+        This function checks whether the test may not start next to the running ones
+        """
+        if not running:
+            return False
+        if self.exclusive or any(each.exclusive for each in running):
+            return True
+        serial = self.tags & SERIAL_TAGS
+        return any(serial & each.tags for each in running)
+
+    def start(self, results_dir, rgw_node, log_level):
+        self.workdir = os.path.join(results_dir, self.name.replace(":", "__"))
+        os.makedirs(self.workdir, exist_ok=True)
+        cmd = [
+            sys.executable,
+            os.path.join(SUITE_DIR, self.script),
+            "-c",
+            os.path.join(SUITE_DIR, "configs", self.config),
+            "-log_level",
+            log_level,
+        ]
+        if rgw_node:
+            cmd += ["--rgw-node", rgw_node]
+        log.info(f"starting {self.name} (estimate {self.estimate:.0f}s): {cmd}")
+        self.output = open(os.path.join(self.workdir, "output.log"), "wb")
+        self.started = time.time()
+        self.process = subprocess.Popen(
+            cmd, cwd=self.workdir, stdout=self.output, stderr=subprocess.STDOUT
+        )
+
+    def poll(self):
+        """
+        This function returns True once the test finished
+        """
+        if self.process.poll() is None:
+            return False
+        self.returncode = self.process.returncode
+        self.duration = time.time() - self.started
+        self.output.close()
+        status = "passed" if self.returncode == 0 else "FAILED"
+        log.info(f"{self.name} {status} in {self.duration:.0f}s")
+        return True
+
+    def output_tail(self, lines=50):
+        with open(os.path.join(self.workdir, "output.log"), "rb") as fp:
+            return b"\n".join(fp.read().splitlines()[-lines:]).decode(errors="replace")
+
+
+def load_suite(suite_file, include_tags=None, exclude_tags=None):
+    """
+    This function reads the tests of a suite file, filtered by tags
+    """
+    with open(suite_file, "r") as fp:
+        doc = yaml.safe_load(fp)
+    tests = [SuiteTest(**each) for each in doc["tests"]]
+    if include_tags:
+        tests = [each for each in tests if each.tags & set(include_tags)]
+    if exclude_tags:
+        tests = [each for each in tests if not each.tags & set(exclude_tags)]
+    return tests
+
+
+class DurationHistory(object):
+    """
+    Durations of the earlier runs of every test, in a json file
+    """
+
+    def __init__(self, fname=DURATION_HISTORY_FILE):
+        self.fname = fname
+        self.durations = {}
+        if os.path.exists(fname):
+            with open(fname, "r") as fp:
+                self.durations = json.load(fp)
+
+    def estimate(self, name):
+        durations = self.durations.get(name)
+        if not durations:
+            return UNKNOWN_DURATION
+        return sum(durations) / len(durations)
+
+    def record(self, name, duration):
+        durations = self.durations.setdefault(name, [])
+        durations.append(duration)
+        del durations[:-DURATION_HISTORY_RUNS]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.fname), exist_ok=True)
+        with open(self.fname, "w") as fp:
+            json.dump(self.durations, fp, indent=2)
+
+
+def run_suite(
+    tests,
+    workers,
+    results_dir,
+    rgw_node=None,
+    log_level="info",
+    fail_fast=False,
+    history_file=DURATION_HISTORY_FILE,
+):
+    """
+    This function runs the tests, up to workers at a time, longest first
+
+    A test that conflicts with the running ones is skipped over for now,
+    unless it is exclusive: then nothing else starts until it ran, so
+    exclusive tests are not starved by a stream of short ones.
+
+    Returns:
+        the tests in the order they finished
+    """
+    history = DurationHistory(history_file)
+    for each in tests:
+        each.estimate = history.estimate(each.name)
+    pending = sorted(tests, key=lambda each: each.estimate, reverse=True)
+    running = []
+    finished = []
+    while pending or running:
+        for each in list(running):
+            if each.poll():
+                running.remove(each)
+                finished.append(each)
+                history.record(each.name, each.duration)
+                history.save()
+                if each.returncode != 0 and fail_fast:
+                    log.error(f"{each.name} failed, not starting the remaining tests")
+                    pending = []
+        for each in list(pending):
+            if len(running) >= workers:
+                break
+            if each.conflicts(running):
+                if each.exclusive:
+                    break
+                continue
+            pending.remove(each)
+            each.start(results_dir, rgw_node, log_level)
+            running.append(each)
+        time.sleep(POLL_INTERVAL)
+    return finished
+
+
+def write_junit(tests, fname, elapsed):
+    suite = ET.Element(
+        "testsuite",
+        name="rgw",
+        tests=str(len(tests)),
+        failures=str(sum(1 for each in tests if each.returncode != 0)),
+        time=f"{elapsed:.1f}",
+    )
+    for each in tests:
+        script, config = each.name.split(":", 1)
+        case = ET.SubElement(
+            suite,
+            "testcase",
+            classname=script,
+            name=config,
+            time=f"{each.duration:.1f}",
+        )
+        if each.returncode != 0:
+            failure = ET.SubElement(
+                case, "failure", message=f"exit status {each.returncode}"
+            )
+            failure.text = each.output_tail()
+    ET.ElementTree(suite).write(fname, encoding="utf-8", xml_declaration=True)
+
+
+def write_summary(tests, fname, elapsed):
+    summary = {
+        "elapsed": elapsed,
+        "passed": sum(1 for each in tests if each.returncode == 0),
+        "failed": sum(1 for each in tests if each.returncode != 0),
+        "tests": [
+            {
+                "name": each.name,
+                "script": each.script,
+                "config": each.config,
+                "tags": sorted(each.tags),
+                "returncode": each.returncode,
+                "duration": each.duration,
+                "workdir": each.workdir,
+            }
+            for each in tests
+        ],
+    }
+    with open(fname, "w") as fp:
+        json.dump(summary, fp, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RGW test suite scheduler")
+    parser.add_argument(
+        "--suite",
+        dest="suite",
+        default=os.path.join(SUITE_DIR, "sanity_suite.yaml"),
+        help="suite yaml listing script, config and tags of every test",
+    )
+    parser.add_argument(
+        "--workers", dest="workers", type=int, default=4, help="tests run at a time"
+    )
+    parser.add_argument(
+        "--results-dir",
+        dest="results_dir",
+        default=os.path.join(LOG_DIR, "suite_" + time.strftime("%Y%m%d-%H%M%S")),
+        help="working directories, junit xml and json summary go here",
+    )
+    parser.add_argument(
+        "--history",
+        dest="history",
+        default=DURATION_HISTORY_FILE,
+        help="json file with the durations of earlier runs",
+    )
+    parser.add_argument("--rgw-node", dest="rgw_node", help="RGW Node", default=None)
+    parser.add_argument(
+        "--include-tags", dest="include_tags", nargs="*", help="run only these tags"
+    )
+    parser.add_argument(
+        "--exclude-tags", dest="exclude_tags", nargs="*", help="skip these tags"
+    )
+    parser.add_argument(
+        "--fail-fast",
+        dest="fail_fast",
+        action="store_true",
+        help="start no more tests after a failure, like run-all.sh",
+    )
+    parser.add_argument(
+        "-log_level",
+        dest="log_level",
+        help="Set Log Level [DEBUG, INFO, WARNING, ERROR, CRITICAL]",
+        default="info",
+    )
+    args = parser.parse_args()
+    configure_logging(f_name="run_suite", set_level=args.log_level.upper())
+    os.makedirs(args.results_dir, exist_ok=True)
+    tests = load_suite(args.suite, args.include_tags, args.exclude_tags)
+    log.info(f"running {len(tests)} tests with {args.workers} workers")
+    started = time.time()
+    finished = run_suite(
+        tests,
+        args.workers,
+        args.results_dir,
+        args.rgw_node,
+        args.log_level,
+        args.fail_fast,
+        args.history,
+    )
+    elapsed = time.time() - started
+    write_junit(finished, os.path.join(args.results_dir, "junit.xml"), elapsed)
+    write_summary(finished, os.path.join(args.results_dir, "summary.json"), elapsed)
+    failed = [each.name for each in finished if each.returncode != 0]
+    log.info(
+        f"{len(finished) - len(failed)} passed, {len(failed)} failed, "
+        f"{len(tests) - len(finished)} not run, in {elapsed:.0f}s; "
+        f"results in {args.results_dir}"
+    )
+    for name in failed:
+        log.error(f"failed: {name}")
+    sys.exit(1 if failed or len(finished) < len(tests) else 0)
@@ -25,6 +25,7 @@ Usage: test_Mbuckets_with_Nobjects.py -c <input_yaml>
     test_Mbuckets_with_Nobjects_get_object_attributes_multipart.yaml
     test_Mbuckets_with_Nobjects_multipart_upload_complete_abort_race.yaml
     test_Mbuckets_with_Nobjects_unicode_bi_list.yaml
+    test_Mbuckets_with_Nobjects_load_driver.yaml
 
 Operation:
         Creates M bucket and N objects
@@ -40,6 +41,7 @@ Operation:
         Verify bi put on incomplete multipart upload
     Verify bucket instance shards are deleted from index pool post bucket delete
     Verify bucket index listing with unicode characters does not cause backwards iteration
+    Creates M bucket and drives a concurrent put/get/delete load on each, reporting latency percentiles
 """
 
 # test basic creation of buckets with objects
@@ -57,16 +59,19 @@ import traceback
 
 import v2.lib.resource_op as s3lib
 import v2.utils.utils as utils
-from v2.lib.exceptions import RGWBaseException, TestExecError
+from v2.lib.exceptions import RGWBaseException, TestExecError, WaitTimeoutError
 from v2.lib.resource_op import Config
 from v2.lib.rgw_config_opts import CephConfOp, ConfigOpts
 from v2.lib.s3.auth import Auth
 from v2.lib.s3.write_io_info import BasicIOInfoStructure, BucketIoInfo, IOInfoInitialize
 from v2.tests.s3_swift import reusable
+from v2.tests.s3_swift.reusables.load_driver import LoadDriver
 from v2.tests.s3cmd import reusable as s3cmd_reusable
+from v2.utils import wait_conditions
 from v2.utils.log import configure_logging
 from v2.utils.test_desc import AddTestInfo
 from v2.utils.utils import RGWService
+from v2.utils.waiter import wait_until
 
 log = logging.getLogger()
 TEST_DATA_PATH = None
@@ -101,7 +106,6 @@ def test_exec(config, ssh_con):
             "global", ConfigOpts.rgw_crypt_require_ssl, "false", ssh_con
         )
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -118,7 +122,6 @@ def test_exec(config, ssh_con):
         )
         log.info("trying to restart services ")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -148,7 +151,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -196,7 +198,6 @@ def test_exec(config, ssh_con):
                 exit(str(e))
             log.info("trying to restart rgw services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(10)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -330,7 +331,12 @@ def test_exec(config, ssh_con):
                                 )
                             config.mapped_sizes = utils.make_mapped_sizes(config)
 
-                    for oc, size in list(config.mapped_sizes.items()):
+                    object_sizes = config.mapped_sizes
+                    if config.test_ops.get("load_driver"):
+                        # objects are created by the concurrent load driver instead
+                        LoadDriver(auth, each_user, bucket_name_to_create, config).run()
+                        object_sizes = {}
+                    for oc, size in list(object_sizes.items()):
                         config.obj_size = size
                         s3_object_name = utils.gen_s3_object_name(
                             bucket_name_to_create, oc
@@ -498,9 +504,12 @@ def test_exec(config, ssh_con):
                             log.info(
                                 "Test bucket stats for 'versioning' and num_objects for a colocated archive zone."
                             )
-                            time.sleep(120)
-                            reusable.test_bucket_stats_colocated_archive_zone(
-                                bucket_name_to_create, each_user, config
+                            wait_conditions.wait_for_success(
+                                reusable.test_bucket_stats_colocated_archive_zone,
+                                bucket_name_to_create,
+                                each_user,
+                                config,
+                                timeout=300,
                             )
 
                         if config.local_file_delete is True:
@@ -694,8 +703,6 @@ def test_exec(config, ssh_con):
                         if not out:
                             log.info("Bucket sync is not caught up with source.")
                     if config.test_sync_consistency_bucket_stats:
-                        log.info("Wait for sync lease period of 120 seconds")
-                        time.sleep(150)
                         reusable.test_bucket_stats_across_sites(
                             bucket_name_to_create, config
                         )
@@ -719,19 +726,13 @@ def test_exec(config, ssh_con):
                     if config.dynamic_resharding is True:
                         if utils.check_dbr_support():
                             reusable.check_sync_status()
-                            for i in range(10):
-                                time.sleep(
-                                    60
-                                )  # Adding delay for processing reshard list
-                                op = utils.exec_shell_cmd(
-                                    f"radosgw-admin bucket stats --bucket {bkt}"
+                            try:
+                                wait_conditions.wait_for_num_shards(
+                                    bkt,
+                                    lambda n: n > old_num_shards,
+                                    f"above {old_num_shards}",
                                 )
-                                json_doc = json.loads(op)
-                                new_num_shards = json_doc["num_shards"]
-                                log.info(f"no_of_shards_created: {new_num_shards}")
-                                if new_num_shards > old_num_shards:
-                                    break
-                            else:
+                            except WaitTimeoutError:
                                 raise TestExecError(
                                     "num shards are same after processing resharding"
                                 )
@@ -741,17 +742,15 @@ def test_exec(config, ssh_con):
                             op = utils.exec_shell_cmd(
                                 f"radosgw-admin bucket sync disable --bucket {bkt}"
                             )
-                            for i in range(10):
-                                bucket_sync_status = reusable.check_bucket_sync_status(
-                                    bkt
-                                )
-                                if "disabled" in bucket_sync_status:
-                                    log.info("Sync disabled successfully")
-                                    break
-                                else:
-                                    time.sleep(60)
-                            else:
+                            if not wait_until(
+                                lambda: "disabled"
+                                in reusable.check_bucket_sync_status(bkt),
+                                f"sync of {bkt} to be disabled",
+                                timeout=600,
+                                raise_on_timeout=False,
+                            ):
                                 raise TestExecError("Bucket did not got disabled")
+                            log.info("Sync disabled successfully")
 
                         if utils.check_dbr_support():
                             op = utils.exec_shell_cmd(
@@ -766,14 +765,14 @@ def test_exec(config, ssh_con):
                                 f"radosgw-admin reshard add --bucket {bkt} --num-shards {config.shards}"
                             )
                             op = utils.exec_shell_cmd("radosgw-admin reshard process")
-                            time.sleep(60)
-                            op = utils.exec_shell_cmd(
-                                f"radosgw-admin bucket stats --bucket {bkt}"
-                            )
-                            json_doc = json.loads(op)
-                            new_num_shards = json_doc["num_shards"]
-                            log.info(f"no_of_shards_created: {new_num_shards}")
-                            if new_num_shards <= old_num_shards:
+                            try:
+                                wait_conditions.wait_for_num_shards(
+                                    bkt,
+                                    lambda n: n > old_num_shards,
+                                    f"above {old_num_shards}",
+                                    timeout=120,
+                                )
+                            except WaitTimeoutError:
                                 raise TestExecError(
                                     "num shards are same after processing resharding"
                                 )
@@ -800,21 +799,17 @@ def test_exec(config, ssh_con):
                             op = utils.exec_shell_cmd(
                                 f"radosgw-admin bucket sync enable --bucket {bkt}"
                             )
-                            for i in range(10):
-                                bucket_sync_status = reusable.check_bucket_sync_status(
-                                    bkt
-                                )
-                                if (
-                                    "behind" in bucket_sync_status
-                                    or "recovering" in bucket_sync_status
-                                    or "caught up" in bucket_sync_status
-                                ):
-                                    log.info("Sync enabled successfully")
-                                    break
-                                else:
-                                    time.sleep(60)
-                            else:
+                            if not wait_until(
+                                lambda: any(
+                                    state in reusable.check_bucket_sync_status(bkt)
+                                    for state in ("behind", "recovering", "caught up")
+                                ),
+                                f"sync of {bkt} to be enabled",
+                                timeout=600,
+                                raise_on_timeout=False,
+                            ):
                                 raise TestExecError("Bucket did not got disabled")
+                            log.info("Sync enabled successfully")
                         reusable.check_sync_status()
                     # verification of shards after upload
                     if config.test_datalog_trim_command is True:
@@ -992,10 +987,9 @@ def test_exec(config, ssh_con):
 
                 if config.test_ops.get("test_multipart_race_complete_abort"):
                     utils.exec_shell_cmd(f"radosgw-admin gc process --include-all")
-                    log.info(
-                        "sleeping for 10 seconds before verifying objects download"
+                    wait_conditions.wait_for_gc_list_empty(
+                        timeout=120, raise_on_timeout=False
                     )
-                    time.sleep(10)
                     log.info(f"downloading all objects in bucket: {bucket.name}")
                     objects = s3lib.resource_op(
                         {"obj": bucket, "resource": "objects", "args": None}
@@ -1137,7 +1131,6 @@ def test_exec(config, ssh_con):
             )
             out = utils.exec_shell_cmd(cmd)
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(10)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
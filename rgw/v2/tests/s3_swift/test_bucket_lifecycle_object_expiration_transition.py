@@ -1214,11 +1214,11 @@ def test_exec(config, ssh_con):
                 "global", ConfigOpts.rgw_enable_lc_threads, "true", ssh_con
             )
             rgw_service.restart()
-            time.sleep(30)
 
         if config.test_ops.get("delete_bucket_object", False):
             for bucket in buckets:
-                reusable.delete_bucket(bucket)
+                # versions, delete markers and uploads left by the lc rules go too
+                reusable.delete_bucket(bucket, purge=True)
 
         if config.test_ops.get("test_via_rgw_accounts", False) is True:
             log.info("do not remove user")
@@ -45,7 +45,6 @@ import hashlib
 import json
 import logging
 import random
-import time
 import traceback
 import uuid
 
@@ -91,7 +90,6 @@ def test_exec(config, ssh_con):
         reusable.set_dynamic_reshard_ceph_conf(config, ssh_con)
         log.info("trying to restart services")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -28,7 +28,6 @@ import json
 import logging
 import random
 import string
-import time
 import traceback
 import uuid
 
@@ -71,7 +70,6 @@ def test_exec(config, ssh_con):
             ssh_con,
         )
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -105,7 +103,7 @@ def test_exec(config, ssh_con):
     rgw_tenant1_user1_c = tenant1_user1_auth.do_auth_using_client()
     rgw_tenant1_user1_sns_client = tenant1_user1_auth.do_auth_sns_client()
     rgw_tenant2_user1 = tenant2_user1_auth.do_auth()
-    rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client()
+    rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client(private=True)
     rgw_tenant2_user1_sns_client = tenant2_user1_auth.do_auth_sns_client()
     bucket_name1 = utils.gen_bucket_name_from_userid(
         tenant1_user1_info["user_id"], rand_no=1
@@ -106,7 +106,6 @@ def test_exec(config, ssh_con):
         )
         log.info("trying to restart services")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -154,11 +153,11 @@ def test_exec(config, ssh_con):
                 no_of_users_to_create=config.test_ops["users_count"],
             )
             tenant2_user1_auth = Auth(tenant2_user_info[0], ssh_con, ssl=config.ssl)
-            rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client()
+            rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client(private=True)
             tenant2_user2_auth = Auth(tenant2_user_info[1], ssh_con, ssl=config.ssl)
-            rgw_tenant2_user2_c = tenant2_user2_auth.do_auth_using_client()
+            rgw_tenant2_user2_c = tenant2_user2_auth.do_auth_using_client(private=True)
             tenant2_user3_auth = Auth(tenant2_user_info[2], ssh_con, ssl=config.ssl)
-            rgw_tenant2_user3_c = tenant2_user3_auth.do_auth_using_client()
+            rgw_tenant2_user3_c = tenant2_user3_auth.do_auth_using_client(private=True)
             additional_aws_principle += [
                 f"arn:aws:iam::{tenant2}:user/{tenant2_user_info[0]['user_id']}",
                 f"arn:aws:iam::{tenant2}:user/{tenant2_user_info[1]['user_id']}",
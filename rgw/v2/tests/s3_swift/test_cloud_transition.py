@@ -123,8 +123,6 @@ def test_exec(config, ssh_con):
     restart_service = rgw_service.restart(ssh_con)
     if restart_service is False:
         raise TestExecError("RGW service restart failed")
-    log.info("sleep for 20 seconds after RGW service restart")
-    time.sleep(20)
 
     log.info("Applying LC policy to source cluster bucket %s" % (bucket.name))
     bucket_life_cycle = s3lib.resource_op(
@@ -29,6 +29,7 @@ from v2.lib.rgw_config_opts import CephConfOp, ConfigOpts
 from v2.lib.s3.auth import Auth
 from v2.lib.s3.write_io_info import BasicIOInfoStructure, BucketIoInfo, IOInfoInitialize
 from v2.tests.s3_swift import reusable
+from v2.tests.s3_swift.reusables import perf_counters
 from v2.tests.s3cmd import reusable as s3cmd_reusable
 from v2.utils.log import configure_logging
 from v2.utils.test_desc import AddTestInfo
@@ -38,6 +39,38 @@ log = logging.getLogger()
 TEST_DATA_PATH = None
 password = "32characterslongpassphraseneeded".encode("utf-8")
 encryption_key = hashlib.md5(password).hexdigest()
+PERF_COUNTERS_EXPECTED = [
+    "req",
+    "put",
+    "put_initial_lat",
+    "get",
+    "get_initial_lat",
+    "cache_hit",
+    "cache_miss",
+]
+
+
+def put_get_workload(config, ssh_con, duration):
+    """
+    puts and gets small objects for duration seconds, so that every sampled
+    interval has requests for the put and get latency counters
+    """
+    user_info = s3lib.create_users(1)[0]
+    auth = Auth(user_info, ssh_con, ssl=config.ssl)
+    rgw_conn = auth.do_auth()
+    rgw_conn2 = auth.do_auth_using_client()
+    bucket_name = utils.gen_bucket_name_from_userid(user_info["user_id"], rand_no=0)
+    reusable.create_bucket(bucket_name, rgw_conn, user_info)
+    body = b"p" * config.test_ops.get("perf_object_size", 4096)
+    ops = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        key = f"perf-obj-{ops % 100}"
+        rgw_conn2.put_object(Bucket=bucket_name, Key=key, Body=body)
+        rgw_conn2.get_object(Bucket=bucket_name, Key=key)["Body"].read()
+        ops += 1
+    log.info(f"{ops} put/get pairs sent to {bucket_name} in {duration}s")
+    return user_info
 
 
 def test_exec(config, ssh_con):
@@ -48,6 +81,29 @@ def test_exec(config, ssh_con):
         log.info(f"ssh conn is {ssh_con}")
         reusable.get_perf_dump(ssh_con=ssh_con)
 
+    if config.test_ops.get("sample_perf_counters", False):
+        # sample every rgw daemon of the node under a put/get workload, then
+        # check that the counters are there and the latencies did not regress
+        sampler = perf_counters.PerfCounterSampler(
+            {"rgw": ssh_con},
+            interval=config.test_ops.get("perf_sample_interval", 5),
+        )
+        with sampler:
+            user_info = put_get_workload(
+                config, ssh_con, config.test_ops.get("perf_sample_duration", 60)
+            )
+        sampler.assert_counters_available(
+            config.test_ops.get("perf_counters", PERF_COUNTERS_EXPECTED)
+        )
+        sampler.log_summary()
+        sampler.write_summary()
+        baseline = config.test_ops.get("perf_baseline_summary")
+        if baseline:
+            baseline = perf_counters.load_summary(baseline)
+            for counter in ("put_initial_lat", "get_initial_lat"):
+                sampler.assert_latency_not_regressed(counter, baseline)
+        reusable.remove_user(user_info)
+
 
 if __name__ == "__main__":
     test_info = AddTestInfo("Testing Perf counter availability")
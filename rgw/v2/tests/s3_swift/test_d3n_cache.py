@@ -96,7 +96,6 @@ def test_exec(config, ssh_con):
             set_to_all=True,
         )
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
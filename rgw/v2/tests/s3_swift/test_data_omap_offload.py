@@ -76,7 +76,6 @@ def test_exec(config, ssh_con):
                 "restart the rgw daemons and sleep of 30secs for rgw daemon to be up "
             )
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -51,7 +51,7 @@ import traceback
 import v2.lib.manage_data as manage_data
 import v2.lib.resource_op as s3lib
 import v2.utils.utils as utils
-from v2.lib.exceptions import RGWBaseException, TestExecError
+from v2.lib.exceptions import RGWBaseException, TestExecError, WaitTimeoutError
 from v2.lib.resource_op import Config
 from v2.lib.rgw_config_opts import CephConfOp, ConfigOpts
 from v2.lib.s3.auth import Auth
@@ -59,9 +59,11 @@ from v2.lib.s3.write_io_info import BasicIOInfoStructure, BucketIoInfo, IOInfoIn
 from v2.tests.s3_swift import reusable
 from v2.tests.s3_swift.reusables import quota_management as quota_mgmt
 from v2.tests.s3cmd import reusable as s3cmd_reusable
+from v2.utils import wait_conditions
 from v2.utils.log import configure_logging
 from v2.utils.test_desc import AddTestInfo
 from v2.utils.utils import HttpResponseParser, RGWService
+from v2.utils.waiter import wait_until
 
 log = logging.getLogger()
 
@@ -136,7 +138,6 @@ def test_exec(config, ssh_con):
         log.info(f"num_shards_expected: {num_shards_expected}")
     log.info("trying to restart services ")
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -328,7 +329,6 @@ def test_exec(config, ssh_con):
             ssh_con,
         )
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -346,8 +346,13 @@ def test_exec(config, ssh_con):
                 Bucket=bucket.name,
                 Key=s3_obj_name,
             )
-        log.info(f"wait for 5 minutes for downshard to trigger")
-        time.sleep(310)
+        log.info(f"wait for downshard to trigger")
+        try:
+            wait_conditions.wait_for_num_shards(
+                bucket.name, lambda n: n < 50, "below 50", timeout=600
+            )
+        except WaitTimeoutError:
+            raise TestExecError("Downshard unsuccessful, num shards is till at 50")
         json_doc = json.loads(
             utils.exec_shell_cmd(f"radosgw-admin bucket stats --bucket {bucket.name}")
         )
@@ -355,10 +360,7 @@ def test_exec(config, ssh_con):
         num_shards_present = json_doc["num_shards"]
         log.info(f"number of shards at present: {num_shards_present}")
         verification = False
-        if num_shards_present < 50:
-            log.info("Downshard has happened to less than 50")
-        else:
-            raise TestExecError("Downshard unsuccessful, num shards is till at 50")
+        log.info("Downshard has happened to less than 50")
 
     if config.test_ops.get("bucket_chown", False) is True:
         log.info("Create new user and change bucket ownership")
@@ -432,12 +434,28 @@ def test_exec(config, ssh_con):
             raise TestExecError("manual resharding command execution failed")
 
     if verification:
-        log.info(
-            "the sleep time chosen is 180 sec owing to the value of reshard_thread_interval"
+
+        def resharded():
+            num_shards = wait_conditions.bucket_num_shards(bucket.name)
+            log.info(f"no_of_shards at present: {num_shards}")
+            if config.sharding_type == "manual":
+                return num_shards == config.shards
+            if config.sharding_type == "dynamic":
+                queued = json.loads(utils.exec_shell_cmd("radosgw-admin reshard list"))
+                return int(num_shards) >= int(num_shards_expected) and not any(
+                    each["bucket_name"] == bucket.name for each in queued
+                )
+            return True
+
+        # the checks below report a timeout, the resharding is polled for up
+        # to a few reshard_thread_intervals
+        wait_until(
+            resharded,
+            f"resharding of {bucket.name}",
+            timeout=600,
+            interval=5,
+            raise_on_timeout=False,
         )
-        sleep_time = 180
-        log.info(f"verification starts after waiting for {sleep_time} seconds")
-        time.sleep(sleep_time)
         json_doc = json.loads(
             utils.exec_shell_cmd(f"radosgw-admin bucket stats --bucket {bucket.name}")
         )
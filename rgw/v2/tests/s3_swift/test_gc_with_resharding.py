@@ -21,7 +21,6 @@ import sys
 sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import logging
-import time
 import traceback
 
 import v2.lib.resource_op as s3lib
@@ -61,7 +60,6 @@ def test_exec(config, ssh_con):
             "global", ConfigOpts.rgw_crypt_require_ssl, "false", ssh_con
         )
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -90,10 +88,8 @@ def test_exec(config, ssh_con):
         str(config.rgw_gc_obj_min_wait),
         ssh_con,
     )
-    sleep_time = 10
-    log.info(f"Restarting RGW service and waiting for {sleep_time} seconds")
+    log.info("Restarting RGW service")
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(sleep_time)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -14,7 +14,6 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import json
 import logging
-import time
 import traceback
 
 import v2.lib.resource_op as s3lib
@@ -62,8 +61,6 @@ def test_exec(config, ssh_con):
     restart_service = rgw_service.restart(ssh_con)
     if restart_service is False:
         raise TestExecError("RGW service restart failed")
-    log.info("sleep for 20 seconds after RGW service restart")
-    time.sleep(20)
 
     # perform s3 operations
     all_users_info = s3lib.create_users(config.user_count)
@@ -141,8 +138,6 @@ def test_exec(config, ssh_con):
     restart_service = rgw_service.restart(ssh_con)
     if restart_service is False:
         raise TestExecError("RGW service restart failed")
-    log.info("sleep for 20 seconds after RGW service restart")
-    time.sleep(20)
 
     # check for any crashes during the execution
     crash_info = reusable.check_for_crash()
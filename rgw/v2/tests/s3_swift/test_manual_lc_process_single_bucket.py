@@ -20,7 +20,6 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import json
 import logging
-import time
 
 import v2.lib.resource_op as s3lib
 import v2.utils.utils as utils
@@ -30,6 +29,7 @@ from v2.lib.s3.auth import Auth
 from v2.lib.s3.write_io_info import BasicIOInfoStructure, IOInfoInitialize
 from v2.tests.s3_swift import reusable
 from v2.tests.s3cmd import reusable as s3cmd_reusable
+from v2.utils import wait_conditions
 from v2.utils.log import configure_logging
 from v2.utils.test_desc import AddTestInfo
 
@@ -95,7 +95,9 @@ def test_exec(config, ssh_con):
         log.info(f"lc lists before lc process is {lc_list_op_before}")
 
         utils.exec_shell_cmd(f"radosgw-admin lc process --bucket {buckets[0]}")
-        time.sleep(60)
+        wait_conditions.wait_for_lc_done(
+            buckets[0], timeout=300, raise_on_timeout=False
+        )
         lc_list_op_after = json.loads(utils.exec_shell_cmd("radosgw-admin lc list"))
         log.info(f"lc lists after lc process is {lc_list_op_after}")
         completed_bucket = 0
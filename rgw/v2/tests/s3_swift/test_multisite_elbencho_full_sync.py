@@ -59,6 +59,7 @@ from v2.lib.resource_op import Config
 from v2.lib.s3.auth import Auth
 from v2.lib.s3.write_io_info import BasicIOInfoStructure, BucketIoInfo, IOInfoInitialize
 from v2.tests.s3_swift import reusable
+from v2.tests.s3_swift.reusables import perf_counters
 from v2.tests.s3_swift.reusables import rgw_s3_elbencho as elbencho
 from v2.tests.s3cmd import reusable as s3cmd_reusable
 from v2.utils.log import configure_logging
@@ -358,6 +359,8 @@ def test_exec(config, ssh_con):
         "objects_per_bucket", 1300000
     )  # Default/fallback
     threads = config.test_ops.get("threads", 200)
+    # seconds between bucket stats cycles of the throughput recorder
+    stats_interval = config.test_ops.get("bucket_stats_interval", 30)
 
     # Per-scenario object counts (with fallback to global objects_per_bucket)
     scenario1_objects = config.test_ops.get(
@@ -376,6 +379,17 @@ def test_exec(config, ssh_con):
         "scenario5_objects_per_bucket", objects_per_bucket
     )
 
+    # Sample the rgw perf counters of both sites across all scenarios
+    perf_sampler = None
+    if config.test_ops.get("sample_perf_counters", False):
+        perf_hosts = {"local": None}
+        if secondary_ssh_con is not None:
+            perf_hosts["secondary"] = secondary_ssh_con
+        perf_sampler = perf_counters.PerfCounterSampler(
+            perf_hosts, interval=config.test_ops.get("perf_sample_interval", 30)
+        )
+        perf_sampler.start()
+
     # Track scenario results
     scenario_results = {
         "scenario1": {"status": "SKIPPED", "error": None},
@@ -389,6 +403,7 @@ def test_exec(config, ssh_con):
     # SCENARIO 1: Full sync with 1 bucket and 1.3M objects
     # =============================================================================
     if config.test_ops.get("run_scenario1", True):
+        recorder = None
         try:
             log.info("\n" + "=" * 100)
             log.info("SCENARIO 1: Full sync with 1 bucket and 1.3M objects/bucket")
@@ -430,6 +445,12 @@ def test_exec(config, ssh_con):
             scenario_buckets["scenario1"].append(bucket_name)
             log.info(f"✓ Created bucket: {bucket_name}\n")
 
+            # Record bucket stats on both zones from the upload on, for the
+            # ingest and sync throughput curves
+            recorder = scale_sync_test.start_bucket_stats_recorder(
+                scenario_buckets["scenario1"], secondary_ssh_con, stats_interval
+            )
+
             # Upload objects to primary
             log.info(f"STEP 3: Uploading {scenario1_objects} objects to primary")
             scale_sync_test.run_elbencho_with_size_distribution(
@@ -455,8 +476,10 @@ def test_exec(config, ssh_con):
             # Verify sync
             log.info("STEP 5: Verifying sync using bucket stats")
             time.sleep(60)  # Initial wait for sync to start
+            # the sync verification records on with every round it polls
+            recorder.stop()
             scale_sync_test.verify_sync_using_bucket_stats(
-                scenario_buckets["scenario1"], secondary_ssh_con
+                scenario_buckets["scenario1"], secondary_ssh_con, recorder=recorder
             )
             log.info("✅ SCENARIO 1 COMPLETED SUCCESSFULLY\n")
             scenario_results["scenario1"]["status"] = "PASSED"
@@ -465,11 +488,16 @@ def test_exec(config, ssh_con):
             scenario_results["scenario1"]["status"] = "FAILED"
             scenario_results["scenario1"]["error"] = str(e)
             # Continue to next scenario
+        if recorder is not None:
+            scenario_results["scenario1"][
+                "throughput"
+            ] = scale_sync_test.save_bucket_stats_recording(recorder, "scenario1")
 
     # =============================================================================
     # SCENARIO 2: Full sync with 5 buckets and 1.3M objects each
     # =============================================================================
     if config.test_ops.get("run_scenario2", True):
+        recorder = None
         try:
             log.info("\n" + "=" * 100)
             log.info("SCENARIO 2: Full sync with 5 buckets and 1.3M objects/bucket")
@@ -513,6 +541,12 @@ def test_exec(config, ssh_con):
                 log.info(f"  Created bucket: {bucket_name}")
             log.info(f"✓ Created {len(scenario_buckets['scenario2'])} buckets\n")
 
+            # Record bucket stats on both zones from the upload on, for the
+            # ingest and sync throughput curves
+            recorder = scale_sync_test.start_bucket_stats_recorder(
+                scenario_buckets["scenario2"], secondary_ssh_con, stats_interval
+            )
+
             # Upload objects to primary
             log.info(
                 f"STEP 3: Uploading {scenario2_objects} objects per bucket to primary"
@@ -540,8 +574,10 @@ def test_exec(config, ssh_con):
             # Verify sync
             log.info("STEP 5: Verifying sync using bucket stats")
             time.sleep(60)  # Initial wait for sync to start
+            # the sync verification records on with every round it polls
+            recorder.stop()
             scale_sync_test.verify_sync_using_bucket_stats(
-                scenario_buckets["scenario2"], secondary_ssh_con
+                scenario_buckets["scenario2"], secondary_ssh_con, recorder=recorder
             )
             log.info("✅ SCENARIO 2 COMPLETED SUCCESSFULLY\n")
             scenario_results["scenario2"]["status"] = "PASSED"
@@ -550,11 +586,16 @@ def test_exec(config, ssh_con):
             scenario_results["scenario2"]["status"] = "FAILED"
             scenario_results["scenario2"]["error"] = str(e)
             # Continue to next scenario
+        if recorder is not None:
+            scenario_results["scenario2"][
+                "throughput"
+            ] = scale_sync_test.save_bucket_stats_recording(recorder, "scenario2")
 
     # =============================================================================
     # SCENARIO 3: Full sync with 5 versioned buckets, 1.3M objects, 10 versions each
     # =============================================================================
     if config.test_ops.get("run_scenario3", True):
+        recorder = None
         try:
             log.info("\n" + "=" * 100)
             log.info(
@@ -606,6 +647,12 @@ def test_exec(config, ssh_con):
                 f"✓ Created {len(scenario_buckets['scenario3'])} versioned buckets\n"
             )
 
+            # Record bucket stats on both zones from the upload on, for the
+            # ingest and sync throughput curves
+            recorder = scale_sync_test.start_bucket_stats_recorder(
+                scenario_buckets["scenario3"], secondary_ssh_con, stats_interval
+            )
+
             # Upload 10 versions of objects to primary
             log.info(
                 f"STEP 3: Uploading {scenario3_objects} objects with 10 versions each to primary"
@@ -633,8 +680,10 @@ def test_exec(config, ssh_con):
             # Verify sync
             log.info("STEP 5: Verifying sync using bucket stats")
             time.sleep(60)  # Initial wait for sync to start
+            # the sync verification records on with every round it polls
+            recorder.stop()
             scale_sync_test.verify_sync_using_bucket_stats(
-                scenario_buckets["scenario3"], secondary_ssh_con
+                scenario_buckets["scenario3"], secondary_ssh_con, recorder=recorder
             )
             log.info("✅ SCENARIO 3 COMPLETED SUCCESSFULLY\n")
             scenario_results["scenario3"]["status"] = "PASSED"
@@ -643,6 +692,10 @@ def test_exec(config, ssh_con):
             scenario_results["scenario3"]["status"] = "FAILED"
             scenario_results["scenario3"]["error"] = str(e)
             # Continue to next scenario
+        if recorder is not None:
+            scenario_results["scenario3"][
+                "throughput"
+            ] = scale_sync_test.save_bucket_stats_recording(recorder, "scenario3")
 
     # =============================================================================
     # SCENARIO 4: LC DELETE - Full sync with 5 versioned buckets (10 versions → delete all)
@@ -816,6 +869,7 @@ def test_exec(config, ssh_con):
     # SCENARIO 5: Full sync with 1 bucket and special character object names (boto3)
     # =============================================================================
     if config.test_ops.get("run_scenario5", True):
+        recorder = None
         try:
             log.info("\n" + "=" * 100)
             log.info(
@@ -860,6 +914,12 @@ def test_exec(config, ssh_con):
             scenario_buckets["scenario5"].append(bucket_name)
             log.info(f"✓ Created bucket: {bucket_name}\n")
 
+            # Record bucket stats on both zones from the upload on, for the
+            # ingest and sync throughput curves
+            recorder = scale_sync_test.start_bucket_stats_recorder(
+                scenario_buckets["scenario5"], secondary_ssh_con, stats_interval
+            )
+
             # Upload objects with special characters using boto3
             log.info(
                 f"STEP 3: Uploading {scenario5_objects:,} objects with special character names to primary"
@@ -886,8 +946,10 @@ def test_exec(config, ssh_con):
             # Verify sync
             log.info("STEP 5: Verifying sync using bucket stats")
             time.sleep(60)  # Initial wait for sync to start
+            # the sync verification records on with every round it polls
+            recorder.stop()
             scale_sync_test.verify_sync_using_bucket_stats(
-                scenario_buckets["scenario5"], secondary_ssh_con
+                scenario_buckets["scenario5"], secondary_ssh_con, recorder=recorder
             )
             log.info("✅ SCENARIO 5 COMPLETED SUCCESSFULLY\n")
             scenario_results["scenario5"]["status"] = "PASSED"
@@ -896,6 +958,10 @@ def test_exec(config, ssh_con):
             scenario_results["scenario5"]["status"] = "FAILED"
             scenario_results["scenario5"]["error"] = str(e)
             # Continue to final checks
+        if recorder is not None:
+            scenario_results["scenario5"][
+                "throughput"
+            ] = scale_sync_test.save_bucket_stats_recording(recorder, "scenario5")
 
     # =============================================================================
     # SCENARIO RESULTS SUMMARY
@@ -919,6 +985,11 @@ def test_exec(config, ssh_con):
         log.info(f"{status_icon} {scenario.upper()}: {result['status']}")
         if result["error"]:
             log.info(f"   Error: {result['error']}")
+        for zone, each in result.get("throughput", {}).items():
+            log.info(
+                f"   {zone} {each['kind']}: {each['avg_rate']:.1f} objects/s avg, "
+                f"{each['peak_rate']:.1f} peak"
+            )
 
         if result["status"] == "PASSED":
             passed_count += 1
@@ -933,6 +1004,11 @@ def test_exec(config, ssh_con):
     )
     log.info(f"{'='*100}\n")
 
+    if perf_sampler is not None:
+        perf_sampler.stop()
+        perf_sampler.log_summary()
+        perf_sampler.write_summary()
+
     # =============================================================================
     # FINAL HEALTH CHECKS
     # =============================================================================
@@ -18,7 +18,6 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import json
 import logging
-import time
 import traceback
 
 import botocore.exceptions as boto3exception
@@ -84,7 +83,7 @@ def test_exec(config, ssh_con):
     tenant2_user1_auth = Auth(tenant2_user1_info, ssh_con, ssl=config.ssl)
     tenant2_user2_auth = Auth(tenant2_user2_info, ssh_con, ssl=config.ssl)
     rgw_tenant2_user1 = tenant2_user1_auth.do_auth()
-    rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client()
+    rgw_tenant2_user1_c = tenant2_user1_auth.do_auth_using_client(private=True)
     rgw_tenant2_user2 = tenant2_user2_auth.do_auth()
     rgw_tenant2_user2_c = tenant2_user2_auth.do_auth_using_client()
 
@@ -102,7 +101,6 @@ def test_exec(config, ssh_con):
         f"ceph config set client.{rgw_service_name} rgw_torrent_flag true"
     )
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(20)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     log.info("RGW Torrent flag enabled and service restarted")
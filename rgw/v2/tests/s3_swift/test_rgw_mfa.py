@@ -43,7 +43,6 @@ def test_exec(config, ssh_con):
             "global", ConfigOpts.rgw_crypt_require_ssl, "false", ssh_con
         )
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -9,7 +9,9 @@ Operation:
     create user, bucket
     create csv object and upload it
     generate queries with/without expected result
-    execute the queries and check for rgw crashes and validate the results
+    execute the queries, query_parallelism of them at a time, and check for
+    rgw crashes and validate the results
+    log the per query latency table, see reusables/s3select_benchmark.py
 """
 
 import os
@@ -25,6 +27,7 @@ import traceback
 
 import v2.lib.resource_op as s3lib
 import v2.tests.s3_swift.reusables.s3select as s3select
+import v2.tests.s3_swift.reusables.s3select_benchmark as s3select_benchmark
 import v2.tests.s3_swift.reusables.s3select_query_generation as query_generation
 import v2.utils.utils as utils
 import yaml
@@ -72,20 +75,17 @@ def test_exec(config, ssh_con):
                 # create objects
                 if config.test_ops.get("object_type") == "csv":
                     # uploading data
-                    csv_matrix, csv_string = s3select.create_csv_object(
-                        row_count=30,
-                        column_count=4,
-                        column_data_types=["int", "float", "string", "timestamp"],
-                    )
                     s3_object_name = f"Key_{bucket_name}_csv"
                     s3_object_path = os.path.join(TEST_DATA_PATH, s3_object_name)
-                    with open(s3_object_path, "w") as fp:
-                        fp.write(csv_string)
-
-                    response = rgw_s3_client.put_object(
-                        Bucket=bucket_name, Key=s3_object_name, Body=csv_string
+                    dataset_info = s3select.upload_csv_object(
+                        rgw_s3_client,
+                        bucket_name,
+                        s3_object_name,
+                        row_count=config.test_ops.get("row_count", 30),
+                        column_data_types=["int", "float", "string", "timestamp"],
+                        seed=config.test_ops.get("dataset_seed"),
                     )
-                    log.info(f"upload object response: {response}")
+                    log.info(f"uploaded csv object: {dataset_info}")
 
                     input_serialization = {
                         "CSV": {
@@ -104,11 +104,12 @@ def test_exec(config, ssh_con):
                     log.info(f"s3 object name: {s3_object_name}")
                     s3_object_path = os.path.join(TEST_DATA_PATH, s3_object_name)
                     log.info(f"s3 object path: {s3_object_path}")
-                    dataset_dict = s3select.create_parquet_object(
+                    dataset_info = s3select.create_parquet_object(
                         parquet_obj_path=s3_object_path,
-                        row_count=30,
+                        row_count=config.test_ops.get("row_count", 30),
                         column_count=4,
                         column_data_types=["int", "float", "string", "timestamp"],
+                        seed=config.test_ops.get("dataset_seed"),
                     )
 
                     response = rgw_s3_client.upload_file(
@@ -130,27 +131,31 @@ def test_exec(config, ssh_con):
 
                 log.info(input_serialization)
 
-                for query in queries["queries"]:
-                    try:
-                        log.info(f"Executing query{query['id']}: {query['query']}")
-                        result = s3select.execute_s3select_query(
-                            rgw_s3_client,
-                            bucket_name,
-                            s3_object_name,
-                            query["query"],
-                            input_serialization,
-                            output_serialization,
-                        )
-                        log.info(f"Result: {result}\n")
-                        query["result"] = result
-                        query["status"] = "pass"
-                    except botocore.exceptions.ClientError as e:
-                        log.error(e)
-                        query["exception"] = e
-                        query["status"] = "fail"
-                        crash_info = reusable.check_for_crash()
-                        if crash_info:
-                            raise TestExecError("ceph daemon crash found!")
+                perf_rows = s3select_benchmark.run_query_set(
+                    rgw_s3_client,
+                    bucket_name,
+                    s3_object_name,
+                    queries["queries"],
+                    input_serialization,
+                    output_serialization,
+                    parallelism=config.test_ops.get("query_parallelism", 1),
+                    max_result_bytes=config.test_ops.get(
+                        "query_result_bytes", s3select_benchmark.S3SELECT_RESULT_BYTES
+                    ),
+                )
+                s3select_benchmark.log_query_table(perf_rows)
+                if config.test_ops.get("query_report"):
+                    s3select_benchmark.write_query_report(
+                        perf_rows, config.test_ops["query_report"]
+                    )
+                if config.test_ops.get("query_baseline_report"):
+                    s3select_benchmark.compare_query_reports(
+                        config.test_ops["query_baseline_report"], perf_rows
+                    )
+                if any(row["status"] == "fail" for row in perf_rows):
+                    crash_info = reusable.check_for_crash()
+                    if crash_info:
+                        raise TestExecError("ceph daemon crash found!")
 
                 # writing queries output to yaml file
                 log.info(f"writing queries output to yaml file: {s3_queries_path}")
@@ -92,7 +92,7 @@ def test_exec(config, ssh_con):
                 log.info(
                     f"Creating parquet object with {row_count} rows for multipart upload"
                 )
-                dataset_dict = s3select.create_parquet_object(
+                dataset_info = s3select.create_parquet_object(
                     parquet_obj_path=s3_object_path,
                     row_count=row_count,
                     column_count=4,
@@ -100,7 +100,7 @@ def test_exec(config, ssh_con):
                 )
 
                 # Get file size to verify it's large enough for multipart
-                file_size = os.path.getsize(s3_object_path)
+                file_size = dataset_info["size"]
                 log.info(
                     f"Parquet file size: {file_size} bytes ({file_size / (1024*1024):.2f} MB)"
                 )
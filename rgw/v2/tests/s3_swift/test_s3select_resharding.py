@@ -82,7 +82,7 @@ def test_exec(config, ssh_con):
                         config.obj_size = size
                         s3_object_name = utils.gen_s3_object_name(bucket_name, oc)
                         s3_object_path = os.path.join(TEST_DATA_PATH, s3_object_name)
-                        dataset_dict = s3select.create_parquet_object(
+                        dataset_info = s3select.create_parquet_object(
                             parquet_obj_path=s3_object_path,
                             row_count=30,
                             column_count=4,
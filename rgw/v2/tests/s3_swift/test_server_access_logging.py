@@ -72,7 +72,6 @@ def test_exec(config, ssh_con):
         reusable.set_dynamic_reshard_ceph_conf(config, ssh_con)
         log.info("trying to restart services")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -255,19 +254,16 @@ def test_exec(config, ssh_con):
                     objects_list = reusable.list_bucket_objects(
                         rgw_s3_client, dest_bucket_name
                     )
-                    total_log_records = []
-                    for obj in objects_list:
-                        key = obj["Key"]
-                        if key == flushed_log_object_name:
-                            response = rgw_s3_client.get_object(
-                                Bucket=dest_bucket_name, Key=key
-                            )
-                            content = response["Body"].read().decode("utf-8").strip()
-                            obj_records = content.split("\n")
-                            total_log_records.extend(obj_records)
-                            break
+                    keys = [
+                        obj["Key"]
+                        for obj in objects_list
+                        if obj["Key"] == flushed_log_object_name
+                    ]
+                    log_index = bkt_logging.fetch_log_records(
+                        rgw_s3_client, dest_bucket_name, keys
+                    )
                     bkt_logging.verify_operation_name_in_logs(
-                        total_log_records, operations_performed
+                        log_index, operations_performed
                     )
                 else:
                     # create objects
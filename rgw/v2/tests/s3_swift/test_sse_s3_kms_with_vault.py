@@ -33,7 +33,6 @@ import hashlib
 import json
 import logging
 import random
-import time
 import traceback
 import uuid
 
@@ -133,7 +132,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -237,15 +235,6 @@ def test_exec(config, ssh_con):
                         sse_s3.get_object_encryption(
                             s3_client, bucket_name_to_create, s3_object_name
                         )
-                        if oc == 0 and config.test_ops.get(
-                            "download_object_at_remote_site", False
-                        ):
-                            log.info(f"the object count is {oc}")
-                            log.info(
-                                "Wait for sync lease to catch up on the remote site."
-                            )
-                            time.sleep(1200)
-
                         if config.test_ops.get("download_object", False):
                             reusable.download_object(
                                 s3_object_name,
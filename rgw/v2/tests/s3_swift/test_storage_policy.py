@@ -20,7 +20,6 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import json
 import logging
-import time
 import traceback
 
 import v2.lib.manage_data as manage_data
@@ -143,7 +142,6 @@ def test_exec(config, ssh_con):
     restarted = rgw_service.restart(ssh_con)
     if restarted is False:
         raise TestExecError("service restart failed")
-    time.sleep(30)
 
     rgw_client = config.test_ops["rgw_client"]
     if rgw_client == "s3":
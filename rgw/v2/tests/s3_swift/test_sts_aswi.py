@@ -120,7 +120,6 @@ def test_exec(config, ssh_con):
     else:
         srv_restarted = rgw_service.restart(None)
 
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -37,7 +37,6 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../..")))
 import argparse
 import json
 import logging
-import time
 import traceback
 
 import v2.lib.resource_op as s3lib
@@ -90,7 +89,6 @@ def test_exec(config, ssh_con):
             ssh_con,
         )
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
     else:
@@ -36,8 +36,6 @@ Operation:
     Functionality with swift user with read, write, readwrite access
 """
 
-import glob
-
 # test swift basic ops
 import os
 import sys
@@ -65,6 +63,7 @@ from v2.lib.s3.auth import Auth as s3_auth
 from v2.lib.s3.write_io_info import BasicIOInfoStructure, BucketIoInfo, IOInfoInitialize
 from v2.lib.s3cmd import auth as s3cmd_auth
 from v2.lib.swift.auth import Auth
+from v2.lib.swift.large_object import SEGMENT_UPLOAD_WORKERS, SwiftLargeObjectUploader
 from v2.tests.s3_swift import reusable
 from v2.tests.s3cmd import reusable as s3cmd_reusable
 from v2.utils.log import configure_logging
@@ -101,35 +100,28 @@ def fill_container(
     data_info = manage_data.io_generator(object_path, size)
     # upload object
     if multipart == True:
-        mp_dir = os.path.join(TEST_DATA_PATH, swift_object_name + ".mp.parts")
-        log.info(f"mp part dir: {mp_dir}")
-        log.info("making multipart object part dir")
-        mkdir = utils.exec_shell_cmd("sudo mkdir %s" % mp_dir)
-        if mkdir is False:
-            raise TestExecError("mkdir failed creating mp_dir_name")
-        utils.split_file(object_path, split_size, mp_dir + "/")
-        parts_list = sorted(glob.glob(mp_dir + "/" + "*"))
-        log.info("parts_list: %s" % parts_list)
-        log.info("no of parts: %s" % len(parts_list))
-        for each_part in parts_list:
-            log.info("trying to upload part: %s" % each_part)
-            with open(each_part, "r") as fp:
-                etag = rgw.put_object(
-                    container_name,
-                    swift_object_name + "/" + each_part,
-                    contents=fp.read(),
-                    content_type="text/plain",
-                    headers=header,
-                )
-
-        if config.local_file_delete is True:
-            log.info("Remove local multipart object part dir")
-            rmdir = utils.exec_shell_cmd(f"sudo rm -rf {mp_dir}")
-            if rmdir is False:
-                raise TestExecError(
-                    f"Failed removing local multipart object part dir: {rmdir}"
-                )
-
+        if data_info is False:
+            raise TestExecError("data creation failed")
+        # segments are read from the object file and uploaded concurrently,
+        # the DLO manifest prefix is swift_object_name/
+        uploader = SwiftLargeObjectUploader(
+            rgw,
+            container_name,
+            segment_size=split_size * 1024 * 1024,
+            workers=config.test_ops.get(
+                "segment_upload_workers", SEGMENT_UPLOAD_WORKERS
+            ),
+        )
+        result = uploader.upload_segments(
+            object_path,
+            swift_object_name + "/",
+            headers=header,
+            resume=config.test_ops.get("resume_segment_upload", False),
+            content_type="text/plain",
+        )
+        log.info("no of parts: %s" % len(result.segments))
+        if str(result.md5) != str(data_info["md5"]):
+            raise TestExecError("md5 mismatch between the segments and the object")
         return swift_object_name
     else:
         if data_info is False:
@@ -206,7 +198,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -309,7 +300,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -608,7 +598,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -687,7 +676,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -812,7 +800,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
             if srv_restarted is False:
                 raise TestExecError("RGW service restart failed")
             else:
@@ -866,7 +853,6 @@ def test_exec(config, ssh_con):
             )
             log.info("trying to restart services ")
             srv_restarted = rgw_service.restart(ssh_con)
-            time.sleep(30)
 
         else:
             container_name = utils.gen_bucket_name_from_userid(
@@ -155,7 +155,7 @@ def test_exec(config, ssh_con):
     log.info("--- Errors ---")
     log.info(stderr.read().decode())
 
-    rgw_secondary.close()
+    # rgw_secondary is shared through the ssh pool, which closes it at exit
     log.info("Done.")
     crash_info = reusable.check_for_crash()
     if crash_info:
@@ -26,6 +26,7 @@ from v2.lib.exceptions import (
     TestExecError,
 )
 from v2.lib.manage_data import io_generator
+from v2.lib.ratelimit_probe import RateLimitProbe, check_limit
 from v2.lib.s3cmd.resource_op import S3CMD
 from v2.utils import utils
 from v2.utils.utils import RGWService, exec_shell_cmd
@@ -313,7 +314,6 @@ def rgw_service_restart(ssh_con):
     log.info("trying to restart services")
     rgw_service = RGWService()
     srv_restarted = rgw_service.restart(ssh_con)
-    time.sleep(30)
     if srv_restarted is False:
         raise TestExecError("RGW service restart failed")
 
@@ -383,128 +383,75 @@ def rate_limit_set_enable(
     log.info(f"Rate limits set and enabled on {scope}")
 
 
+def rate_limit_probe(bucket, op, max_ops, ssl=None, key=None, object_size=1024):
+    """
+    Sends max_ops + 1 requests of op to the bucket on an open-loop schedule and
+    asserts the last ones are throttled with a 503
+    :param bucket: bucket, a tenant/bucket name is reduced to the bucket
+    :param op: read, write, list or delete
+    :param max_ops: the limit, max_ops + 1 requests are sent
+    :param ssl: Use SSL
+    :param key: object to read, or key prefix of the writes and deletes
+    :return: report of the probe
+    """
+    probe = RateLimitProbe.from_s3cfg(bucket, ssl)
+    result = probe.run(op, count=max_ops + 1, key=key, object_size=object_size)
+    violations = check_limit(result, max_ops)
+    assert result.throttled, "Rate limit slowdown not observed, failing!"
+    if violations:
+        log.warning(f"rate limit {op}: {violations}")
+    return result.report()
+
+
 def rate_limit_read(bucket, max_read_ops, ssl=None, file=None):
     """
-    max_read_ops: Loop until the max_read_ops value to check for a 503
+    max_read_ops: Send max_read_ops + 1 reads to check for a 503
     slowdown warning
     """
-    # increment max_read_ops to induce warning
-    if "/" in bucket:
-        bucket = bucket.split("/")[1]
-    max_read_ops += 1
-    range_val = f"1..{max_read_ops}"
-    if ssl:
-        ssl_param = "-s"
-    else:
-        ssl_param = ""
-    cmd = (
-        f"for i in {{{range_val}}}; do /home/cephuser/venv/bin/s3cmd ls "
-        f"s3://{bucket}/{file} {ssl_param};done;"
-    )
-    stdout, stderr = run_subprocess(cmd)
-    assert "503" in str(stderr), "Rate limit slowdown not observed, failing!"
+    return rate_limit_probe(bucket, "read", max_read_ops, ssl, key=file)
 
 
 def rate_limit_write(bucket, max_write_ops, ssl=None):
     """
     :param bucket: bucket to write
-    :param max_write_ops: Loop until the max write opsto check for 503
-    :param file: file to write
-    """
-    # increment max_write_ops to induce warning
-    if "/" in bucket:
-        bucket = bucket.split("/")[1]
-    max_write_ops += 1
-    create_local_file("1k", "file1")
-    range_val = f"1..{max_write_ops}"
-    if ssl:
-        ssl_param = "-s"
-    else:
-        ssl_param = ""
-    cmd = (
-        f"for i in {{{range_val}}}; do /home/cephuser/venv/bin/s3cmd "
-        f"put file1 s3://{bucket}/file$i {ssl_param};done;"
-    )
-    stdout, stderr = run_subprocess(cmd)
-    assert "503" in str(stderr), "Rate limit slowdown not observed, failing!"
+    :param max_write_ops: Send max_write_ops + 1 1k writes to check for 503
+    """
+    return rate_limit_probe(bucket, "write", max_write_ops, ssl, key="file")
 
 
 def debt_ratelimit(bucket, debt_limit, ssl=None):
     """
     :param bucket: bucket to write
-    :param debt_limit: data to write to test the debt limit
+    :param debt_limit: data to write to test the debt limit, in kb
     """
-    if "/" in bucket:
-        bucket = bucket.split("/")[1]
-    create_local_file(str(debt_limit) + "k", "file2")
-    if ssl:
-        ssl_param = "-s"
-    else:
-        ssl_param = ""
-    cmd = f"/home/cephuser/venv/bin/s3cmd put file2 s3://{bucket}/file1 {ssl_param}"
-    stdout, stderr = run_subprocess(cmd)
-    assert "503" not in str(stderr), "Rate limit slowdown observed, failing!"
+    probe = RateLimitProbe.from_s3cfg(bucket, ssl)
+    result = probe.run("write", count=1, key="file", object_size=debt_limit * 1024)
+    result.log_report()
+    assert not result.throttled, "Rate limit slowdown observed, failing!"
 
 
 def rate_limit_list(bucket, max_list_ops, ssl=None):
     """
     Test LIST operations rate limit enforcement
     :param bucket: bucket to list
-    :param max_list_ops: Loop until the max_list_ops value to check for a 503
-    :param ssl: Use SSL for s3cmd commands
-    """
-    # increment max_list_ops to induce warning
-    if "/" in bucket:
-        bucket = bucket.split("/")[1]
-    max_list_ops += 1
-    range_val = f"1..{max_list_ops}"
-    if ssl:
-        ssl_param = "-s"
-    else:
-        ssl_param = ""
-    cmd = (
-        f"for i in {{{range_val}}}; do /home/cephuser/venv/bin/s3cmd ls "
-        f"s3://{bucket}/ {ssl_param};done;"
-    )
-    stdout, stderr = run_subprocess(cmd)
-    assert "503" in str(stderr), "Rate limit slowdown not observed, failing!"
+    :param max_list_ops: Send max_list_ops + 1 listings to check for a 503
+    :param ssl: Use SSL
+    """
+    return rate_limit_probe(bucket, "list", max_list_ops, ssl)
 
 
 def rate_limit_delete(bucket, max_delete_ops, ssl=None):
     """
     Test DELETE operations rate limit enforcement
     :param bucket: bucket to delete from
-    :param max_delete_ops: Loop until the max_delete_ops value to check for a 503
-    :param ssl: Use SSL for s3cmd commands
+    :param max_delete_ops: Send max_delete_ops + 1 deletes to check for a 503
+    :param ssl: Use SSL
     """
-    # increment max_delete_ops to induce warning
-    if "/" in bucket:
-        bucket = bucket.split("/")[1]
-    max_delete_ops += 1
-
     # First, create objects to delete
-    log.info(f"Creating {max_delete_ops} objects for deletion test")
-    create_local_file("1k", "delete_test_file")
-    for i in range(1, max_delete_ops + 1):
-        if ssl:
-            ssl_param = "-s"
-        else:
-            ssl_param = ""
-        cmd = f"/home/cephuser/venv/bin/s3cmd put delete_test_file s3://{bucket}/delete_obj{i} {ssl_param}"
-        run_subprocess(cmd)
-
-    # Now delete objects in a loop to trigger rate limit
-    range_val = f"1..{max_delete_ops}"
-    if ssl:
-        ssl_param = "-s"
-    else:
-        ssl_param = ""
-    cmd = (
-        f"for i in {{{range_val}}}; do /home/cephuser/venv/bin/s3cmd rm "
-        f"s3://{bucket}/delete_obj$i {ssl_param};done;"
-    )
-    stdout, stderr = run_subprocess(cmd)
-    assert "503" in str(stderr), "Rate limit slowdown not observed, failing!"
+    probe = RateLimitProbe.from_s3cfg(bucket, ssl)
+    log.info(f"Creating {max_delete_ops + 1} objects for deletion test")
+    probe.prepare_objects(max_delete_ops + 1, key="delete_obj")
+    return rate_limit_probe(bucket, "delete", max_delete_ops, ssl, key="delete_obj")
 
 
 def remote_zone_bucket_stats(bucket_name, config):
@@ -698,42 +645,40 @@ def lc_validation_at_archive_zone(bucket_name, config):
 
 
 def upload_objects_via_s3cmd(bucket_name, config):
+    """
+    Uploads the objects of the config to the bucket, the uploads of a round run concurrently
+    """
     s3cmd_path = "/home/cephuser/venv/bin/s3cmd"
+    workers = config.test_ops.get("s3cmd_workers", utils.MAX_LOCAL_PROCESSES)
     if config.objects_count >= 20:
         obj_count_4Kb = config.objects_count - 2
         obj_count_64Kb = config.objects_count - obj_count_4Kb
         utils.exec_shell_cmd(f"fallocate -l 4k obj4k")
         utils.exec_shell_cmd(f"fallocate -l 64k obj64k")
+        cmds = [
+            f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-4k-obj-{sobj}"
+            for sobj in range(obj_count_4Kb)
+        ] + [
+            f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-64k-obj-{sobj}"
+            for sobj in range(obj_count_64Kb)
+        ]
         if config.version_enable:
-            version_count = config.version_count
             for versions in range(config.version_count):
-                for sobj in range(obj_count_4Kb):
-                    log.info(
-                        f"upload 4Kb objects on versioned bucket {bucket_name} for {versions} version"
-                    )
-                    cmd = f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-4k-obj-{sobj}"
-                    utils.exec_shell_cmd(cmd)
-                for sobj in range(obj_count_64Kb):
-                    log.info(
-                        f"upload 64Kb objects on versioned bucket {bucket_name} for {versions} version"
-                    )
-                    cmd = (
-                        f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-64k-obj-{sobj}"
-                    )
-                    utils.exec_shell_cmd(cmd)
+                log.info(
+                    f"upload {len(cmds)} objects on versioned bucket {bucket_name} for {versions} version"
+                )
+                utils.exec_shell_cmds_parallel(cmds, workers)
         else:
-            for sobj in range(obj_count_4Kb):
-                log.info(f"Upload 4Kb objects to the {bucket_name}")
-                cmd = f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-4k-obj-{sobj}"
-                utils.exec_shell_cmd(cmd)
-            for sobj in range(obj_count_64Kb):
-                log.info(f"Upload 64Kb objects to the {bucket_name}")
-                cmd = f"{s3cmd_path} put obj4k s3://{bucket_name}/tax-64k-obj-{sobj}"
-                utils.exec_shell_cmd(cmd)
+            log.info(f"Upload {len(cmds)} objects to the {bucket_name}")
+            utils.exec_shell_cmds_parallel(cmds, workers)
     if config.test_ops.get("large_multipart_upload"):
         obj_count = config.objects_count
         log.info(f"uploading some large objects to bucket {bucket_name}")
         utils.exec_shell_cmd(f"fallocate -l 20m obj20m")
-        for mobj in range(obj_count):
-            cmd = f"{s3cmd_path} put obj20m s3://{bucket_name}/multipart-object-{mobj}"
-            utils.exec_shell_cmd(cmd)
+        utils.exec_shell_cmds_parallel(
+            [
+                f"{s3cmd_path} put obj20m s3://{bucket_name}/multipart-object-{mobj}"
+                for mobj in range(obj_count)
+            ],
+            workers,
+        )
@@ -77,19 +77,11 @@ def create_objects_after_ratelimit(bucket_name, object_count):
 def attempt_list_ops_and_assert_503(bucket_name, max_list_ops):
     """
     max_list_ops is the maximum number of LIST operations allowed on the bucket
-    per interval. Attempt to list objects using s3cmd ls (max_list_ops + 1)
+    per interval. Attempt to list objects (max_list_ops + 1)
     times; the first max_list_ops calls are within limit, the (max_list_ops+1)th
     exceeds the limit and must return 503.
     """
-    bucket_for_s3cmd = bucket_name.split("/")[1] if "/" in bucket_name else bucket_name
-    # Run s3cmd ls (max_list_ops + 1) times to exceed the limit and get 503
-    range_val = f"1..{max_list_ops + 1}"
-    cmd = (
-        f"for i in {{{range_val}}}; do {S3CMD_PATH} ls "
-        f"s3://{bucket_for_s3cmd}/; done;"
-    )
-    stdout, stderr = s3cmd_reusable.run_subprocess(cmd)
-    assert "503" in str(stderr), "Rate limit slowdown not observed, failing!"
+    s3cmd_reusable.rate_limit_list(bucket_name, max_list_ops)
 
 
 def test_exec(config, ssh_con):
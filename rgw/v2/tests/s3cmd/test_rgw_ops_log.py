@@ -29,7 +29,6 @@ import logging
 import os
 import subprocess
 import sys
-import time
 import traceback
 from pathlib import Path
 
@@ -89,7 +88,6 @@ def test_exec(config, ssh_con):
                 f"ceph config set client.{service_name} rgw_ops_log_socket_path /var/run/ceph/opslog"
             )
             srv_restarted = rgw_service.restart()
-            time.sleep(30)
 
             # opslog path
             ceph_detail = json.loads(utils.exec_shell_cmd("ceph -s -f json"))
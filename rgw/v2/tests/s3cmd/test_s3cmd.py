@@ -244,7 +244,6 @@ def test_exec(config, ssh_con):
 
         log.info("trying to restart rgw services")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -313,7 +312,6 @@ def test_exec(config, ssh_con):
 
         log.info("trying to restart rgw services")
         srv_restarted = rgw_service.restart(ssh_con)
-        time.sleep(30)
         if srv_restarted is False:
             raise TestExecError("RGW service restart failed")
         else:
@@ -21,6 +21,7 @@ sys.path.append(os.path.abspath(os.path.join(__file__, "../../../../")))
 import v2.utils.utils as utils
 from v2.lib.exceptions import S5CMDCommandExecError, TestExecError
 from v2.lib.manage_data import io_generator
+from v2.lib.s5cmd.resource_op import S5CMD
 
 s5cmd = "/home/cephuser/venv/bin/s5cmd"
 
@@ -88,6 +89,35 @@ def put_object_via_copy(bucket_name, end_point, object_name, local_file_path):
     return copy_response
 
 
+def put_objects_via_copy(bucket_name, end_point, object_names, local_file_path):
+    """
+    copy many objects to the bucket with a single s5cmd process
+    Ex: s5cmd --endpoint-url http://x.x.x.x:xxxx run <file of cp commands>
+    Args:
+        bucket_name(str): Name of the bucket
+        end_point(str): endpoint
+        object_names(list): Names of the objects
+        local_file_path(str): file uploaded as each of the objects
+    Return:
+        Response of each put-object operation
+    """
+    s5cmd_auth = S5CMD(
+        options=[f"--endpoint-url {end_point}"], bin_path=os.path.dirname(s5cmd) + "/"
+    )
+    results = s5cmd_auth.run_batch(
+        [
+            f"cp {local_file_path} s3://{bucket_name}/{object_name}"
+            for object_name in object_names
+        ]
+    )
+    failed = [each["cmd"] for each in results if each["rc"] != 0]
+    if failed:
+        raise S5CMDCommandExecError(
+            message=f"copy object failed for {bucket_name}: {failed[:10]}"
+        )
+    return [each["out"] for each in results]
+
+
 def list_objects(end_point, bucket_name=None):
     """
     List all the buckets or objects in the bucket
@@ -129,6 +159,31 @@ def delete_object(bucket_name, object_name, end_point):
     return delete_response
 
 
+def delete_objects(bucket_name, object_names, end_point):
+    """
+    Deletes many objects from the bucket with a single s5cmd process
+    Ex: s5cmd --endpoint-url http://x.x.x.x:xxxx run <file of rm commands>
+    Args:
+        bucket_name(str): Name of the bucket
+        object_names(list): Names of the objects
+        end_point(str): endpoint
+    Return:
+        Response of each delete-object operation
+    """
+    s5cmd_auth = S5CMD(
+        options=[f"--endpoint-url {end_point}"], bin_path=os.path.dirname(s5cmd) + "/"
+    )
+    results = s5cmd_auth.run_batch(
+        [f"rm s3://{bucket_name}/{object_name}" for object_name in object_names]
+    )
+    failed = [each["cmd"] for each in results if each["rc"] != 0]
+    if failed:
+        raise S5CMDCommandExecError(
+            message=f"delete object failed for {bucket_name}: {failed[:10]}"
+        )
+    return [each["out"] for each in results]
+
+
 def delete_bucket(bucket_name, end_point):
     """
     Deletes object from the bucket
@@ -69,14 +69,14 @@ def test_exec(config, ssh_con):
                     source_file = "obj1_5k.txt"
                     utils.exec_shell_cmd(f"fallocate -l 5K {source_file}")
                     log.info(f"Number of objects to create: {config.objects_count}")
-                    objects_name = []
-                    for oc, size in list(config.mapped_sizes.items()):
-                        object_name = utils.gen_s3_object_name(bucket_name, oc)
-                        objects_name.append(object_name)
-                        log.info(f"s3 object name: {object_name}")
-                        s5cmd_reusable.put_object_via_copy(
-                            bucket_name, endpoint, object_name, source_file
-                        )
+                    objects_name = [
+                        utils.gen_s3_object_name(bucket_name, oc)
+                        for oc in config.mapped_sizes
+                    ]
+                    log.info(f"s3 object names: {objects_name}")
+                    s5cmd_reusable.put_objects_via_copy(
+                        bucket_name, endpoint, objects_name, source_file
+                    )
 
                 bucket_stats = utils.exec_shell_cmd(
                     f"radosgw-admin bucket stats --bucket {bucket_name}"
@@ -92,6 +92,24 @@ def test_exec(config, ssh_con):
                 list_response = s5cmd_reusable.list_objects(endpoint, bucket_name)
                 log.info(f"objects in bucket :{list_response}")
 
+                if config.test_ops.get("delete_object", False) and config.test_ops.get(
+                    "create_object", False
+                ):
+                    log.info(f"deleting {len(objects_name)} objects of {bucket_name}")
+                    s5cmd_reusable.delete_objects(bucket_name, objects_name, endpoint)
+                    bucket_stats = json.loads(
+                        utils.exec_shell_cmd(
+                            f"radosgw-admin bucket stats --bucket {bucket_name}"
+                        )
+                    )
+                    objects_num = (
+                        bucket_stats["usage"].get("rgw.main", {}).get("num_objects", 0)
+                    )
+                    if int(objects_num) != 0:
+                        raise AssertionError(
+                            f"{objects_num} objects left in bucket {bucket_name} after deleting all of them"
+                        )
+
         if config.user_remove is True:
             s3_reusable.remove_user(user)
 
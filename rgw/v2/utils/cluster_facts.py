@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+from collections.abc import Hashable
+from functools import wraps
+
+log = logging.getLogger()
+
+# seconds a cluster fact is reused before it is fetched again
+CLUSTER_FACTS_TTL = 300
+
+
+class ClusterFactsCache(object):
+    """
+    Cache of facts about the cluster that tests keep re-deriving
+
+    Facts such as the ceph version, the rgw port or whether the cluster is
+    multisite are fetched once and then served from memory until their ttl
+    expires or invalidate() is called by an operation that may change them,
+    like an rgw restart or a period commit. Failed lookups (exceptions and
+    None results) are never cached.
+    """
+
+    def __init__(self, default_ttl=CLUSTER_FACTS_TTL):
+        self.default_ttl = default_ttl
+        self.lock = threading.Lock()
+        self.facts = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(name, args, kwargs):
+        # ssh connections and other unhashable args are keyed by identity
+        norm = lambda value: value if isinstance(value, Hashable) else id(value)
+        return (
+            name,
+            tuple(norm(each) for each in args),
+            tuple(sorted((k, norm(v)) for k, v in kwargs.items())),
+        )
+
+    def cached(self, ttl=None):
+        """
+        Decorator caching the result of a cluster fact lookup
+        """
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                key = self._key(func.__name__, args, kwargs)
+                now = time.monotonic()
+                with self.lock:
+                    entry = self.facts.get(key)
+                    if entry is not None and entry[0] > now:
+                        self.hits += 1
+                        return entry[1]
+                    self.misses += 1
+                value = func(*args, **kwargs)
+                if value is not None:
+                    expiry = now + (self.default_ttl if ttl is None else ttl)
+                    with self.lock:
+                        self.facts[key] = (expiry, value)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def invalidate(self, *names):
+        """
+        Drops the cached facts of the given functions, all facts if none are given
+        """
+        with self.lock:
+            if not names:
+                self.facts = {}
+            else:
+                self.facts = {
+                    key: value
+                    for key, value in self.facts.items()
+                    if key[0] not in names
+                }
+        log.info(f"invalidated cluster facts: {', '.join(names) or 'all'}")
+
+
+CLUSTER_FACTS = ClusterFactsCache()
+cluster_fact = CLUSTER_FACTS.cached
+invalidate_cluster_facts = CLUSTER_FACTS.invalidate
@@ -0,0 +1,229 @@
+import atexit
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import paramiko
+from v2.utils.log import LOG_DIR
+
+log = logging.getLogger()
+
+# concurrent channels opened on one pooled ssh connection
+MAX_CHANNELS_PER_HOST = 8
+# local processes run at a time by exec_shell_cmds_parallel
+MAX_LOCAL_PROCESSES = 16
+
+
+class CommandTimings(object):
+    """
+    Structured timings of every command run through utils
+
+    Each record holds the host ('local' for commands run on this node),
+    the command, its duration in seconds and whether it succeeded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = []
+
+    def record(self, host, cmd, duration, ok):
+        with self.lock:
+            self.records.append(
+                {
+                    "host": host,
+                    "cmd": cmd,
+                    "duration": round(duration, 6),
+                    "ok": ok,
+                    "time": time.time(),
+                }
+            )
+
+    @contextmanager
+    def timed(self, host, cmd):
+        """
+        Context manager recording the duration of the enclosed command, the
+        yielded dict's 'ok' key is set by the caller
+        """
+        result = {"ok": False}
+        started = time.perf_counter()
+        try:
+            yield result
+        finally:
+            self.record(host, cmd, time.perf_counter() - started, result["ok"])
+
+    def summary(self, top=10):
+        """
+        Returns command count and total time per command name and the slowest commands
+        """
+        with self.lock:
+            records = list(self.records)
+        per_command = {}
+        for each in records:
+            # 'sudo radosgw-admin bucket stats ...' -> 'radosgw-admin bucket'
+            words = [w for w in each["cmd"].split() if w != "sudo"][:2]
+            stats = per_command.setdefault(" ".join(words), {"count": 0, "total": 0.0})
+            stats["count"] += 1
+            stats["total"] += each["duration"]
+        slowest = sorted(records, key=lambda each: each["duration"], reverse=True)
+        return {"per_command": per_command, "slowest": slowest[:top]}
+
+    def log_summary(self, top=10):
+        summary = self.summary(top)
+        log.info("command timings:")
+        for name, stats in sorted(
+            summary["per_command"].items(), key=lambda each: -each[1]["total"]
+        ):
+            log.info(
+                f"{name:<40} count: {stats['count']:<6} total: {stats['total']:.2f}s"
+            )
+        log.info(f"slowest {top} commands:")
+        for each in summary["slowest"]:
+            log.info(f"{each['duration']:>10.2f}s {each['host']:<16} {each['cmd']}")
+
+    def dump(self, fname):
+        with self.lock:
+            records = list(self.records)
+        with open(fname, "w") as fp:
+            json.dump(records, fp, indent=4)
+
+
+class SSHPool(object):
+    """
+    Pool of ssh connections, one per (host, user)
+
+    A paramiko transport multiplexes many channels, so every caller of
+    connect_remote for the same host shares one authenticated connection
+    instead of paying a new handshake. Concurrent channels per connection
+    are bounded by max_channels.
+    """
+
+    def __init__(self, max_channels=MAX_CHANNELS_PER_HOST):
+        self.max_channels = max_channels
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.limits = {}
+        self.connecting = {}
+
+    def get(self, host, username, password, timeout=3):
+        """
+        Returns a connected SSHClient for host, reusing a live pooled one
+
+        The handshake runs under a lock of its own (host, user), so a slow
+        or unreachable host does not hold up connections to the others.
+        """
+        pool_key = (host, username)
+        with self.lock:
+            connecting = self.connecting.setdefault(pool_key, threading.Lock())
+        with connecting:
+            with self.lock:
+                ssh = self.clients.get(pool_key)
+            transport = ssh.get_transport() if ssh is not None else None
+            if transport is not None and transport.is_active():
+                return ssh
+            ssh = paramiko.SSHClient()
+            ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            ssh.connect(
+                host, port=22, username=username, password=password, timeout=timeout
+            )
+            with self.lock:
+                self.clients[pool_key] = ssh
+                self.limits[id(ssh.get_transport())] = threading.BoundedSemaphore(
+                    self.max_channels
+                )
+            return ssh
+
+    @contextmanager
+    def channel(self, ssh):
+        """
+        Context manager bounding the concurrent channels on ssh's connection
+        """
+        transport = ssh.get_transport()
+        with self.lock:
+            limit = self.limits.setdefault(
+                id(transport), threading.BoundedSemaphore(self.max_channels)
+            )
+        with limit:
+            yield
+
+    def close_all(self):
+        with self.lock:
+            for ssh in self.clients.values():
+                ssh.close()
+            self.clients = {}
+            self.limits = {}
+
+
+def ssh_host(ssh):
+    """
+    Returns the peer address of an ssh connection, for logs and timings
+    """
+    try:
+        return ssh.get_transport().getpeername()[0]
+    except Exception:
+        return "remote"
+
+
+def batch_script(cmds):
+    """
+    Returns a shell script running cmds in one shell, and the marker token
+
+    Each command's stdout and stderr are followed by a marker line carrying
+    its index and exit status, see parse_batch_output.
+    """
+    token = uuid.uuid4().hex
+    lines = []
+    for index, cmd in enumerate(cmds):
+        lines.append(f'{{ {cmd}\n}} 2>&1; echo "__batch_{token}_{index}_$?__"')
+    return "\n".join(lines), token
+
+
+def parse_batch_output(cmds, output, token):
+    """
+    Splits the output of a batch_script run back into per-command results
+
+    Returns:
+        list of {"cmd", "rc", "out"}, rc is None for commands that never ran
+    """
+    marker = re.compile(rf"__batch_{token}_(\d+)_(\d+)__\n?")
+    results = [{"cmd": cmd, "rc": None, "out": ""} for cmd in cmds]
+    start = 0
+    for match in marker.finditer(output):
+        index = int(match.group(1))
+        results[index]["rc"] = int(match.group(2))
+        results[index]["out"] = output[start : match.start()]
+        start = match.end()
+    return results
+
+
+def report_timings():
+    """
+    Logs the command timings summary and writes the records under LOG_DIR,
+    registered to run when the test exits
+    """
+    if not TIMINGS.records:
+        return
+    try:
+        TIMINGS.log_summary()
+        test_name = os.path.splitext(os.path.basename(sys.argv[0]))[0] or "test"
+        os.makedirs(LOG_DIR, exist_ok=True)
+        fname = os.path.join(
+            LOG_DIR, f"{test_name}_command_timings_{int(time.time())}.json"
+        )
+        TIMINGS.dump(fname)
+        log.info(f"command timings written to {fname}")
+    except Exception as e:
+        log.warning(f"could not report command timings: {e}")
+
+
+TIMINGS = CommandTimings()
+SSH_POOL = SSHPool()
+# atexit runs handlers last in first out: the pooled connections are closed
+# after the timings are reported, and both before logging shuts down
+atexit.register(SSH_POOL.close_all)
+atexit.register(report_timings)
@@ -1,23 +1,35 @@
 import configparser
 import datetime
 import hashlib
+import http.client
 import json
 import logging
 import os
 import random
 import shutil
 import socket
+import ssl
 import string
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from random import randint
 from re import S
 from urllib.parse import urlparse
 
 import botocore
-import paramiko
 import yaml
 from v2.lib.exceptions import SyncFailedError, TestExecError
+from v2.utils.cluster_facts import cluster_fact, invalidate_cluster_facts
+from v2.utils.exec_pool import (
+    MAX_LOCAL_PROCESSES,
+    SSH_POOL,
+    TIMINGS,
+    batch_script,
+    parse_batch_output,
+    ssh_host,
+)
+from v2.utils.waiter import wait_until
 
 BUCKET_NAME_PREFIX = "bucky" + "-" + str(random.randrange(1, 5000))
 S3_OBJECT_NAME_PREFIX = "key"
@@ -58,14 +70,16 @@ def exec_long_running_shell_cmd(cmd):
 def exec_shell_cmd(cmd, debug_info=False, return_err=False):
     try:
         log.info("executing cmd: %s" % cmd)
-        pr = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=False,
-            shell=True,
-        )
-        out, err = pr.communicate()
+        with TIMINGS.timed("local", cmd) as timing:
+            pr = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=False,
+                shell=True,
+            )
+            out, err = pr.communicate()
+            timing["ok"] = pr.returncode == 0
         out = out.decode("utf-8", errors="ignore")
         err = err.decode("utf-8", errors="ignore")
         if pr.returncode == 0:
@@ -90,10 +104,70 @@ def exec_shell_cmd(cmd, debug_info=False, return_err=False):
         return False
 
 
+def exec_shell_cmds(cmds):
+    """
+    Runs several commands in one local shell instead of one shell per command
+
+    Args:
+        cmds(list): commands to run, in order
+
+    Returns:
+        list of {"cmd", "rc", "out"}, out holds the command's stdout and stderr
+    """
+    script, token = batch_script(cmds)
+    log.info("executing %s cmds in one batch: %s" % (len(cmds), cmds))
+    with TIMINGS.timed("local", "batch: " + "; ".join(cmds)) as timing:
+        pr = subprocess.run(script, stdout=subprocess.PIPE, shell=True)
+        timing["ok"] = pr.returncode == 0
+    results = parse_batch_output(
+        cmds, pr.stdout.decode("utf-8", errors="ignore"), token
+    )
+    for each in results:
+        log.info("cmd: %s, returncode: %s\n%s" % (each["cmd"], each["rc"], each["out"]))
+    return results
+
+
+def exec_shell_cmds_parallel(cmds, workers=MAX_LOCAL_PROCESSES):
+    """
+    Runs independent commands concurrently, at most workers processes at a time
+
+    Args:
+        cmds(list): commands to run, in any order
+        workers(int): commands run at a time
+
+    Returns:
+        list of {"cmd", "rc", "out"} in the order of cmds, out holds the command's stdout and stderr
+    """
+
+    def run(cmd):
+        with TIMINGS.timed("local", cmd) as timing:
+            pr = subprocess.run(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True
+            )
+            timing["ok"] = pr.returncode == 0
+        return {
+            "cmd": cmd,
+            "rc": pr.returncode,
+            "out": pr.stdout.decode("utf-8", errors="ignore"),
+        }
+
+    log.info("executing %s cmds with %s workers" % (len(cmds), workers))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(run, cmds))
+    failed = [each for each in results if each["rc"] != 0]
+    log.info("%s of %s cmds succeeded" % (len(results) - len(failed), len(results)))
+    for each in failed:
+        log.error(
+            "cmd: %s, returncode: %s\n%s" % (each["cmd"], each["rc"], each["out"])
+        )
+    return results
+
+
 def connect_remote(rgw_host, user_nm="cephuser", passw="cephuser"):
-    ssh = paramiko.SSHClient()
-    ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    ssh.connect(rgw_host, port=22, username=user_nm, password=passw, timeout=3)
+    """
+    Returns an ssh connection to rgw_host, shared with earlier callers for the same host
+    """
+    ssh = SSH_POOL.get(rgw_host, user_nm, passw, timeout=3)
     if ssh is None:
         raise Exception("Connection with remote machine failed")
     else:
@@ -103,9 +177,11 @@ def connect_remote(rgw_host, user_nm="cephuser", passw="cephuser"):
 def remote_exec_shell_cmd(ssh, cmd, return_output=False):
     try:
         log.info("executing cmd on remote node: %s" % cmd)
-        stdin, stdout, stderr = ssh.exec_command(cmd)
-        cmd_output = stdout.read().decode()
-        cmd_error = stderr.read().decode()
+        with SSH_POOL.channel(ssh), TIMINGS.timed(ssh_host(ssh), cmd) as timing:
+            stdin, stdout, stderr = ssh.exec_command(cmd)
+            cmd_output = stdout.read().decode()
+            cmd_error = stderr.read().decode()
+            timing["ok"] = len(cmd_error) == 0
         log.info(cmd_output)
         if len(cmd_error) == 0:
             if return_output:
@@ -122,6 +198,31 @@ def remote_exec_shell_cmd(ssh, cmd, return_output=False):
         return False
 
 
+def remote_exec_shell_cmds(ssh, cmds):
+    """
+    Runs several commands on the remote node in one round trip
+
+    Args:
+        ssh: ssh connection from connect_remote
+        cmds(list): commands to run, in order
+
+    Returns:
+        list of {"cmd", "rc", "out"}, out holds the command's stdout and stderr
+    """
+    script, token = batch_script(cmds)
+    log.info("executing %s cmds in one batch on remote node: %s" % (len(cmds), cmds))
+    with SSH_POOL.channel(ssh), TIMINGS.timed(
+        ssh_host(ssh), "batch: " + "; ".join(cmds)
+    ) as timing:
+        stdin, stdout, stderr = ssh.exec_command(script)
+        output = stdout.read().decode(errors="ignore")
+        timing["ok"] = stdout.channel.recv_exit_status() == 0
+    results = parse_batch_output(cmds, output, token)
+    for each in results:
+        log.info("cmd: %s, returncode: %s\n%s" % (each["cmd"], each["rc"], each["out"]))
+    return results
+
+
 def get_crash_log():
     # dump the crash log information on to the console, if any
     _, ceph_version_name = get_ceph_version()
@@ -136,9 +237,13 @@ def get_crash_log():
         exec_shell_cmd(cmd)
 
 
-def get_md5(fname):
+def get_md5(fname, chunk_size=1024 * 1024):
     log.info("fname: %s" % fname)
-    return hashlib.md5(open(fname, "rb").read()).hexdigest()
+    md5 = hashlib.md5()
+    with open(fname, "rb") as fp:
+        for chunk in iter(lambda: fp.read(chunk_size), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
     # return "@424242"
 
 
@@ -295,6 +400,7 @@ def make_copy_of_file(f1, f2):
         return os.path.abspath(f2)
 
 
+@cluster_fact()
 def get_cluster_fsid():
     cluster_fsid = exec_shell_cmd("sudo ceph config get mon fsid")
     return cluster_fsid.rstrip("\n")
@@ -487,6 +593,41 @@ def rgw_daemons_status(retry_attempts=10, retry_delay=15):
     return False
 
 
+def get_rgw_daemon_starts(service_name=None, ssh_con=None):
+    """
+    Returns {daemon_name: (started, status_desc)} of the rgw daemons of
+    service_name, or of all rgw daemons, refreshed from the hosts
+    """
+    cmd = "sudo ceph orch ps --daemon_type=rgw --refresh --format json"
+    if ssh_con is not None:
+        out = remote_exec_shell_cmd(ssh_con, cmd, return_output=True)
+    else:
+        out = exec_shell_cmd(cmd)
+    if out is False:
+        raise TestExecError("ceph orch ps failed")
+    return {
+        each["daemon_name"]: (each.get("started"), each.get("status_desc"))
+        for each in json.loads(out)
+        if service_name is None or each.get("service_name") == service_name
+    }
+
+
+def rgw_daemons_restarted(before, service_name=None, ssh_con=None):
+    """
+    Returns True once every rgw daemon runs with another start time than in before
+    """
+    current = get_rgw_daemon_starts(service_name, ssh_con)
+    log.info(f"RGW daemons: {current}")
+    if not current:
+        return False
+    for name, (started, status) in current.items():
+        if status != "running" or started is None:
+            return False
+        if name in before and before[name][0] == started:
+            return False
+    return True
+
+
 class RGWService:
     """
     Implements RGW service operation
@@ -505,6 +646,12 @@ class RGWService:
         """
         Restarts the RGW service and verifies daemon status post-restart.
 
+        `ceph orch restart` returns before cephadm restarts anything, the old
+        daemons would pass the status and http checks until they go down. So
+        the start times of the daemons are captured first and the restart is
+        done once every daemon of the service was started again, is running
+        and the endpoint answers.
+
         Args:
             ssh_con: SSH connection for remote execution.
 
@@ -513,6 +660,12 @@ class RGWService:
         """
         try:
             log.info("Restarting RGW service")
+            invalidate_cluster_facts()
+            service_name = getattr(self.srv, "unit", None)
+            before = None
+            if isinstance(self.srv, CephOrchRGWSrv):
+                before = get_rgw_daemon_starts(service_name, ssh_con)
+                log.info(f"RGW daemons before restart: {before}")
             cmd = self.srv.cmd("restart")
             if ssh_con is not None:
                 log.info("Executing restart on remote node")
@@ -525,11 +678,34 @@ class RGWService:
                     log.error("Failed to restart RGW service on local node")
                     return False
 
+            # systemctl restart returns once the new process started, ceph
+            # orch restart only schedules it
+            if before is not None and not wait_until(
+                lambda: rgw_daemons_restarted(before, service_name, ssh_con),
+                "rgw daemons to be restarted",
+                timeout=600,
+                interval=2,
+                raise_on_timeout=False,
+            ):
+                log.error("RGW daemons were not restarted")
+                return False
+            # the restart reloaded the config, drop what was read before it
+            invalidate_cluster_facts()
+
             # Verify RGW daemon status after restart
             log.info("Verifying RGW daemon status after restart")
             if not rgw_daemons_status():
                 log.error("RGW daemons not fully running after restart")
                 return False
+            if not wait_until(
+                lambda: rgw_responding(ssh_con),
+                "rgw to serve requests after restart",
+                timeout=120,
+                interval=1,
+                raise_on_timeout=False,
+            ):
+                log.error("RGW not serving requests after restart")
+                return False
 
             log.info("RGW service restarted and daemons verified successfully")
             return True
@@ -571,6 +747,7 @@ class RGWService:
             return exec_shell_cmd(cmd)
 
 
+@cluster_fact()
 def get_rgw_frontends():
     """Retrieve RGW's frontend configuration."""
     try:
@@ -584,6 +761,7 @@ def get_rgw_frontends():
         log.debug(be)
 
 
+@cluster_fact()
 def get_radosgw_port_no(ssh_con=None):
     """
     Return the RGW gateway port number.
@@ -617,6 +795,7 @@ def get_radosgw_port_no(ssh_con=None):
     return port
 
 
+@cluster_fact()
 def is_rgw_secure():
     """Check if RGW endpoint is secure."""
     frontend_values = get_rgw_frontends()
@@ -828,13 +1007,38 @@ def check_bucket_sync(name):
 def wait_till_bucket_synced(name, timeout=120, interval=5):
     """Wait until the bucket reports synchronized."""
     cmd = f"radosgw-admin bucket sync status --bucket {name}"
-    end_time = datetime.datetime.now() + datetime.timedelta(seconds=timeout)
-    while end_time > datetime.datetime.now():
-        time.sleep(interval)
+
+    def synced():
         result = exec_shell_cmd(cmd)
-        if not "behind shards" in result:
-            return True
-    return False
+        return result is not False and "behind shards" not in result
+
+    return wait_until(
+        synced,
+        f"bucket {name} to be synced",
+        timeout=timeout,
+        interval=interval,
+        raise_on_timeout=False,
+    )
+
+
+def rgw_responding(ssh_con=None):
+    """
+    Returns True once the rgw endpoint answers http requests
+    """
+    _, ip = get_hostname_ip(ssh_con)
+    port = get_radosgw_port_no(ssh_con)
+    if is_rgw_secure():
+        conn = http.client.HTTPSConnection(
+            ip, port, timeout=5, context=ssl._create_unverified_context()
+        )
+    else:
+        conn = http.client.HTTPConnection(ip, port, timeout=5)
+    try:
+        conn.request("HEAD", "/")
+        conn.getresponse()
+    finally:
+        conn.close()
+    return True
 
 
 def get_hostname_ip(ssh_con=None):
@@ -858,6 +1062,7 @@ def cmp(val1, val2):
     return (val1 > val2) - (val1 < val2)
 
 
+@cluster_fact()
 def get_ceph_version():
     """
     get the current ceph version
@@ -895,6 +1100,7 @@ def check_dbr_support():
         return False
 
 
+@cluster_fact()
 def is_cluster_primary():
     # checks if the cluster is primary or not
     # if primary return True or return False if not, assume as secondary
@@ -921,6 +1127,7 @@ def is_cluster_primary():
     return False
 
 
+@cluster_fact()
 def is_cluster_multisite():
     """
     checks if the cluster is single site or multisite
@@ -1044,6 +1251,7 @@ def restart_rgw(restart_all=False, ssh_con=None):
     """
     This method restarts all rgw daemons on the specified site
     """
+    invalidate_cluster_facts()
     ceph_orch_ls_cmd = "ceph orch ls --service-type rgw -f json"
     if ssh_con:
         rgw_orch_ls_out = remote_exec_shell_cmd(
@@ -0,0 +1,159 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import json
+import logging
+
+import v2.utils.utils as utils
+from v2.utils.waiter import succeeds, wait_until
+
+log = logging.getLogger()
+
+
+def _json_cmd(cmd, ssh_con=None):
+    if ssh_con is not None:
+        out = utils.remote_exec_shell_cmd(ssh_con, cmd, return_output=True)
+    else:
+        out = utils.exec_shell_cmd(cmd)
+    if out is False:
+        raise Exception(f"'{cmd}' failed")
+    return json.loads(out)
+
+
+def reshard_list_empty(ssh_con=None):
+    """
+    This function checks that no bucket is queued for resharding
+    """
+    return len(_json_cmd("radosgw-admin reshard list", ssh_con)) == 0
+
+
+def bucket_num_shards(bucket_name, ssh_con=None):
+    """
+    This function returns the number of index shards of a bucket
+    """
+    return _json_cmd(f"radosgw-admin bucket stats --bucket {bucket_name}", ssh_con)[
+        "num_shards"
+    ]
+
+
+def gc_list_empty(ssh_con=None):
+    """
+    This function checks that the gc queue is empty, including the entries not yet due
+    """
+    return len(_json_cmd("radosgw-admin gc list --include-all", ssh_con)) == 0
+
+
+def bucket_synced(bucket_name, ssh_con=None):
+    """
+    This function checks that bucket sync status reports no shard behind or recovering
+    """
+    cmd = f"radosgw-admin bucket sync status --bucket {bucket_name}"
+    if ssh_con is not None:
+        out = utils.remote_exec_shell_cmd(ssh_con, cmd, return_output=True)
+    else:
+        out = utils.exec_shell_cmd(cmd)
+    if out is False:
+        return False
+    return "behind shards" not in out and "recovering" not in out
+
+
+def lc_done(bucket_name=None, ssh_con=None):
+    """
+    This function checks that lc processing completed, for one bucket or for all of them
+    """
+    entries = _json_cmd("radosgw-admin lc list", ssh_con)
+    if bucket_name is not None:
+        # lc list entries are named :<bucket>:<marker>, or <tenant>:<bucket>:<marker>
+        entries = [
+            each for each in entries if each["bucket"].split(":")[-2] == bucket_name
+        ]
+        if not entries:
+            return False
+    return all(each["status"] == "COMPLETE" for each in entries)
+
+
+def wait_for_reshard_list_empty(
+    ssh_con=None, timeout=600, deadline=None, raise_on_timeout=True
+):
+    return wait_until(
+        lambda: reshard_list_empty(ssh_con),
+        "reshard list to be empty",
+        timeout=timeout,
+        deadline=deadline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_num_shards(
+    bucket_name, check, description, timeout=600, deadline=None, raise_on_timeout=True
+):
+    """
+    This function waits until check(num_shards of the bucket) is true
+
+    Returns:
+        the number of shards meeting the check
+    """
+    shards = {}
+
+    def predicate():
+        shards["num_shards"] = bucket_num_shards(bucket_name)
+        log.info(f"no_of_shards of {bucket_name}: {shards['num_shards']}")
+        return check(shards["num_shards"])
+
+    wait_until(
+        predicate,
+        f"{bucket_name} num_shards {description}",
+        timeout=timeout,
+        deadline=deadline,
+        raise_on_timeout=raise_on_timeout,
+    )
+    return shards.get("num_shards")
+
+
+def wait_for_gc_list_empty(
+    ssh_con=None, timeout=600, deadline=None, raise_on_timeout=True
+):
+    return wait_until(
+        lambda: gc_list_empty(ssh_con),
+        "gc list to be empty",
+        timeout=timeout,
+        deadline=deadline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_bucket_synced(
+    bucket_name, ssh_con=None, timeout=600, deadline=None, raise_on_timeout=True
+):
+    return wait_until(
+        lambda: bucket_synced(bucket_name, ssh_con),
+        f"bucket {bucket_name} to be synced",
+        timeout=timeout,
+        deadline=deadline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_lc_done(
+    bucket_name=None, ssh_con=None, timeout=900, deadline=None, raise_on_timeout=True
+):
+    return wait_until(
+        lambda: lc_done(bucket_name, ssh_con),
+        f"lc processing of {bucket_name or 'all buckets'} to complete",
+        timeout=timeout,
+        deadline=deadline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_success(func, *args, timeout=600, deadline=None, **kwargs):
+    """
+    This function retries a verification raising on mismatch until it passes
+    """
+    return wait_until(
+        succeeds(func, *args, **kwargs),
+        f"{func.__name__} to pass",
+        timeout=timeout,
+        deadline=deadline,
+    )
@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(__file__, "../../../")))
+import logging
+import random
+import time
+
+from v2.lib.exceptions import WaitTimeoutError
+
+log = logging.getLogger()
+
+# defaults of wait_until, in seconds
+WAIT_TIMEOUT = 300
+WAIT_INTERVAL = 2
+WAIT_MAX_INTERVAL = 30
+WAIT_BACKOFF = 1.5
+# fraction by which every delay is randomly stretched or shrunk
+WAIT_JITTER = 0.2
+
+
+class Deadline(object):
+    """
+    Time budget shared by consecutive waits
+
+    Passing the same Deadline to several wait_until calls bounds their total
+    duration, each wait gets whatever the previous ones left over.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+
+def wait_until(
+    predicate,
+    description=None,
+    timeout=WAIT_TIMEOUT,
+    interval=WAIT_INTERVAL,
+    max_interval=WAIT_MAX_INTERVAL,
+    backoff=WAIT_BACKOFF,
+    jitter=WAIT_JITTER,
+    deadline=None,
+    raise_on_timeout=True,
+):
+    """
+    This function polls predicate until it returns a true value
+
+    The first check happens right away, then the delay between checks starts
+    at interval and grows by backoff up to max_interval, with jitter. A
+    predicate raising an exception counts as not met yet.
+
+    Parameters:
+        predicate: function without arguments
+        description(str): what is waited for, for the logs
+        timeout(float): seconds to wait at most
+        deadline(Deadline): shared budget, the wait ends with it if it expires first
+        raise_on_timeout(bool): raise WaitTimeoutError on timeout, else return False
+
+    Returns:
+        the true value returned by predicate
+    """
+    description = description or getattr(predicate, "__name__", "condition")
+    if deadline is not None:
+        timeout = min(timeout, deadline.remaining())
+    started = time.monotonic()
+    delay = interval
+    checks = 0
+    last_error = None
+    log.info(f"waiting up to {timeout:.0f}s for {description}")
+    while True:
+        checks += 1
+        try:
+            result = predicate()
+            last_error = None
+        except Exception as e:
+            result = None
+            last_error = e
+            log.debug(f"{description} not met yet: {e}")
+        elapsed = time.monotonic() - started
+        if result:
+            log.info(f"{description} met after {elapsed:.1f}s ({checks} checks)")
+            return result
+        remaining = timeout - elapsed
+        if remaining <= 0:
+            break
+        sleep_time = delay * random.uniform(1 - jitter, 1 + jitter)
+        time.sleep(min(sleep_time, remaining))
+        delay = min(delay * backoff, max_interval)
+    message = (
+        f"timed out after {elapsed:.1f}s ({checks} checks) waiting for {description}"
+    )
+    if last_error is not None:
+        message += f", last error: {last_error}"
+    if raise_on_timeout:
+        raise WaitTimeoutError(message)
+    log.warning(message)
+    return False
+
+
+def succeeds(func, *args, **kwargs):
+    """
+    This function returns a predicate that is met once func runs without raising
+
+    For verification functions that raise on mismatch, e.g. stats compared
+    across sites that converge eventually.
+    """
+
+    def predicate():
+        func(*args, **kwargs)
+        return True
+
+    predicate.__name__ = getattr(func, "__name__", "call")
+    return predicate